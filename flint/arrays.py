@@ -0,0 +1,152 @@
+#################
+# Arrays of Flint, backed by Python lists
+#################
+from functools import reduce
+from flint.flint_callable import FlintCallable, native
+from flint.runtime_error import CustomRunTimeError
+
+# An array is a plain Python list, so the natives working on a whole array
+# hand it to the builtins and their loop over the elements runs in C.
+# Indexes are whole numbers, negative ones counting from the end.
+# Natives raise their errors without a token, the engines place them at the call.
+
+
+def check_index(bracket, index, what="Array index"):
+    """Converts a Flint number used as an index into a Python int"""
+    if type(index) is not float or not index.is_integer():
+        raise CustomRunTimeError(bracket, f"{what} must be a whole number.")
+    return int(index)
+
+
+def get_index(bracket, array, index):
+    """Evaluates `array[index]`"""
+    if type(array) is not list:
+        raise CustomRunTimeError(bracket, "Only arrays can be indexed.")
+    try:
+        return array[check_index(bracket, index)]
+    except IndexError:
+        raise CustomRunTimeError(bracket, "Array index out of range.") from None
+
+
+def set_index(bracket, array, index, value):
+    """Evaluates `array[index] = value`"""
+    if type(array) is not list:
+        raise CustomRunTimeError(bracket, "Only arrays can be indexed.")
+    try:
+        array[check_index(bracket, index)] = value
+    except IndexError:
+        raise CustomRunTimeError(bracket, "Array index out of range.") from None
+    return value
+
+
+def get_slice(bracket, array, start, end):
+    """
+    Evaluates `array[start:end]` into a new array, a nil bound standing
+    for the start or the end of the array. Like Python's, slices are
+    clamped to the array rather than out of range.
+    """
+    if type(array) is not list:
+        raise CustomRunTimeError(bracket, "Only arrays can be sliced.")
+    if start is not None:
+        start = check_index(bracket, start, "Slice bound")
+    if end is not None:
+        end = check_index(bracket, end, "Slice bound")
+    return array[start:end]
+
+
+############################################
+# Natives
+############################################
+
+def check_array(name, value):
+    if type(value) is not list:
+        raise CustomRunTimeError(None, f"Argument of '{name}' must be an array.")
+
+
+def check_elements(name, array):
+    """Ensures the elements of `array` can be ordered: all numbers or all strings."""
+    types = set(map(type, array))
+    if not (types <= {float} or types <= {str}):
+        raise CustomRunTimeError(None, f"Elements of '{name}' must be all numbers or all strings.")
+
+
+def check_function(name, function, count):
+    if not isinstance(function, FlintCallable) or not function.accepts(count):
+        raise CustomRunTimeError(None, f"'{name}' expects a function taking {count} arguments.")
+
+
+@native("len")
+def array_len(value):
+    if type(value) is not list and type(value) is not str:
+        raise CustomRunTimeError(None, "Argument of 'len' must be an array or a string.")
+    return float(len(value))
+
+
+@native("push")
+def array_push(array, value):
+    check_array("push", array)
+    array.append(value)
+
+
+@native("pop")
+def array_pop(array):
+    check_array("pop", array)
+    if not array:
+        raise CustomRunTimeError(None, "Can't pop from an empty array.")
+    return array.pop()
+
+
+@native("sum")
+def array_sum(array):
+    check_array("sum", array)
+    if not set(map(type, array)) <= {float}:
+        raise CustomRunTimeError(None, "Elements of 'sum' must be numbers.")
+    return sum(array, 0.0)
+
+
+@native("min")
+def array_min(array):
+    check_array("min", array)
+    if not array:
+        raise CustomRunTimeError(None, "Can't take the 'min' of an empty array.")
+    check_elements("min", array)
+    return min(array)
+
+
+@native("max")
+def array_max(array):
+    check_array("max", array)
+    if not array:
+        raise CustomRunTimeError(None, "Can't take the 'max' of an empty array.")
+    check_elements("max", array)
+    return max(array)
+
+
+@native("sort")
+def array_sort(array):
+    """Returns a sorted copy of the array."""
+    check_array("sort", array)
+    check_elements("sort", array)
+    return sorted(array)
+
+
+@native("map", takes_interpreter=True)
+def array_map(interpreter, array, function):
+    check_array("map", array)
+    check_function("map", function, 1)
+    return list(map(function.python_function(interpreter), array))
+
+
+@native("filter", takes_interpreter=True)
+def array_filter(interpreter, array, function):
+    check_array("filter", array)
+    check_function("filter", function, 1)
+    keep = function.python_function(interpreter)
+    return [element for element in array if (value := keep(element)) is not False and value is not None]
+
+
+@native("reduce", takes_interpreter=True)
+def array_reduce(interpreter, array, function, initial):
+    check_array("reduce", array)
+    check_function("reduce", function, 2)
+    return reduce(function.python_function(interpreter), array, initial)
@@ -2,6 +2,8 @@
 # Do not modify this file manually.
 
 class Expr:
+    __slots__ = ()
+
     def accept(self, visitor):
         raise NotImplementedError()
 
@@ -30,7 +32,23 @@ class ExprVisitor:
     def visit_variable(self, variable):
         raise NotImplementedError()
 
+    def visit_array(self, array):
+        raise NotImplementedError()
+
+    def visit_index(self, index):
+        raise NotImplementedError()
+
+    def visit_set_index(self, set_index):
+        raise NotImplementedError()
+
+    def visit_slice(self, slice):
+        raise NotImplementedError()
+
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'depth', 'slot')
+    __match_args__ = ('name', 'value')
+    kind = 0
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -39,6 +57,10 @@ class Assign(Expr):
         return visitor.visit_assign(self)
 
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right', 'hotness')
+    __match_args__ = ('left', 'operator', 'right')
+    kind = 1
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -48,6 +70,10 @@ class Binary(Expr):
         return visitor.visit_binary(self)
 
 class Grouping(Expr):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
+    kind = 2
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -55,6 +81,10 @@ class Grouping(Expr):
         return visitor.visit_grouping(self)
 
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments', 'cache', 'hotness')
+    __match_args__ = ('callee', 'paren', 'arguments')
+    kind = 3
+
     def __init__(self, callee, paren, arguments):
         self.callee = callee
         self.paren = paren
@@ -64,6 +94,10 @@ class Call(Expr):
         return visitor.visit_call(self)
 
 class Literal(Expr):
+    __slots__ = ('value',)
+    __match_args__ = ('value',)
+    kind = 4
+
     def __init__(self, value):
         self.value = value
 
@@ -71,6 +105,10 @@ class Literal(Expr):
         return visitor.visit_literal(self)
 
 class Logical(Expr):
+    __slots__ = ('left', 'operator', 'right')
+    __match_args__ = ('left', 'operator', 'right')
+    kind = 5
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -80,6 +118,10 @@ class Logical(Expr):
         return visitor.visit_logical(self)
 
 class Unary(Expr):
+    __slots__ = ('operator', 'right')
+    __match_args__ = ('operator', 'right')
+    kind = 6
+
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
@@ -88,9 +130,81 @@ class Unary(Expr):
         return visitor.visit_unary(self)
 
 class Variable(Expr):
+    __slots__ = ('name', 'depth', 'slot')
+    __match_args__ = ('name',)
+    kind = 7
+
     def __init__(self, name):
         self.name = name
 
     def accept(self, visitor):
         return visitor.visit_variable(self)
 
+class Array(Expr):
+    __slots__ = ('bracket', 'elements')
+    __match_args__ = ('bracket', 'elements')
+    kind = 8
+
+    def __init__(self, bracket, elements):
+        self.bracket = bracket
+        self.elements = elements
+
+    def accept(self, visitor):
+        return visitor.visit_array(self)
+
+class Index(Expr):
+    __slots__ = ('object', 'bracket', 'index')
+    __match_args__ = ('object', 'bracket', 'index')
+    kind = 9
+
+    def __init__(self, object, bracket, index):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+
+    def accept(self, visitor):
+        return visitor.visit_index(self)
+
+class Set_index(Expr):
+    __slots__ = ('object', 'bracket', 'index', 'value')
+    __match_args__ = ('object', 'bracket', 'index', 'value')
+    kind = 10
+
+    def __init__(self, object, bracket, index, value):
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+
+    def accept(self, visitor):
+        return visitor.visit_set_index(self)
+
+class Slice(Expr):
+    __slots__ = ('object', 'bracket', 'start', 'end')
+    __match_args__ = ('object', 'bracket', 'start', 'end')
+    kind = 11
+
+    def __init__(self, object, bracket, start, end):
+        self.object = object
+        self.bracket = bracket
+        self.start = start
+        self.end = end
+
+    def accept(self, visitor):
+        return visitor.visit_slice(self)
+
+# visit method of each kind of expr, indexed by the kind of its class
+EXPR_VISITS = (
+    "visit_assign",
+    "visit_binary",
+    "visit_grouping",
+    "visit_call",
+    "visit_literal",
+    "visit_logical",
+    "visit_unary",
+    "visit_variable",
+    "visit_array",
+    "visit_index",
+    "visit_set_index",
+    "visit_slice",
+)
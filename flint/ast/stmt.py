@@ -2,6 +2,8 @@
 # Do not modify this file manually.
 
 class Stmt:
+    __slots__ = ()
+
     def accept(self, visitor):
         raise NotImplementedError()
 
@@ -12,6 +14,12 @@ class StmtVisitor:
     def visit_expression(self, expression):
         raise NotImplementedError()
 
+    def visit_for_stmt(self, for_stmt):
+        raise NotImplementedError()
+
+    def visit_for_range(self, for_range):
+        raise NotImplementedError()
+
     def visit_function(self, function):
         raise NotImplementedError()
 
@@ -31,6 +39,10 @@ class StmtVisitor:
         raise NotImplementedError()
 
 class Block(Stmt):
+    __slots__ = ('statements', 'frame_size')
+    __match_args__ = ('statements',)
+    kind = 0
+
     def __init__(self, statements):
         self.statements = statements
 
@@ -38,13 +50,50 @@ class Block(Stmt):
         return visitor.visit_block(self)
 
 class Expression(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
+    kind = 1
+
     def __init__(self, expression):
         self.expression = expression
 
     def accept(self, visitor):
         return visitor.visit_expression(self)
 
+class For_stmt(Stmt):
+    __slots__ = ('initializer', 'condition', 'increment', 'body', 'frame_size')
+    __match_args__ = ('initializer', 'condition', 'increment', 'body')
+    kind = 2
+
+    def __init__(self, initializer, condition, increment, body):
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+
+    def accept(self, visitor):
+        return visitor.visit_for_stmt(self)
+
+class For_range(Stmt):
+    __slots__ = ('name', 'start', 'operator', 'end', 'body', 'slot', 'frame_size')
+    __match_args__ = ('name', 'start', 'operator', 'end', 'body')
+    kind = 3
+
+    def __init__(self, name, start, operator, end, body):
+        self.name = name
+        self.start = start
+        self.operator = operator
+        self.end = end
+        self.body = body
+
+    def accept(self, visitor):
+        return visitor.visit_for_range(self)
+
 class Function(Stmt):
+    __slots__ = ('name', 'params', 'body', 'slot', 'frame_size', 'pure')
+    __match_args__ = ('name', 'params', 'body')
+    kind = 4
+
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
@@ -54,6 +103,10 @@ class Function(Stmt):
         return visitor.visit_function(self)
 
 class If_stmt(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+    __match_args__ = ('condition', 'then_branch', 'else_branch')
+    kind = 5
+
     def __init__(self, condition, then_branch, else_branch):
         self.condition = condition
         self.then_branch = then_branch
@@ -63,6 +116,10 @@ class If_stmt(Stmt):
         return visitor.visit_if_stmt(self)
 
 class Print(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
+    kind = 6
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -70,6 +127,10 @@ class Print(Stmt):
         return visitor.visit_print(self)
 
 class Return_stmt(Stmt):
+    __slots__ = ('keyword', 'value')
+    __match_args__ = ('keyword', 'value')
+    kind = 7
+
     def __init__(self, keyword, value):
         self.keyword = keyword
         self.value = value
@@ -78,6 +139,10 @@ class Return_stmt(Stmt):
         return visitor.visit_return_stmt(self)
 
 class Var(Stmt):
+    __slots__ = ('name', 'initializer', 'slot')
+    __match_args__ = ('name', 'initializer')
+    kind = 8
+
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
@@ -86,6 +151,10 @@ class Var(Stmt):
         return visitor.visit_var(self)
 
 class While_stmt(Stmt):
+    __slots__ = ('condition', 'body')
+    __match_args__ = ('condition', 'body')
+    kind = 9
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -93,3 +162,16 @@ class While_stmt(Stmt):
     def accept(self, visitor):
         return visitor.visit_while_stmt(self)
 
+# visit method of each kind of stmt, indexed by the kind of its class
+STMT_VISITS = (
+    "visit_block",
+    "visit_expression",
+    "visit_for_stmt",
+    "visit_for_range",
+    "visit_function",
+    "visit_if_stmt",
+    "visit_print",
+    "visit_return_stmt",
+    "visit_var",
+    "visit_while_stmt",
+)
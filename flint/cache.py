@@ -0,0 +1,142 @@
+#################
+# On-disk cache of parsed scripts
+#################
+import gc
+import hashlib
+import marshal
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from flint import __version__
+
+CACHE_DIR_NAME = "__flintcache__"
+
+# bump whenever the AST classes change in a way old pickles can't represent,
+# or the Python generated by the transpiler changes
+CACHE_FORMAT = 6
+CACHE_TAG = f"flint-{__version__}-ast{CACHE_FORMAT}-{sys.implementation.cache_tag}"
+
+
+def cache_file(script_path: str, source: str, cache_dir: str = None, kind: str = "pickle") -> str:
+    """
+    Returns the path of the cache entry for `source` read from `script_path`.
+
+    Entries live in `__flintcache__` next to the script unless `cache_dir` is
+    given, and are named after the script and two hashes: one of its
+    absolute path, so scripts of the same name sharing a `cache_dir` keep
+    their own entries, and one of the source and of the interpreter
+    version, so a stale entry is never picked up. Their extension is the
+    `kind` of entry: "pickle" for parsed statements, "code" for the
+    marshaled code object of a transpiled script.
+    """
+    digest = hashlib.sha256(CACHE_TAG.encode())
+    digest.update(source.encode("utf-8"))
+    
+    script_path = os.path.abspath(script_path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(script_path), CACHE_DIR_NAME)
+    name = os.path.basename(script_path)
+    location = hashlib.sha256(script_path.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}.{location}.{digest.hexdigest()[:32]}.{kind}")
+
+
+def load(script_path: str, source: str, cache_dir: str = None):
+    """
+    Returns the statements cached for `source`, or None on a cache miss.
+    Unreadable or corrupt entries count as misses, and so do entries that
+    aren't `trusted`: unpickling runs code, so only entries that nobody
+    but the current user could have written are loaded.
+    """
+    # unpickling a large AST allocates millions of objects at once, which
+    # would trigger the cyclic garbage collector over and over
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return read(cache_file(script_path, source, cache_dir), pickle.load)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def load_code(script_path: str, source: str, cache_dir: str = None):
+    """Returns the code object cached for `source`, or None on a cache miss."""
+    return read(cache_file(script_path, source, cache_dir, "code"), marshal.load)
+
+
+def read(path: str, load):
+    """Loads the entry at `path` with `load`, or returns None if it can't."""
+    try:
+        if not trusted(os.stat(os.path.dirname(path))):
+            return None
+        with open(path, "rb") as file:
+            if not trusted(os.fstat(file.fileno())):
+                return None
+            return load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+
+
+def trusted(status: os.stat_result) -> bool:
+    """
+    Tells whether a cache entry or directory with the given `status` is
+    owned by the current user and can't be written by anyone else.
+    """
+    if not hasattr(os, "getuid"):
+        return True     # no owners or permission bits to check on Windows
+    return status.st_uid == os.getuid() and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def store(script_path: str, source: str, statements, cache_dir: str = None) -> bool:
+    """
+    Caches the statements parsed from `source`.
+
+    The entry is written to a temporary file that is then renamed over the
+    final path, so concurrent runs never see a partially written entry.
+    Entries of older versions of the same script are removed. Nothing is
+    written to a directory that isn't `trusted`. Failing to write the cache
+    is not an error; it only means the next run parses again.
+
+    Returns:
+        bool: True if the entry was written.
+    """
+    return write(cache_file(script_path, source, cache_dir), statements,
+                 lambda value, file: pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def store_code(script_path: str, source: str, code, cache_dir: str = None) -> bool:
+    """Caches the code object of the script transpiled from `source`, like `store`."""
+    return write(cache_file(script_path, source, cache_dir, "code"), code, marshal.dump)
+
+
+def write(path: str, value, dump) -> bool:
+    """
+    Atomically writes `value` with `dump` at `path` and removes the entries
+    of the same kind for older versions of the script.
+    """
+    directory, name = os.path.split(path)
+    temp_path = None
+    try:
+        # private to the user whatever the umask, or `trusted` would reject it
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not trusted(os.stat(directory)):
+            return False
+        with tempfile.NamedTemporaryFile("wb", dir=directory, prefix=f".{name}.", delete=False) as file:
+            temp_path = file.name
+            dump(value, file)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PicklingError, RecursionError, ValueError):
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+    # drop the entries of previous versions of this script, named alike up to the source hash
+    script_name, _, kind = name.rsplit(".", 2)
+    for entry in os.listdir(directory):
+        if entry != name and entry.endswith(f".{kind}") and entry.rsplit(".", 2)[0] == script_name:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
+    return True
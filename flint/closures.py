@@ -0,0 +1,622 @@
+from operator import eq, ne, gt, ge, lt, le, sub, mul
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.token_types import TokenType
+from flint.runtime_error import CustomRunTimeError
+from flint.environment import Frame
+from flint.flint_callable import FlintCallable, NativeFunction
+from flint.flint_function import FlintFunction
+from flint.interpreter import Interpreter
+from flint.return_stmt import TailCall
+from flint.parser import LazyBody
+from flint.arrays import get_index, set_index, get_slice
+from tools.raise_error import runtime_error
+
+
+# operators whose operands must be numbers, mapped to their implementation
+NUMERIC_OPERATORS = {
+    TokenType.GREATER_THAN: gt,
+    TokenType.GREATER_THAN_EQUAL: ge,
+    TokenType.LESS_THAN: lt,
+    TokenType.LESS_THAN_EQUAL: le,
+    TokenType.MINUS: sub,
+    TokenType.ASTERISK: mul,
+}
+
+# for the values of Flint (nil, booleans, floats, strings and callables)
+# Python's equality matches Interpreter.is_equal
+EQUALITY_OPERATORS = {
+    TokenType.EQUAL_EQUAL: eq,
+    TokenType.EXCLAMATION_EQUAL: ne,
+}
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Execution engine that compiles the program into Python closures.
+
+    Every node is compiled once, by `ClosureCompiler`, into a closure with
+    its operator already selected and the closures of its children
+    captured, so running the program is just calling closures: there is
+    no `accept`/`visit_*` double dispatch and no `if`/`elif` chain over the
+    operator left at runtime.
+
+    The tree-walking methods are inherited, so the optimizer can still
+    evaluate expressions with `evaluate`.
+    """
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.compiler = ClosureCompiler(self)
+
+
+    def interpret(self, statements):
+        """
+        Compiles and executes a list of statements sequentially, reporting
+        runtime errors.
+        """
+        try:
+            for statement in statements:
+                if statement is not None:
+                    self.compiler.compile_stmt(statement)(self.globals)
+        except CustomRunTimeError as error:
+            runtime_error(error)
+
+
+
+class CompiledFunction(FlintFunction):
+    """A Flint function whose body was compiled into a closure."""
+
+    def __init__(self, declaration, body):
+        super().__init__(declaration)
+        self.body = body
+        self.frame_size = declaration.frame_size
+        self.param_count = len(declaration.params)
+
+
+    def call(self, interpreter, arguments):
+        # parameters take the first slots of the call's frame
+        frame = Frame(self.frame_size, interpreter.globals)
+        frame.values[:len(arguments)] = arguments
+        returned = self.body(frame)
+        if type(returned) is tuple:
+            return returned[0]
+        if returned is None:
+            return None
+        return run_tail_calls(interpreter, returned)
+
+
+
+class LazyCompiledFunction(CompiledFunction):
+    """
+    A function whose body hasn't been parsed yet. The first call parses
+    and compiles it with `compile_body`, after which the function is a plain
+    `CompiledFunction`.
+    """
+
+    def __init__(self, declaration, compile_body):
+        FlintFunction.__init__(self, declaration)
+        self.compile_body = compile_body
+        self.param_count = len(declaration.params)
+
+
+    def call(self, interpreter, arguments):
+        self.body = self.compile_body()
+        self.frame_size = self.declaration.frame_size
+        del self.compile_body
+        self.__class__ = CompiledFunction
+        return CompiledFunction.call(self, interpreter, arguments)
+
+
+
+def run_tail_calls(interpreter, tail_call):
+    """
+    Makes the call returned by a `return` in tail position, and the ones
+    it returns in turn, in a loop instead of nesting them.
+    """
+    globals = interpreter.globals
+    while True:
+        function, arguments = tail_call.callee, tail_call.arguments
+        if type(function) is not CompiledFunction or len(arguments) != function.param_count:
+            return interpreter.call_function(tail_call.expr, function, arguments)
+
+        frame = Frame(function.frame_size, globals)
+        frame.values[:len(arguments)] = arguments
+        tail_call = function.body(frame)
+        if type(tail_call) is tuple:
+            return tail_call[0]
+        if tail_call is None:
+            return None
+
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """
+    Compiles resolved statements and expressions into closures.
+
+    Every closure takes the current frame: a `Frame` inside blocks and
+    functions, or the global `Environment` at the top level. Expression
+    closures return their value. Statement closures return None, or a
+    1-tuple holding the value of a `return` statement that was reached, so
+    returning from a function doesn't need to raise an exception.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+
+
+    def compile_stmt(self, stmt):
+        return stmt.accept(self)
+
+
+    def compile_expr(self, expr):
+        return expr.accept(self)
+
+
+    def compile_block(self, statements):
+        """Compiles a list of statements into a single closure."""
+        closures = tuple(self.compile_stmt(s) for s in statements if s is not None)
+        if len(closures) == 1:
+            return closures[0]
+
+        def sequence(frame):
+            for closure in closures:
+                returned = closure(frame)
+                if returned is not None:
+                    return returned
+        return sequence
+
+
+    ############################################
+    # Statements
+    ############################################
+
+    def compile_loop_body(self, body):
+        """
+        Compiles the body of a loop, returning its closure and the size of
+        the frame the loop allocates once for all its iterations (see
+        `Interpreter.loop_frame`), or 0 when it runs in the loop's frame.
+        """
+        if type(body) is Block and body.frame_size:
+            return self.compile_block(body.statements), body.frame_size
+        return self.compile_stmt(body), 0
+
+
+    def visit_block(self, stmt):
+        body = self.compile_block(stmt.statements)
+        size = stmt.frame_size
+        if not size:
+            return body     # declares nothing, runs in the enclosing frame
+
+        def block(frame):
+            return body(Frame(size, frame))
+        return block
+
+
+    def visit_expression(self, stmt):
+        expression = self.compile_expr(stmt.expression)
+
+        def expression_stmt(frame):
+            expression(frame)   # the value is discarded, not returned
+        return expression_stmt
+
+
+    def visit_function(self, stmt):
+        if type(stmt.body) is LazyBody:
+            return self.lazy_function(stmt)
+
+        body = self.compile_block(stmt.body)
+        slot = stmt.slot
+
+        memoize = self.interpreter.memoize
+
+        if slot is None:
+            name = stmt.name
+            define = self.globals.define
+            def function(frame):
+                define(name, memoize(stmt, CompiledFunction(stmt, body)))
+        else:
+            def function(frame):
+                frame.values[slot] = memoize(stmt, CompiledFunction(stmt, body))
+        return function
+
+
+    def lazy_function(self, stmt):
+        """Compiles the declaration of a function whose body is parsed by its first call."""
+        compiled = []   # the body, once a first call compiled it
+        interpreter = self.interpreter
+
+        def compile_body():
+            if not compiled:
+                if type(stmt.body) is LazyBody:
+                    interpreter.parse_body(stmt)
+                compiled.append(self.compile_block(stmt.body))
+            return compiled[0]
+
+        slot = stmt.slot
+        if slot is None:
+            name = stmt.name
+            define = self.globals.define
+            def function(frame):
+                define(name, LazyCompiledFunction(stmt, compile_body))
+        else:
+            def function(frame):
+                frame.values[slot] = LazyCompiledFunction(stmt, compile_body)
+        return function
+
+
+    def visit_if_stmt(self, stmt):
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            def if_stmt(frame):
+                value = condition(frame)
+                if value is not False and value is not None:
+                    return then_branch(frame)
+            return if_stmt
+
+        else_branch = self.compile_stmt(stmt.else_branch)
+        def if_else_stmt(frame):
+            value = condition(frame)
+            if value is not False and value is not None:
+                return then_branch(frame)
+            return else_branch(frame)
+        return if_else_stmt
+
+
+    def visit_print(self, stmt):
+        expression = self.compile_expr(stmt.expression)
+        stringify = self.interpreter.stringify
+
+        def print_stmt(frame):
+            print(stringify(expression(frame)))
+        return print_stmt
+
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            return lambda frame: (None,)
+
+        if isinstance(stmt.value, Call):
+            # a tail call, made by the function call being returned from
+            expr = stmt.value
+            callee = self.compile_expr(expr.callee)
+            arguments = tuple(self.compile_expr(argument) for argument in expr.arguments)
+            return lambda frame: TailCall(expr, callee(frame), [argument(frame) for argument in arguments])
+
+        value = self.compile_expr(stmt.value)
+        return lambda frame: (value(frame),)
+
+
+    def visit_var(self, stmt):
+        if stmt.initializer is None:
+            initializer = lambda frame: None
+        else:
+            initializer = self.compile_expr(stmt.initializer)
+        slot = stmt.slot
+
+        if slot is None:
+            name = stmt.name
+            define = self.globals.define
+            def global_var(frame):
+                define(name, initializer(frame))
+            return global_var
+
+        def local_var(frame):
+            frame.values[slot] = initializer(frame)
+        return local_var
+
+
+    def visit_while_stmt(self, stmt):
+        condition = self.compile_expr(stmt.condition)
+        body, body_size = self.compile_loop_body(stmt.body)
+
+        def while_stmt(frame):
+            body_frame = Frame(body_size, frame) if body_size else frame
+            value = condition(frame)
+            while value is not False and value is not None:
+                returned = body(body_frame)
+                if returned is not None:
+                    return returned
+                value = condition(frame)
+        return while_stmt
+
+
+    def visit_for_stmt(self, stmt):
+        initializer = None if stmt.initializer is None else self.compile_stmt(stmt.initializer)
+        condition = (lambda frame: True) if stmt.condition is None else self.compile_expr(stmt.condition)
+        increment = (lambda frame: None) if stmt.increment is None else self.compile_expr(stmt.increment)
+        body, body_size = self.compile_loop_body(stmt.body)
+        size = stmt.frame_size
+
+        def for_stmt(frame):
+            if size:
+                frame = Frame(size, frame)  # the loop variables, for every iteration
+            if initializer is not None:
+                initializer(frame)
+            body_frame = Frame(body_size, frame) if body_size else frame
+            value = condition(frame)
+            while value is not False and value is not None:
+                returned = body(body_frame)
+                if returned is not None:
+                    return returned
+                increment(frame)
+                value = condition(frame)
+        return for_stmt
+
+
+    def visit_for_range(self, stmt):
+        start = self.compile_expr(stmt.start)
+        end = self.compile_expr(stmt.end)
+        body, body_size = self.compile_loop_body(stmt.body)
+        operator, slot, size = stmt.operator, stmt.slot, stmt.frame_size
+        range_count = self.interpreter.range_count
+
+        def for_range(frame):
+            first = start(frame)
+            count = range_count(operator, first, end(frame))
+            frame = Frame(size, frame)
+            body_frame = Frame(body_size, frame) if body_size else frame
+            values = frame.values
+            first = float(first)
+            for counter in range(count):
+                values[slot] = first + counter
+                returned = body(body_frame)
+                if returned is not None:
+                    return returned
+        return for_range
+
+
+    ############################################
+    # Expressions
+    ############################################
+
+    def visit_literal(self, expr):
+        value = expr.value
+        return lambda frame: value
+
+
+    def visit_grouping(self, expr):
+        return self.compile_expr(expr.expression)
+
+
+    def visit_array(self, expr):
+        elements = tuple(self.compile_expr(element) for element in expr.elements)
+        return lambda frame: [element(frame) for element in elements]
+
+
+    def visit_index(self, expr):
+        array = self.compile_expr(expr.object)
+        index = self.compile_expr(expr.index)
+        bracket = expr.bracket
+
+        def index_get(frame):
+            values = array(frame)
+            i = index(frame)
+            # an index in the array takes no checks besides the types
+            if type(values) is list and type(i) is float and -len(values) <= i < len(values) and i.is_integer():
+                return values[int(i)]
+            return get_index(bracket, values, i)
+        return index_get
+
+
+    def visit_set_index(self, expr):
+        array = self.compile_expr(expr.object)
+        index = self.compile_expr(expr.index)
+        value = self.compile_expr(expr.value)
+        bracket = expr.bracket
+        return lambda frame: set_index(bracket, array(frame), index(frame), value(frame))
+
+
+    def visit_slice(self, expr):
+        array = self.compile_expr(expr.object)
+        start = (lambda frame: None) if expr.start is None else self.compile_expr(expr.start)
+        end = (lambda frame: None) if expr.end is None else self.compile_expr(expr.end)
+        bracket = expr.bracket
+        return lambda frame: get_slice(bracket, array(frame), start(frame), end(frame))
+
+
+    def visit_variable(self, expr):
+        depth, slot = expr.depth, expr.slot
+
+        if depth is None:
+            name = expr.name
+            lexeme = name.lexeme
+            values = self.globals.values
+            get = self.globals.get
+            def global_variable(frame):
+                try:
+                    return values[lexeme]
+                except KeyError:
+                    return get(name)    # reports the undefined variable
+            return global_variable
+
+        if depth == 0:
+            return lambda frame: frame.values[slot]
+
+        if depth == 1:
+            return lambda frame: frame.enclosing.values[slot]
+
+        def variable(frame):
+            for _ in range(depth):
+                frame = frame.enclosing
+            return frame.values[slot]
+        return variable
+
+
+    def visit_assign(self, expr):
+        value = self.compile_expr(expr.value)
+        depth, slot = expr.depth, expr.slot
+
+        if depth is None:
+            name = expr.name
+            assign = self.globals.assign
+            def global_assign(frame):
+                result = value(frame)
+                assign(name, result)
+                return result
+            return global_assign
+
+        def assign_local(frame):
+            result = value(frame)
+            target = frame
+            for _ in range(depth):
+                target = target.enclosing
+            target.values[slot] = result
+            return result
+        return assign_local
+
+
+    def visit_logical(self, expr):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.type == TokenType.KEYWORD_OR:
+            def logical_or(frame):
+                value = left(frame)
+                if value is not False and value is not None:
+                    return value
+                return right(frame)
+            return logical_or
+
+        def logical_and(frame):
+            value = left(frame)
+            if value is False or value is None:
+                return value
+            return right(frame)
+        return logical_and
+
+
+    def visit_unary(self, expr):
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.type == TokenType.EXCLAMATION:
+            def negation(frame):
+                value = right(frame)
+                return value is False or value is None
+            return negation
+
+        operator = expr.operator
+        check_number_operand = self.interpreter.check_number_operand
+        def minus(frame):
+            value = right(frame)
+            check_number_operand(operator, value)
+            return -float(value)
+        return minus
+
+
+    def visit_binary(self, expr):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+        kind = operator.type
+
+        if kind in EQUALITY_OPERATORS:
+            compare = EQUALITY_OPERATORS[kind]
+            return lambda frame: compare(left(frame), right(frame))
+
+        if kind == TokenType.PLUS:
+            def plus(frame):
+                a = left(frame)
+                b = right(frame)
+                if type(a) is float and type(b) is float:
+                    return a + b
+                if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                    return float(a) + float(b)
+                if isinstance(a, str) and isinstance(b, str):
+                    return a + b
+                raise CustomRunTimeError(operator, "Operands must be two numbers or two strings.")
+            return plus
+
+        check_number_operands = self.interpreter.check_number_operands
+
+        if kind == TokenType.FORWARD_SLASH:
+            def divide(frame):
+                a = left(frame)
+                b = right(frame)
+                check_number_operands(operator, a, b)
+                try:
+                    return float(a) / float(b)
+                except ZeroDivisionError:
+                    raise CustomRunTimeError(operator, "Division by zero is not allowed.")
+            return divide
+
+        function = NUMERIC_OPERATORS[kind]
+        constant = self.number_constant(expr.right)
+        if constant is not None:
+            # the right operand is known to be a number, only check the left
+            def numeric_constant(frame):
+                a = left(frame)
+                if type(a) is float:
+                    return function(a, constant)
+                check_number_operands(operator, a, constant)
+                return function(float(a), constant)
+            return numeric_constant
+
+        def numeric(frame):
+            a = left(frame)
+            b = right(frame)
+            if type(a) is float and type(b) is float:
+                return function(a, b)
+            check_number_operands(operator, a, b)
+            return function(float(a), float(b))
+        return numeric
+
+
+    def number_constant(self, expr):
+        """Returns the value of `expr` if it is a number literal, else None."""
+        if isinstance(expr, Literal) and type(expr.value) is float:
+            return expr.value
+        return None
+
+
+    def visit_call(self, expr):
+        callee = self.compile_expr(expr.callee)
+        arguments = tuple(self.compile_expr(argument) for argument in expr.arguments)
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        globals = self.globals
+
+        def call(frame):
+            function = callee(frame)
+            values = [argument(frame) for argument in arguments]
+
+            # fast path for Flint functions called with the right arguments
+            if type(function) is CompiledFunction and len(values) == function.param_count:
+                if interpreter.call_depth == interpreter.max_call_depth:
+                    raise CustomRunTimeError(paren, "Stack overflow.")
+                callee_frame = Frame(function.frame_size, globals)
+                callee_frame.values[:len(values)] = values
+                interpreter.call_depth += 1
+                try:
+                    returned = function.body(callee_frame)
+                except RecursionError:
+                    raise CustomRunTimeError(paren, "Stack overflow.") from None
+                finally:
+                    interpreter.call_depth -= 1
+                if type(returned) is tuple:
+                    return returned[0]
+                if returned is None:
+                    return None
+                return run_tail_calls(interpreter, returned)
+
+            if type(function) is NativeFunction and function.accepts(len(values)):
+                try:
+                    return function.function(*values)
+                except CustomRunTimeError as error:
+                    raise error.located(paren)
+
+            if not isinstance(function, FlintCallable):
+                raise CustomRunTimeError(paren, "Can only call functions and classes.")
+
+            if not function.accepts(len(values)):
+                raise CustomRunTimeError(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+
+            try:
+                return interpreter.enter_call(expr, function, values)
+            except RecursionError:
+                raise CustomRunTimeError(paren, "Stack overflow.") from None
+        return call
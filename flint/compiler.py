@@ -0,0 +1,424 @@
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.token_types import TokenType
+from flint.flint_callable import FlintCallable
+
+
+# opcodes, followed in the code by the number of operands in OPERAND_COUNTS
+OPCODE_NAMES = (
+    "CONSTANT", "POP",
+    "GET_LOCAL", "SET_LOCAL", "DEFINE_LOCAL",
+    "GET_GLOBAL", "SET_GLOBAL", "DEFINE_GLOBAL",
+    "ADD", "SUBTRACT", "MULTIPLY", "DIVIDE",
+    "GREATER", "GREATER_EQUAL", "LESS", "LESS_EQUAL", "EQUAL", "NOT_EQUAL",
+    "NOT", "NEGATE",
+    "JUMP", "JUMP_IF_FALSE", "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP",
+    "RANGE", "FOR_ITER",
+    "ARRAY", "GET_INDEX", "SET_INDEX", "SLICE",
+    "CALL", "TAIL_CALL", "RETURN", "PRINT",
+)
+(CONSTANT, POP,
+ GET_LOCAL, SET_LOCAL, DEFINE_LOCAL,
+ GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL,
+ ADD, SUBTRACT, MULTIPLY, DIVIDE,
+ GREATER, GREATER_EQUAL, LESS, LESS_EQUAL, EQUAL, NOT_EQUAL,
+ NOT, NEGATE,
+ JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+ RANGE, FOR_ITER,
+ ARRAY, GET_INDEX, SET_INDEX, SLICE,
+ CALL, TAIL_CALL, RETURN, PRINT) = range(len(OPCODE_NAMES))
+
+OPERAND_COUNTS = [1] * len(OPCODE_NAMES)
+for opcode in (POP, EQUAL, NOT_EQUAL, NOT, RETURN, PRINT):
+    OPERAND_COUNTS[opcode] = 0
+OPERAND_COUNTS[CALL] = OPERAND_COUNTS[TAIL_CALL] = OPERAND_COUNTS[RANGE] = 2
+OPERAND_COUNTS[FOR_ITER] = 3
+
+# binary operators whose operand is the operator token, for error reporting
+BINARY_OPCODES = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.ASTERISK: MULTIPLY,
+    TokenType.FORWARD_SLASH: DIVIDE,
+    TokenType.GREATER_THAN: GREATER,
+    TokenType.GREATER_THAN_EQUAL: GREATER_EQUAL,
+    TokenType.LESS_THAN: LESS,
+    TokenType.LESS_THAN_EQUAL: LESS_EQUAL,
+}
+
+
+class BytecodeFunction(FlintCallable):
+    """
+    A Flint function, or a whole script, compiled to bytecode.
+
+    `code` is a flat list of opcodes, each followed by its operands: indexes
+    into the `constants` pool, local slots, absolute jump targets or, for
+    `CALL`, the argument count. A range loop keeps its next value and its
+    limit in two hidden slots after its variable, which `RANGE` sets up and
+    `FOR_ITER` advances. `ARRAY` takes its element count. `lines` holds the source line of every entry
+    of `code`. Locals, including the ones of nested blocks, live in a single
+    list of `frame_size` slots per call, the parameters taking the first ones.
+    """
+    __slots__ = ("name", "arity_count", "frame_size", "code", "constants", "lines")
+
+    def __init__(self, name, arity_count):
+        self.name = name
+        self.arity_count = arity_count
+        self.frame_size = arity_count
+        self.code = []
+        self.constants = []
+        self.lines = []
+
+
+    def arity(self):
+        return self.arity_count
+
+
+    def call(self, interpreter, arguments):
+        return interpreter.run(self, arguments)
+
+
+    def to_string(self):
+        return f"<fn {self.name}>"
+
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    """
+    Lowers resolved statements into a `BytecodeFunction` for the `VM`.
+
+    The resolver addresses a local by the block frame it lives in (`depth`)
+    and its `slot` there. As functions can't see the locals of enclosing
+    functions, every block of a function is instead given a range of the
+    function's own slots, and a local is addressed by its absolute slot.
+    """
+
+    def __init__(self):
+        self.function = None
+        self.constant_indexes = {}  # indexes of the simple constants of the current function
+        self.scopes = []    # (first slot, size) of the open blocks of the current function
+        self.line = 0       # line of the last token seen, for the line table
+
+
+    def compile(self, statements, name="script"):
+        """Compiles top-level statements into a function taking no arguments."""
+        script = BytecodeFunction(name, 0)
+        self.compile_function(script, statements, [])
+        return script
+
+
+    def compile_function(self, function, body, scopes):
+        enclosing = self.function, self.constant_indexes, self.scopes
+        self.function, self.constant_indexes, self.scopes = function, {}, scopes
+
+        for statement in body:
+            self.compile_stmt(statement)
+        self.emit_constant(None)
+        self.emit(RETURN)
+
+        self.function, self.constant_indexes, self.scopes = enclosing
+
+
+    def compile_stmt(self, stmt):
+        if stmt is not None:
+            stmt.accept(self)
+
+
+    def compile_expr(self, expr):
+        expr.accept(self)
+
+
+    ############################################
+    # Emitting code
+    ############################################
+
+    def emit(self, *words):
+        """Appends an opcode and its operands, returning the offset of the opcode."""
+        code = self.function.code
+        offset = len(code)
+        code.extend(words)
+        self.function.lines.extend([self.line] * len(words))
+        return offset
+
+
+    def make_constant(self, value):
+        constants = self.function.constants
+        if isinstance(value, FlintCallable) or hasattr(value, "lexeme"):
+            # tokens and functions are never shared
+            constants.append(value)
+            return len(constants) - 1
+
+        # share simple values, keyed by type too as 1.0 == True in Python,
+        # and floats by their bits, so that 0.0 and -0.0 stay apart
+        key = (type(value), value.hex() if type(value) is float else value)
+        index = self.constant_indexes.get(key)
+        if index is None:
+            index = self.constant_indexes[key] = len(constants)
+            constants.append(value)
+        return index
+
+
+    def emit_constant(self, value):
+        self.emit(CONSTANT, self.make_constant(value))
+
+
+    def emit_jump(self, opcode):
+        """Emits a jump to be patched later, returning the offset to patch."""
+        return self.emit(opcode, -1) + 1
+
+
+    def patch_jump(self, offset):
+        """Makes the jump at `offset` land at the end of the code."""
+        self.function.code[offset] = len(self.function.code)
+
+
+    def local_slot(self, depth, slot):
+        """Converts a resolved (depth, slot) into an absolute slot of the function."""
+        first, _ = self.scopes[-1 - depth]
+        return first + slot
+
+
+    def declare_slot(self, slot, name):
+        """Stores the value on top of the stack in a new variable."""
+        if slot is None:
+            self.emit(DEFINE_GLOBAL, self.make_constant(name))
+        else:
+            self.emit(DEFINE_LOCAL, self.local_slot(0, slot))
+
+
+    ############################################
+    # Statements
+    ############################################
+
+    def begin_scope(self, size):
+        """Gives the next `size` slots of the function to a new scope, returning the first."""
+        if self.scopes:
+            first, enclosing_size = self.scopes[-1]
+            first += enclosing_size
+        else:
+            first = 0
+        self.scopes.append((first, size))
+        self.function.frame_size = max(self.function.frame_size, first + size)
+        return first
+
+
+    def visit_block(self, stmt):
+        # a block declaring nothing has no scope of its own
+        if stmt.frame_size:
+            self.begin_scope(stmt.frame_size)
+        for statement in stmt.statements:
+            self.compile_stmt(statement)
+        if stmt.frame_size:
+            self.scopes.pop()
+
+
+    def visit_for_stmt(self, stmt):
+        if stmt.frame_size:
+            self.begin_scope(stmt.frame_size)
+        self.compile_stmt(stmt.initializer)
+
+        loop_start = len(self.function.code)
+        exit_jump = None
+        if stmt.condition is not None:
+            self.compile_expr(stmt.condition)
+            exit_jump = self.emit_jump(JUMP_IF_FALSE)
+
+        self.compile_stmt(stmt.body)
+        if stmt.increment is not None:
+            self.compile_expr(stmt.increment)
+            self.emit(POP)
+        self.emit(JUMP, loop_start)
+
+        if exit_jump is not None:
+            self.patch_jump(exit_jump)
+        if stmt.frame_size:
+            self.scopes.pop()
+
+
+    def visit_for_range(self, stmt):
+        self.compile_expr(stmt.start)
+        self.compile_expr(stmt.end)
+
+        # the two hidden slots follow the slots of the loop's scope
+        first = self.begin_scope(stmt.frame_size + 2)
+        hidden = first + stmt.frame_size
+        self.line = stmt.operator.line
+        self.emit(RANGE, hidden, self.make_constant(stmt.operator))
+
+        loop_start = self.emit(FOR_ITER, hidden, self.local_slot(0, stmt.slot), -1)
+        self.compile_stmt(stmt.body)
+        self.emit(JUMP, loop_start)
+        self.patch_jump(loop_start + 3)
+        self.scopes.pop()
+
+
+    def visit_expression(self, stmt):
+        self.compile_expr(stmt.expression)
+        self.emit(POP)
+
+
+    def visit_function(self, stmt):
+        function = BytecodeFunction(stmt.name.lexeme, len(stmt.params))
+        function.frame_size = stmt.frame_size
+        self.compile_function(function, stmt.body, [(0, stmt.frame_size)])
+
+        self.line = stmt.name.line
+        self.emit_constant(function)
+        self.declare_slot(stmt.slot, stmt.name)
+
+
+    def visit_if_stmt(self, stmt):
+        self.compile_expr(stmt.condition)
+        else_jump = self.emit_jump(JUMP_IF_FALSE)
+        self.compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit_jump(JUMP)
+        self.patch_jump(else_jump)
+        self.compile_stmt(stmt.else_branch)
+        self.patch_jump(end_jump)
+
+
+    def visit_print(self, stmt):
+        self.compile_expr(stmt.expression)
+        self.emit(PRINT)
+
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            self.emit_constant(None)
+        elif isinstance(stmt.value, Call):
+            # a Flint function called in tail position takes over the frame,
+            # the result of any other callee is returned by the RETURN
+            self.compile_call(stmt.value, TAIL_CALL)
+        else:
+            self.compile_expr(stmt.value)
+        self.emit(RETURN)
+
+
+    def visit_var(self, stmt):
+        self.line = stmt.name.line
+        if stmt.initializer is None:
+            self.emit_constant(None)
+        else:
+            self.compile_expr(stmt.initializer)
+        self.declare_slot(stmt.slot, stmt.name)
+
+
+    def visit_while_stmt(self, stmt):
+        loop_start = len(self.function.code)
+        self.compile_expr(stmt.condition)
+        exit_jump = self.emit_jump(JUMP_IF_FALSE)
+        self.compile_stmt(stmt.body)
+        self.emit(JUMP, loop_start)
+        self.patch_jump(exit_jump)
+
+
+    ############################################
+    # Expressions
+    ############################################
+
+    def visit_assign(self, expr):
+        self.compile_expr(expr.value)
+        self.line = expr.name.line
+        if expr.depth is None:
+            self.emit(SET_GLOBAL, self.make_constant(expr.name))
+        else:
+            self.emit(SET_LOCAL, self.local_slot(expr.depth, expr.slot))
+
+
+    def visit_binary(self, expr):
+        self.compile_expr(expr.left)
+        self.compile_expr(expr.right)
+        self.line = expr.operator.line
+
+        kind = expr.operator.type
+        if kind == TokenType.EQUAL_EQUAL:
+            self.emit(EQUAL)
+        elif kind == TokenType.EXCLAMATION_EQUAL:
+            self.emit(NOT_EQUAL)
+        else:
+            self.emit(BINARY_OPCODES[kind], self.make_constant(expr.operator))
+
+
+    def visit_call(self, expr):
+        self.compile_call(expr, CALL)
+
+
+    def compile_call(self, expr, opcode):
+        self.compile_expr(expr.callee)
+        for argument in expr.arguments:
+            self.compile_expr(argument)
+        self.line = expr.paren.line
+        self.emit(opcode, len(expr.arguments), self.make_constant(expr.paren))
+
+
+    def visit_grouping(self, expr):
+        self.compile_expr(expr.expression)
+
+
+    def visit_array(self, expr):
+        for element in expr.elements:
+            self.compile_expr(element)
+        self.line = expr.bracket.line
+        self.emit(ARRAY, len(expr.elements))
+
+
+    def visit_index(self, expr):
+        self.compile_expr(expr.object)
+        self.compile_expr(expr.index)
+        self.line = expr.bracket.line
+        self.emit(GET_INDEX, self.make_constant(expr.bracket))
+
+
+    def visit_set_index(self, expr):
+        self.compile_expr(expr.object)
+        self.compile_expr(expr.index)
+        self.compile_expr(expr.value)
+        self.line = expr.bracket.line
+        self.emit(SET_INDEX, self.make_constant(expr.bracket))
+
+
+    def visit_slice(self, expr):
+        self.compile_expr(expr.object)
+        for bound in (expr.start, expr.end):
+            if bound is None:
+                self.emit_constant(None)
+            else:
+                self.compile_expr(bound)
+        self.line = expr.bracket.line
+        self.emit(SLICE, self.make_constant(expr.bracket))
+
+
+    def visit_literal(self, expr):
+        self.emit_constant(expr.value)
+
+
+    def visit_logical(self, expr):
+        self.compile_expr(expr.left)
+        if expr.operator.type == TokenType.KEYWORD_OR:
+            end_jump = self.emit_jump(JUMP_IF_TRUE_OR_POP)
+        else:
+            end_jump = self.emit_jump(JUMP_IF_FALSE_OR_POP)
+        self.compile_expr(expr.right)
+        self.patch_jump(end_jump)
+
+
+    def visit_unary(self, expr):
+        self.compile_expr(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.type == TokenType.EXCLAMATION:
+            self.emit(NOT)
+        else:
+            self.emit(NEGATE, self.make_constant(expr.operator))
+
+
+    def visit_variable(self, expr):
+        self.line = expr.name.line
+        if expr.depth is None:
+            self.emit(GET_GLOBAL, self.make_constant(expr.name))
+        else:
+            self.emit(GET_LOCAL, self.local_slot(expr.depth, expr.slot))
@@ -1,12 +1,22 @@
 from flint.runtime_error import CustomRunTimeError
+from flint.flint_callable import NativeFunction
+from itertools import count
 import json
+import sys
+
+
+# versions of the environments, unique across all of them so that a version
+# read from one environment never matches another
+VERSIONS = count()
 
 
 class Environment:
     def __init__(self, enclosing=None):
-        # dictionary to store variable names and their associated values
+        # dictionary to store variable names and their associated values,
+        # keyed by the names interned in the program's SymbolTable
         self.values = {}
         self.enclosing = enclosing      # reference to the outer scope (None for global scope)
+        self.version = next(VERSIONS)   # changes whenever a variable is defined or assigned
         
         
     def get(self, name):
@@ -49,6 +59,7 @@ class Environment:
         if lexeme in self.values:
             # Variable exists in current environment, reassigned
             self.values[lexeme] = value
+            self.version = next(VERSIONS)
             return
         
         if self.enclosing is not None:
@@ -65,7 +76,9 @@ class Environment:
         """
         Defines a new variable in the environment.
         
-        Prevents redefinition of variables in the same scope.
+        Prevents redefinition of variables in the same scope. Natives can
+        be redefined, so a program declaring a name that a newer native
+        took keeps running.
         
         Args:
             name (str): The name of the variable.
@@ -75,13 +88,14 @@ class Environment:
             RuntimeError: If the variable is already defined in the current scope.
     
         """
-        key = name.lexeme if hasattr(name, 'lexeme') else name
+        key = name.lexeme if hasattr(name, 'lexeme') else sys.intern(name)
         
         # Check if the variable already exists and raise an error
-        if key in self.values:
+        if key in self.values and not isinstance(self.values[key], NativeFunction):
             raise CustomRunTimeError(name, f"Variable '{key}' already defined in the current scope.")
     
         self.values[key] = value
+        self.version = next(VERSIONS)
         # print(f"Defined {key} in the environment with value {value}")
         
         
@@ -93,3 +107,17 @@ class Environment:
         except Exception as e:
             print(f"Error logging environment state: {e}")
 
+
+class Frame:
+    """
+    Storage for the local variables of a block or function call.
+
+    Locals are addressed by the slot the `Resolver` assigned to them, so
+    reads and writes are list indexing instead of dictionary lookups along
+    the chain of enclosing environments. Globals stay in `Environment`.
+    """
+    __slots__ = ("values", "enclosing")
+    
+    def __init__(self, size, enclosing):
+        self.values = [None] * size
+        self.enclosing = enclosing      # frame of the enclosing block, or the globals
@@ -0,0 +1,396 @@
+#################
+# Flat, array-backed encoding of the AST
+#################
+import mmap
+import struct
+import sys
+from array import array
+from flint.ast.expr import Expr
+from flint.ast.stmt import Stmt
+from flint.line_index import LineIndex
+from flint.token import Token
+from flint.token_types import TokenType
+
+MAGIC = b"FLINTAST"
+FLAT_FORMAT = 3     # bump whenever the layout of the sections or the AST classes change
+
+# classes of the nodes by code: the expressions by kind, then the statements
+NODE_CLASSES = [
+    *sorted((cls for cls in Expr.__subclasses__() if cls.__module__ == Expr.__module__), key=lambda cls: cls.kind),
+    *sorted((cls for cls in Stmt.__subclasses__() if cls.__module__ == Stmt.__module__), key=lambda cls: cls.kind),
+]
+NODE_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES)}
+
+# what an operand of a node is
+NONE, NODE, TOKEN, CONSTANT, LIST, ABSENT = range(6)
+
+# what a constant is
+NONE_CONSTANT, FALSE, TRUE, FLOAT, STRING, INTEGER = range(6)
+
+# name and typecode of the arrays of a flat AST, in the order they are written
+SECTIONS = (
+    ("kinds", "B"),                 # code of the class of each node
+    ("starts", "i"),                # first operand of each node, then the end of the last one
+    ("tags", "B"),                  # what each operand is
+    ("operands", "i"),              # index of a node, token or constant, or length of a list
+    ("roots", "i"),                 # nodes of the top-level statements
+    ("token_types", "B"),           # TokenType values
+    ("token_lexemes", "i"),         # string of the lexeme
+    ("token_literals", "i"),        # constant of the literal
+    ("token_offsets", "q"),         # offset in the source, -1 when unknown
+    ("token_lines", "i"),           # line, -1 when computed from the offset
+    ("token_line_indexes", "i"),    # LineIndex of the token, -1 when it has none
+    ("token_symbols", "i"),         # symbol id, -1 for other than identifiers
+    ("constant_tags", "B"),         # what each constant is
+    ("constant_values", "q"),       # float or string of the constant, or the integer
+    ("floats", "d"),
+    ("string_starts", "i"),         # offset of each string in the data, then its end
+    ("string_data", "B"),           # UTF-8 text of the strings
+    ("line_index_positions", "q"),  # line and column of the first character, per LineIndex
+    ("newline_starts", "i"),        # first newline of each LineIndex, then the end
+    ("newlines", "q"),              # offsets of the newlines of all the LineIndexes
+)
+
+HEADER = struct.Struct(f"=8sII{len(SECTIONS)}q")   # magic, format, byte order, length of each section
+ALIGNMENT = 8
+
+
+class FlatAst:
+    """
+    The AST of a program as parallel arrays instead of a graph of objects.
+
+    Nodes are numbered children first, so a node only refers to nodes
+    before it. Each has a kind, the code of its class in `NODE_CLASSES`,
+    and a run of operands, one per constructor field and then one per
+    annotation the passes after the parser set, like the resolver's slots.
+    Tokens, constants (literal values, annotation values) and strings live in
+    pools of their own, referred to by index. Nodes or tokens reached more
+    than once are stored once.
+
+    `dump` writes the arrays as they are in memory, and `load` maps such a
+    file and reads the arrays in place through memoryviews, so loading
+    costs nothing per node. `to_statements` builds the object AST back.
+
+    Only the AST of a program that hasn't run can be flattened: the
+    interpreter's quickened nodes and inline caches aren't part of it.
+    """
+
+    __slots__ = tuple(name for name, _ in SECTIONS)
+
+    def __init__(self):
+        for name, typecode in SECTIONS:
+            setattr(self, name, array(typecode))
+
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+    ############################################
+    # Conversion from and to the object AST
+    ############################################
+
+    @classmethod
+    def from_statements(cls, statements):
+        """Returns the flat encoding of the top-level `statements`."""
+        flat = cls()
+        encoder = Encoder(flat)
+        for statement in statements:
+            flat.roots.append(encoder.add_node(statement))
+        flat.starts.append(len(flat.tags))
+        encoder.finish()
+        return flat
+
+
+    def to_statements(self):
+        """Returns the top-level statements, as a new object AST."""
+        strings = self.strings()
+        constants = [self.constant(index, strings) for index in range(len(self.constant_tags))]
+        line_indexes = [self.line_index(index) for index in range(len(self.line_index_positions) // 2)]
+
+        tokens = []
+        for index in range(len(self.token_types)):
+            offset, line, line_index = self.token_offsets[index], self.token_lines[index], self.token_line_indexes[index]
+            tokens.append(Token(
+                TokenType(self.token_types[index]),
+                sys.intern(strings[self.token_lexemes[index]]),
+                constants[self.token_literals[index]],
+                None if line < 0 else line,
+                None if offset < 0 else offset,
+                None if line_index < 0 else line_indexes[line_index],
+                self.token_symbols[index]))
+
+        nodes = []
+        tags, operands, starts = self.tags, self.operands, self.starts
+        pools = {NODE: nodes, TOKEN: tokens, CONSTANT: constants}
+
+        unset = object()    # value of an annotation the node didn't have
+
+        def value(position):
+            tag = tags[position]
+            return None if tag == NONE else pools[tag][operands[position]]
+
+        for index, code in enumerate(self.kinds):
+            node_class = NODE_CLASSES[code]
+            values = []
+            position, end = starts[index], starts[index + 1]
+            while position < end:
+                tag = tags[position]
+                if tag == LIST:
+                    count = operands[position]
+                    values.append([value(item) for item in range(position + 1, position + 1 + count)])
+                    position += 1 + count
+                else:
+                    values.append(unset if tag == ABSENT else value(position))
+                    position += 1
+
+            field_count = len(node_class.__match_args__)
+            node = node_class(*values[:field_count])
+            for name, annotation in zip(node_class.__slots__[field_count:], values[field_count:]):
+                if annotation is not unset:
+                    setattr(node, name, annotation)
+            nodes.append(node)
+
+        return [nodes[root] for root in self.roots]
+
+
+    def strings(self):
+        """Returns the decoded strings of the string pool."""
+        data, starts = self.string_data, self.string_starts
+        return [str(data[starts[index]:starts[index + 1]], "utf-8") for index in range(len(starts) - 1)]
+
+
+    def constant(self, index, strings):
+        tag, value = self.constant_tags[index], self.constant_values[index]
+        if tag == FLOAT:
+            return self.floats[value]
+        if tag == STRING:
+            return strings[value]
+        if tag == INTEGER:
+            return value
+        return (None, False, True)[tag]
+
+
+    def line_index(self, index):
+        line, column = self.line_index_positions[2 * index:2 * index + 2]
+        start, end = self.newline_starts[index], self.newline_starts[index + 1]
+        line_index = LineIndex.__new__(LineIndex)
+        # like an unpickled LineIndex, it knows the newlines but not the source
+        line_index.__setstate__((line, column, array("q", self.newlines[start:end])))
+        return line_index
+
+
+    ############################################
+    # Binary format
+    ############################################
+
+    def to_bytes(self):
+        """Returns the binary encoding read back by `from_buffer`."""
+        sections = [getattr(self, name) for name, _ in SECTIONS]
+        byte_order = 1 if sys.byteorder == "little" else 0
+        parts = [HEADER.pack(MAGIC, FLAT_FORMAT, byte_order, *(len(section) for section in sections))]
+        for section in sections:
+            data = bytes(section)
+            parts.append(data)
+            parts.append(bytes(-len(data) % ALIGNMENT))
+        return b"".join(parts)
+
+
+    def dump(self, file):
+        """Writes the binary encoding to the binary `file`."""
+        file.write(self.to_bytes())
+
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Returns the flat AST encoded in `buffer`, whose arrays are views
+        into the buffer rather than copies.
+
+        Raises:
+            ValueError: If `buffer` isn't a flat AST of this version written
+                on a machine of the same byte order.
+        """
+        view = memoryview(buffer).cast("B")
+        if len(view) < HEADER.size:
+            raise ValueError("Not a flat AST.")
+        magic, flat_format, byte_order, *lengths = HEADER.unpack_from(view)
+        if magic != MAGIC or flat_format != FLAT_FORMAT:
+            raise ValueError("Not a flat AST of this version.")
+        if byte_order != (1 if sys.byteorder == "little" else 0):
+            raise ValueError("Flat AST written with another byte order.")
+
+        flat = cls.__new__(cls)
+        offset = HEADER.size
+        for (name, typecode), length in zip(SECTIONS, lengths):
+            size = length * array(typecode).itemsize
+            if offset + size > len(view):
+                raise ValueError("Truncated flat AST.")
+            setattr(flat, name, view[offset:offset + size].cast(typecode))
+            offset += size + (-size % ALIGNMENT)
+        return flat
+
+
+    @classmethod
+    def load(cls, path):
+        """Maps the file at `path`, written by `dump`, and returns its flat AST."""
+        with open(path, "rb") as file:
+            # the mapping outlives the file, for as long as the views use it
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer)
+
+
+
+class Encoder:
+    """Appends nodes, and the tokens, constants and strings they use, to a `FlatAst`."""
+
+    def __init__(self, flat):
+        self.flat = flat
+        self.nodes = {}         # id of a node -> its index
+        self.tokens = {}        # id of a token -> its index
+        self.constants = {}     # (type, value) -> index of the constant
+        self.strings = {}       # string -> its index
+        self.line_indexes = {}  # id of a LineIndex -> its index
+        self.string_data = bytearray()
+        # keeps the encoded objects alive so their ids stay theirs
+        self.encoded = []
+
+
+    def add_node(self, root):
+        """Appends `root` and the nodes under it, children first, and returns its index."""
+        if root is None:
+            raise ValueError("Can't flatten a statement that failed to parse.")
+
+        stack = [(root, False)]
+        while stack:
+            node, children_added = stack.pop()
+            if id(node) in self.nodes:
+                continue
+            if children_added:
+                self.emit(node)
+                continue
+
+            stack.append((node, True))
+            for name in reversed(type(node).__slots__):
+                value = getattr(node, name, None)
+                children = value if type(value) is list else [value]
+                for child in reversed(children):
+                    if isinstance(child, (Expr, Stmt)) and id(child) not in self.nodes:
+                        stack.append((child, False))
+        return self.nodes[id(root)]
+
+
+    def emit(self, node):
+        """Appends `node`, whose children were all added."""
+        flat = self.flat
+        node_class = type(node)
+        if node_class not in NODE_CODES:
+            raise ValueError(f"Can't flatten a {node_class.__name__} node.")
+
+        flat.starts.append(len(flat.tags))
+        field_count = len(node_class.__match_args__)
+        for position, name in enumerate(node_class.__slots__):
+            if position >= field_count and not hasattr(node, name):
+                self.append(ABSENT, 0)
+                continue
+            value = getattr(node, name)
+            if type(value) is list:
+                self.append(LIST, len(value))
+                for item in value:
+                    self.operand(item)
+            else:
+                self.operand(value)
+
+        self.nodes[id(node)] = len(flat.kinds)
+        flat.kinds.append(NODE_CODES[node_class])
+        self.encoded.append(node)
+
+
+    def append(self, tag, operand):
+        self.flat.tags.append(tag)
+        self.flat.operands.append(operand)
+
+
+    def operand(self, value):
+        if value is None:
+            self.append(NONE, 0)
+        elif isinstance(value, (Expr, Stmt)):
+            self.append(NODE, self.nodes[id(value)])
+        elif isinstance(value, Token):
+            self.append(TOKEN, self.token(value))
+        else:
+            self.append(CONSTANT, self.constant(value))
+
+
+    def token(self, token):
+        index = self.tokens.get(id(token))
+        if index is not None:
+            return index
+
+        flat = self.flat
+        index = self.tokens[id(token)] = len(flat.token_types)
+        flat.token_types.append(token.type)
+        flat.token_lexemes.append(self.string(token.lexeme))
+        flat.token_literals.append(self.constant(token.literal))
+        flat.token_offsets.append(-1 if token.offset is None else token.offset)
+        # the line as the token knows it, None until it is computed from the offset
+        flat.token_lines.append(-1 if token._line is None else token._line)
+        flat.token_line_indexes.append(-1 if token.lines is None else self.line_index(token.lines))
+        flat.token_symbols.append(token.symbol)
+        self.encoded.append(token)
+        return index
+
+
+    def constant(self, value):
+        # floats by their bits, so that 0.0 and -0.0 stay apart
+        key = (type(value), value.hex() if type(value) is float else value)
+        index = self.constants.get(key)
+        if index is not None:
+            return index
+
+        flat = self.flat
+        if value is None or type(value) is bool:
+            tag, encoded = (NONE_CONSTANT if value is None else TRUE if value else FALSE), 0
+        elif type(value) is float:
+            tag, encoded = FLOAT, len(flat.floats)
+            flat.floats.append(value)
+        elif type(value) is str:
+            tag, encoded = STRING, self.string(value)
+        elif type(value) is int:
+            tag, encoded = INTEGER, value
+        else:
+            raise ValueError(f"Can't flatten the value {value!r}.")
+
+        index = self.constants[key] = len(flat.constant_tags)
+        flat.constant_tags.append(tag)
+        flat.constant_values.append(encoded)
+        return index
+
+
+    def string(self, value):
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.flat.string_starts)
+            self.flat.string_starts.append(len(self.string_data))
+            self.string_data += value.encode("utf-8")
+        return index
+
+
+    def line_index(self, line_index):
+        index = self.line_indexes.get(id(line_index))
+        if index is None:
+            flat = self.flat
+            index = self.line_indexes[id(line_index)] = len(flat.newline_starts)
+            flat.line_index_positions.extend((line_index.line, line_index.column))
+            flat.newline_starts.append(len(flat.newlines))
+            flat.newlines.extend(line_index.newlines)
+            self.encoded.append(line_index)
+        return index
+
+
+    def finish(self):
+        """Closes the pools whose arrays end with the end of their last item."""
+        flat = self.flat
+        flat.string_starts.append(len(self.string_data))
+        flat.string_data.frombytes(self.string_data)
+        flat.newline_starts.append(len(flat.newlines))
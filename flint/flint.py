@@ -3,17 +3,54 @@
 #############################################
 
 import sys
+import threading
 from tools.raise_error import *
-from flint.scanner import Scanner
+from tools import raise_error
+from flint.scanner import StreamScanner, TokenStream, ENGINES
 from flint.parser import Parser
-from flint.interpreter import Interpreter
+from flint.interpreter import Interpreter, MAX_CALL_DEPTH
+from flint.closures import ClosureInterpreter
+from flint.vm import VM
+from flint.transpiler import PythonInterpreter
+from flint.compiler import Compiler
 from flint.environment import Environment   
+from flint.symbol_table import SymbolTable
+from flint.optimizer import Optimizer
+from flint.resolver import Resolver
+from flint.memoization import PurityAnalyzer, MEMO_SIZE
+from flint import cache
+from tools.disassembler import disassemble
+
+# execution engines selected with --engine=<engine>
+INTERPRETERS = {
+    "tree": Interpreter,
+    "closures": ClosureInterpreter,
+    "vm": VM,
+    "python": PythonInterpreter,
+}
+
+# Python frames a Flint call may take in the tree-walking interpreter, with
+# some nesting of statements and expressions, to size the recursion limit
+FRAMES_PER_CALL = 50
+STACK_SIZE = 512 * 1024 * 1024      # C stack of the thread running Flint
 
 class Flint:
 
     had_error = False
     had_runtime_error = False
     global_environment = Environment()      # shared environment for REPL
+    symbol_table = SymbolTable()            # identifiers interned across runs
+    scanner_engine = None                   # selected with --scanner=<engine>, classic by default
+    stream = False                          # selected with --stream
+    use_cache = True                        # disabled with --no-cache
+    cache_dir = None                        # selected with --cache-dir=<dir>
+    optimize = True                         # disabled with --no-optimize
+    engine = "tree"                         # selected with --engine=<engine>
+    disassemble = False                     # selected with --disassemble
+    max_depth = MAX_CALL_DEPTH              # selected with --max-depth=<calls>
+    memo_size = None                        # selected with --memoize[=<entries>]
+    memo_stats = False                      # selected with --memo-stats
+    lazy = False                            # selected with --lazy
 
     @staticmethod
     def main() -> None:
@@ -24,29 +61,158 @@ class Flint:
         run a script file or enter REPL (Read-Eval-Print Loop) mode.
 
         Usage:
-            Flint [script]
+            Flint [options] [script]
+
+        Options:
+            --scanner=<engine>  Scanner engine to use: "classic" or "regex".
+                                Streamed input is always scanned by "regex".
+            --stream            Execute each top-level declaration as soon as
+                                it is parsed instead of reading the whole script.
+            --no-cache          Don't read or write the cache of parsed scripts.
+            --cache-dir=<dir>   Keep the cache of parsed scripts in <dir> instead
+                                of a __flintcache__ directory next to the script.
+            --no-optimize       Don't fold constant expressions before running.
+            --engine=<engine>   Execution engine to use: "tree" walks the AST,
+                                "closures" compiles it into Python closures first
+                                "vm" compiles it to bytecode for a stack VM and
+                                "python" transpiles it to Python.
+            --disassemble       Print the bytecode of the script instead of
+                                running it.
+            --max-depth=<calls> Deepest chain of calls before a "Stack overflow."
+                                runtime error, tail calls left out.
+            --memoize[=<entries>]
+                                Cache the results of the functions found to be
+                                pure, keeping the last <entries> calls of each.
+                                Only applies to scripts run whole by the "tree"
+                                and "closures" engines.
+            --memo-stats        Print the cache statistics of the memoized
+                                functions after running.
+            --lazy              Parse the body of a function when it is first
+                                called instead of upfront. Only applies to
+                                scripts run whole by the "tree" and "closures"
+                                engines, without --memoize.
 
         If a script file is provided as an argument, it runs the script.
-        If no arguments are provided, it starts the REPL mode.
+        A script named "-" is streamed from the standard input, which is also
+        the default when no arguments are provided and the input is piped.
+        Otherwise, it starts the REPL mode.
 
-        Exits with status code 64 if more than one argument is provided.
+        Exits with status code 64 if more than one argument or an unknown
+        option is provided.
         """
-        if len(sys.argv) > 2:
-            print("Usage: Flint [script]")
-            sys.exit(64)
-        elif len(sys.argv) == 2:
-            Flint.run_file(sys.argv[1])
+        args = Flint.parse_options(sys.argv[1:])
+        Flint.with_deep_stack(Flint.start, args)
+
+
+    @staticmethod
+    def start(args):
+        """Runs the script, the streamed input or the REPL selected by `args`."""
+        if len(args) > 1:
+            Flint.usage()
+        elif len(args) == 1 and args[0] == "-":
+            Flint.run_stream(sys.stdin, Flint.global_environment)
+        elif len(args) == 1:
+            Flint.run_file(args[0])
+        elif not sys.stdin.isatty():
+            # a script piped into flint
+            Flint.run_stream(sys.stdin, Flint.global_environment)
         else:
             # for REPL mode
             Flint.run_prompt()
 
 
+    @staticmethod
+    def with_deep_stack(function, *args):
+        """
+        Calls `function` in a thread whose stack and recursion limit fit
+        `max_depth` nested Flint calls, and returns its result.
+
+        Python's default recursion limit only allows a few nested Flint
+        calls in the tree-walking interpreter, each of which takes many
+        Python frames.
+        """
+        outcome = {}
+        def target():
+            try:
+                outcome["result"] = function(*args)
+            except BaseException as error:
+                outcome["error"] = error
+
+        recursion_limit = sys.getrecursionlimit()
+        stack_size = threading.stack_size()
+        sys.setrecursionlimit(max(recursion_limit, Flint.max_depth * FRAMES_PER_CALL))
+        try:
+            threading.stack_size(STACK_SIZE)
+            # a daemon, not to keep the process alive on an interrupt
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join()
+        finally:
+            threading.stack_size(stack_size)
+            sys.setrecursionlimit(recursion_limit)
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+
+    @staticmethod
+    def usage():
+        print("Usage: Flint [--scanner=classic|regex] [--stream] [--no-cache] [--cache-dir=<dir>] [--no-optimize] [--engine=tree|closures|vm|python] [--disassemble] [--max-depth=<calls>] [--memoize[=<entries>]] [--memo-stats] [--lazy] [script | -]")
+        sys.exit(64)
+
+
+    @staticmethod
+    def parse_options(argv):
+        """
+        Applies the `--name=value` options found in `argv` and returns the
+        remaining positional arguments.
+        """
+        args = []
+        for arg in argv:
+            if not arg.startswith("--"):
+                args.append(arg)
+                continue
+            
+            name, _, value = arg.partition("=")
+            if name == "--scanner" and value in ENGINES:
+                Flint.scanner_engine = value
+            elif arg == "--stream":
+                Flint.stream = True
+            elif arg == "--no-cache":
+                Flint.use_cache = False
+            elif name == "--cache-dir" and value:
+                Flint.cache_dir = value
+            elif arg == "--no-optimize":
+                Flint.optimize = False
+            elif name == "--engine" and value in INTERPRETERS:
+                Flint.engine = value
+            elif arg == "--disassemble":
+                Flint.disassemble = True
+            elif name == "--max-depth" and value.isdigit() and int(value) > 0:
+                Flint.max_depth = int(value)
+            elif arg == "--memoize":
+                Flint.memo_size = MEMO_SIZE
+            elif name == "--memoize" and value.isdigit() and int(value) > 0:
+                Flint.memo_size = int(value)
+            elif arg == "--memo-stats":
+                Flint.memo_stats = True
+            elif arg == "--lazy":
+                Flint.lazy = True
+            else:
+                Flint.usage()
+        return args
+
+
     @staticmethod
     def run_file(path):
         try:
             with open(path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                Flint.run(content, Flint.global_environment)
+                if Flint.stream:
+                    Flint.run_stream(file, Flint.global_environment)
+                else:
+                    content = file.read()
+                    Flint.run(content, Flint.global_environment, path=path)
                 
             # Log the environment state after running the file
             # Flint.global_environment.log_environment("debug/environment_state.json")
@@ -87,35 +253,154 @@ class Flint:
                 break
             Flint.run(line, Flint.global_environment, is_repl_mode=True)
             Flint.had_error = False
+            raise_error.had_error = False
 
 
     @staticmethod
-    def run(source, environment, is_repl_mode=False):
+    def run(source, environment, is_repl_mode=False, path=None):
         """
         Compiles and executes the given source code.
+
+        When the source was read from the script at `path`, its parsed
+        statements are loaded from (or saved to) the on-disk cache so an
+        unchanged script isn't scanned and parsed again. With the python
+        engine, the code object of the transpiled script is cached as well.
+        
+        With --lazy, function bodies are parsed by the first call of their
+        function, and a script parsed that way isn't cached: the cache keeps
+        whole programs.
         """
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens, is_repl_mode=is_repl_mode)
-    
-        statements = parser.parse()
+        interpreter = INTERPRETERS[Flint.engine](environment)  # use shared environment
+        interpreter.max_call_depth = Flint.max_depth
+        interpreter.optimize_bodies = Flint.optimize
+        use_cache = path is not None and Flint.use_cache
+        # the other engines and passes need every body upfront
+        lazy = (Flint.lazy and not is_repl_mode and Flint.engine in ("tree", "closures")
+                and Flint.memo_size is None and not Flint.disassemble)
+        transpile = isinstance(interpreter, PythonInterpreter) and not Flint.disassemble
+
+        if use_cache and transpile:
+            code = cache.load_code(path, source, Flint.cache_dir)
+            if code is not None:
+                interpreter.run_code(code)
+                return
+
+        statements = None
+        if use_cache:
+            statements = cache.load(path, source, Flint.cache_dir)
+            
+        if statements is None:
+            statements = Flint.parse(source, is_repl_mode, lazy)
     
-        # Stop further processing if there were syntax errors
-        if statements is None or had_error:
+            # Stop further processing if there were syntax errors
+            if statements is None or raise_error.had_error:
+                return
+            
+            if use_cache and not lazy:
+                cache.store(path, source, statements, Flint.cache_dir)
+        
+        if Flint.optimize:
+            statements = Optimizer(interpreter).optimize(statements)
+            
+        # address local variables by slot, stop on static errors
+        Resolver().resolve(statements)
+        if raise_error.had_error:
             return
-    
-        interpreter = Interpreter(environment)  # use shared environment
+        
+        # a line of the REPL isn't the whole program the analysis needs
+        if Flint.memo_size is not None and not is_repl_mode:
+            PurityAnalyzer().analyze(statements)
+            interpreter.memo_size = Flint.memo_size
+        
+        if Flint.disassemble:
+            print(disassemble(Compiler().compile(statements)))
+            return
+        
+        if use_cache and transpile:
+            try:
+                code = interpreter.compile(statements)
+            except (SyntaxError, RecursionError, MemoryError):
+                pass    # interpret() falls back to walking the tree
+            else:
+                cache.store_code(path, source, code, Flint.cache_dir)
+                interpreter.run_code(code)
+                return
     
         # Try to interpret the valid expression
         try:
             interpreter.interpret(statements)
-        except RuntimeError as runtime_err:
-            from tools.raise_error import runtime_error
-            runtime_error(runtime_err)
+        except RecursionError:
+            # nesting of statements or expressions deeper than the stack allows
+            runtime_error(CustomRunTimeError(None, "Stack overflow."))
+        
+        if Flint.memo_stats:
+            for function in interpreter.memoized:
+                print(f"[memo] {function.stats()}", file=sys.stderr)
             
         # After execution, log the environment state
         # environment.log_environment("debug/environment_state.json")
 
 
+    @staticmethod
+    def parse(source, is_repl_mode=False, lazy_bodies=False):
+        """
+        Scans and parses the given source code into a list of statements,
+        leaving function bodies unparsed with `lazy_bodies`.
+        """
+        scanner = ENGINES[Flint.scanner_engine or "classic"](source, Flint.symbol_table)
+        tokens = scanner.scan_tokens()
+        parser = Parser(tokens, is_repl_mode=is_repl_mode, lazy_bodies=lazy_bodies)
+    
+        return parser.parse()
+
+
+    @staticmethod
+    def run_stream(file, environment):
+        """
+        Scans, parses and executes the source read from `file` one top-level
+        declaration at a time.
+
+        Neither the source nor the full token or statement lists are ever
+        materialized, so memory stays bounded for arbitrarily large inputs
+        and output appears as soon as the first declaration is parsed.
+        Execution stops at the first syntax error, but the rest of the input
+        is still parsed so every error gets reported.
+        
+        Streaming is done by the regex scanner, so it exits with status 64
+        when the classic scanner was asked for.
+        """
+        if Flint.scanner_engine == "classic":
+            print("Error: --scanner=classic can't stream, streamed input is scanned by the regex scanner.", file=sys.stderr)
+            sys.exit(64)
+        
+        tokens = TokenStream(StreamScanner(file, Flint.symbol_table).scan_tokens())
+        parser = Parser(tokens, is_repl_mode=False)
+        interpreter = INTERPRETERS[Flint.engine](environment)
+        interpreter.max_call_depth = Flint.max_depth
+        optimizer = Optimizer(interpreter) if Flint.optimize else None
+        resolver = Resolver()
+
+        def valid_statements():
+            for statement in parser.declarations():
+                if raise_error.had_error:
+                    continue
+                if optimizer is not None:
+                    statement = optimizer.optimize_stmt(statement)
+                resolver.resolve_stmt(statement)
+                if raise_error.had_error:
+                    continue
+                yield statement
+
+        if Flint.disassemble:
+            for statement in valid_statements():
+                print(disassemble(Compiler().compile([statement])))
+            return
+
+        try:
+            interpreter.interpret(valid_statements())
+        except RecursionError:
+            runtime_error(CustomRunTimeError(None, "Stack overflow."))
+
+
 if __name__ == '__main__':
     Flint.main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from inspect import signature, Parameter
 import time
 
 class FlintCallable(ABC):
@@ -26,18 +27,98 @@ class FlintCallable(ABC):
         pass
     
     
+    def accepts(self, count):
+        """
+        Tells whether the callable can be called with `count` arguments
+        """
+        return count == self.arity()
+    
+    
+    def python_function(self, interpreter):
+        """
+        Returns a Python function taking the arguments of a call
+        positionally, for natives calling the callable back
+        """
+        return lambda *arguments: self.call(interpreter, list(arguments))
+    
+    
 #############################
 # Native functions in Flint #
 #############################
 
-class ClockCallable(FlintCallable):
+# name -> NativeFunction, defined in the globals of every interpreter
+NATIVES = {}
+
+
+class NativeFunction(FlintCallable):
+    """
+    A Python function callable from Flint.
+    
+    `function` takes the Flint arguments as positional arguments, so the
+    engines call it directly once they checked the number of arguments
+    against `arity_count`, which is None when the function is variadic.
+    """
+    __slots__ = ("name", "function", "arity_count")
+    
+    def __init__(self, name, function, arity_count):
+        self.name = name
+        self.function = function
+        self.arity_count = arity_count
+        
     def arity(self):
-        return 0
+        return self.arity_count
+    
+    def accepts(self, count):
+        return self.arity_count is None or count == self.arity_count
     
     def call(self, interpreter, arguments):
-        current_time = time.time()  # Returns time in seconds since the epoch
-        return current_time
+        return self.function(*arguments)
+    
+    def python_function(self, interpreter):
+        return self.function
     
     def to_string(self):
         return "<native fn>"
 
+
+class InterpreterNative(NativeFunction):
+    """
+    A native taking the interpreter running it before its Flint arguments,
+    so it can call the callables it is given. The engines' fast path for
+    natives leaves it out, and it is called through `call`.
+    """
+    __slots__ = ()
+    
+    def call(self, interpreter, arguments):
+        return self.function(interpreter, *arguments)
+    
+    def python_function(self, interpreter):
+        return FlintCallable.python_function(self, interpreter)
+
+
+def native(name, takes_interpreter=False):
+    """
+    Decorator registering a Python function as the native `name` of Flint.
+    
+    Its arity is the number of its parameters, and a function taking
+    `*arguments` is variadic. With `takes_interpreter`, the first parameter
+    is the interpreter instead of a Flint argument.
+    """
+    def register(function):
+        parameters = list(signature(function).parameters.values())
+        if takes_interpreter:
+            parameters = parameters[1:]
+        if any(parameter.kind == Parameter.VAR_POSITIONAL for parameter in parameters):
+            arity_count = None
+        else:
+            arity_count = len(parameters)
+        kind = InterpreterNative if takes_interpreter else NativeFunction
+        NATIVES[name] = kind(name, function, arity_count)
+        return function
+    return register
+
+
+@native("clock")
+def clock():
+    return time.time()  # Returns time in seconds since the epoch
+
@@ -1,6 +1,7 @@
-from flint.environment import Environment
+from flint.environment import Frame
 from flint.flint_callable import FlintCallable
-from flint.return_stmt import Return_stmts
+from flint.return_stmt import TailCall
+from flint.parser import LazyBody
 
 class FlintFunction(FlintCallable):
     
@@ -14,22 +15,33 @@ class FlintFunction(FlintCallable):
     def call(self, interpreter, arguments):
         """
         Calls the function with the given arguments.
+
+        A `return` of another call hands back a `TailCall` instead of making
+        it, and tail calls of Flint functions are then run here, one after
+        the other, in place of this one.
         """
-        environment = Environment(interpreter.globals)
-        for i, param in enumerate(self.declaration.params):
-            environment.define(param.lexeme, arguments[i])
+        function = self
+        while True:
+            # parameters take the first slots of the call's frame
+            declaration = function.declaration
+            environment = Frame(declaration.frame_size, interpreter.globals)
+            environment.values[:len(arguments)] = arguments
 
-        try:
             # Execute the function body within the new environment
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return_stmts as r:
-            # If a return statement is raised, return its value
-            return r.value
+            completion = interpreter.execute_block(declaration.body, environment)
+            if completion is None:
+                return None
+
+            if type(completion) is not TailCall:
+                # a return statement was reached, return its value
+                return completion.value
+
+            function, arguments = completion.callee, completion.arguments
+            if type(function) is not FlintFunction or len(arguments) != len(function.declaration.params):
+                return interpreter.call_function(completion.expr, function, arguments)
+
 
-        return None
 
-    
-    
     def arity(self):
         """
         Returns the number of parameters the function takes.
@@ -41,4 +53,17 @@ class FlintFunction(FlintCallable):
         """
         Returns the string representation of the function.
         """
-        return f"<fn {self.declaration.name.lexeme}>"
\ No newline at end of file
+        return f"<fn {self.declaration.name.lexeme}>"
+
+
+class LazyFunction(FlintFunction):
+    """
+    A function whose body hasn't been parsed yet. The first call parses
+    it, after which the function is a plain `FlintFunction`.
+    """
+    
+    def call(self, interpreter, arguments):
+        if type(self.declaration.body) is LazyBody:
+            interpreter.parse_body(self.declaration)
+        self.__class__ = FlintFunction
+        return FlintFunction.call(self, interpreter, arguments)
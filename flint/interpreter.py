@@ -1,11 +1,24 @@
 # Imports
+import math
 from flint.token_types import TokenType
 from flint.runtime_error import CustomRunTimeError
-from flint.environment import Environment
+from flint.environment import Frame
 from tools.raise_error import *
 from flint.flint_callable import *
-from .flint_function import FlintFunction
-from flint.return_stmt import Return_stmts
+from .flint_function import FlintFunction, LazyFunction
+from flint.return_stmt import Return_stmts, TailCall
+from flint.ast.expr import Binary, Call, EXPR_VISITS
+from flint.ast.stmt import Block, STMT_VISITS
+from flint.quickening import *
+from flint.memoization import MemoizedFunction
+from flint.arrays import get_index, set_index, get_slice
+from flint.optimizer import Optimizer
+from flint.resolver import Resolver
+from flint.parser import Parser, LazyBody
+from tools import raise_error
+
+
+MAX_CALL_DEPTH = 10000  # deepest chain of Flint calls before a stack overflow
 
 
 class Interpreter():
@@ -21,8 +34,27 @@ class Interpreter():
         self.globals = environment    # global environment for the interpreter
         self.environment = self.globals # start with the global environment
         
-        # define a native function "clock"
-        self.globals.define("clock", ClockCallable())
+        # visit method of each kind of node, quickened variants included, so
+        # evaluating a node is a single call instead of accept() and a visit
+        self.expr_visits = [getattr(self, visit) for visit in EXPR_VISITS + VARIANT_VISITS]
+        self.stmt_visits = [getattr(self, visit) for visit in STMT_VISITS]
+        
+        # Flint calls currently running, tail calls left out
+        self.call_depth = 0
+        self.max_call_depth = MAX_CALL_DEPTH
+        
+        # entries of the cache of each pure function, None not to memoize,
+        # and the memoized functions created so far
+        self.memo_size = None
+        self.memoized = []
+        
+        # whether the bodies parsed by their function's first call are optimized
+        self.optimize_bodies = True
+        
+        # define the native functions, once per shared environment
+        for name, function in NATIVES.items():
+            if name not in self.globals.values:
+                self.globals.define(name, function)
         
 
  
@@ -41,7 +73,9 @@ class Interpreter():
     """
         try:
             for statement in statements:
-                self.execute(statement)     # execute each statement in order
+                # the optimizer drops statements of a stream as None
+                if statement is not None:
+                    self.execute(statement)     # execute each statement in order
         except CustomRunTimeError as error:
             runtime_error(error)            # handle and report runtime errors
             
@@ -49,17 +83,16 @@ class Interpreter():
             
     def execute(self, stmt):
         """
-        Executes a statement by delegating to its accept method.
+        Executes a statement by the visit method of its kind.
 
         Args:
             stmt (Stmt): The statement to be executed.
+            
+        Returns:
+            Return_stmts: The completion of a `return` reached by the statement,
+                or None if it completed normally.
         """
-        if stmt is None:
-            # saveguard to avoid AttributeError
-            return
-        
-        
-        stmt.accept(self)   # Delegate execution to the statement's accept method.
+        return self.stmt_visits[stmt.kind](stmt)   # Delegate execution to the visit method of the statement's kind.
             
             
     def execute_block(self, statements, environment):
@@ -69,6 +102,9 @@ class Interpreter():
         Args:
             statements (list): The statements to execute.
             environment (Environment): The environment for the block's scope.
+            
+        Returns:
+            Return_stmts: The completion of a `return` reached in the block, or None.
         """
         previous = self.environment
         try:
@@ -76,11 +112,11 @@ class Interpreter():
 
             for statement in statements:
                 # Execute each statement in the block
-                result = self.execute(statement)
+                completion = self.execute(statement)
 
-                # If a return statement is encountered, exit the block
-                if isinstance(statement, Return_stmts):
-                    return result
+                # If a return statement is reached, exit the block
+                if completion is not None:
+                    return completion
         finally:
             self.environment = previous  # Restore the previous environment
 
@@ -96,11 +132,11 @@ class Interpreter():
     
     def visit_if_stmt(self, stmt):
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
             
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
-            
+            return self.execute(stmt.else_branch)
+        
         return None
     
     
@@ -114,11 +150,32 @@ class Interpreter():
             stmt: The block statement to be visited, which contains a list of statements.
 
         Returns:
-            None
+            Return_stmts: The completion of a `return` reached in the block, or None.
         """
-        # create a new environment that chains to the current one
-        environment = Environment(self.environment)
-        self.execute_block(stmt.statements, environment)
+        if not stmt.frame_size:
+            # the block declares nothing, run it in the current frame
+            for statement in stmt.statements:
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+            return None
+        
+        # create a new frame, sized by the resolver, that chains to the current one
+        frame = Frame(stmt.frame_size, self.environment)
+        return self.execute_block(stmt.statements, frame)
+    
+    
+    def loop_frame(self, body):
+        """
+        Returns the frame the body of a loop runs in at every iteration when
+        it is a block declaring variables, or None.
+
+        Functions don't capture the locals around them and the resolver only
+        lets a local be read after its declaration wrote it, so the frame can
+        be reused by the next iteration as is.
+        """
+        if type(body) is Block and body.frame_size:
+            return Frame(body.frame_size, self.environment)
         return None
     
     
@@ -151,9 +208,31 @@ class Interpreter():
         return self.evaluate(expr.expression)
     
     
+    def visit_array(self, expr):
+        """Evaluates an array literal into a new array"""
+        return [self.evaluate(element) for element in expr.elements]
+    
+    
+    def visit_index(self, expr):
+        return get_index(expr.bracket, self.evaluate(expr.object), self.evaluate(expr.index))
+    
+    
+    def visit_set_index(self, expr):
+        array = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        return set_index(expr.bracket, array, index, self.evaluate(expr.value))
+    
+    
+    def visit_slice(self, expr):
+        array = self.evaluate(expr.object)
+        start = None if expr.start is None else self.evaluate(expr.start)
+        end = None if expr.end is None else self.evaluate(expr.end)
+        return get_slice(expr.bracket, array, start, end)
+    
+    
     def evaluate(self, expr):  
-        """Evaluates the given expression by accepting the visitor""" 
-        return expr.accept(self)
+        """Evaluates the given expression by the visit method of its kind""" 
+        return self.expr_visits[expr.kind](expr)
     
     
     
@@ -178,9 +257,15 @@ class Interpreter():
         Args:
             stmt (FunctionStmt): The function declaration statement to execute
         """
-        function = FlintFunction(stmt)
-        self.environment.define(stmt.name.lexeme, function)     # define the function in the environment
-        return None                                             # return None after defining the function
+        if type(stmt.body) is LazyBody:
+            function = LazyFunction(stmt)
+        else:
+            function = self.memoize(stmt, FlintFunction(stmt))
+        if stmt.slot is None:
+            self.environment.define(stmt.name, function)            # define the function in the environment
+        else:
+            self.environment.values[stmt.slot] = function           # store it in its slot of the current frame
+        return None                                                 # return None after defining the function
         
         
         
@@ -203,11 +288,18 @@ class Interpreter():
     
     
     def visit_return_stmt(self, stmt):
+        expr = stmt.value
+        if isinstance(expr, Call):
+            # a tail call, made by the function call being returned from
+            callee = self.evaluate(expr.callee)
+            arguments = [self.evaluate(argument) for argument in expr.arguments]
+            return TailCall(expr, callee, arguments)
+        
         value = None
-        if stmt.value is not None:
-            value = self.evaluate(stmt.value)
+        if expr is not None:
+            value = self.evaluate(expr)
             
-        raise Return_stmts(value)
+        return Return_stmts(value)      # handed back up to the function call
     
     
     
@@ -225,15 +317,87 @@ class Interpreter():
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer) # evaluate the initializer expression
             
-        # define the variable in the environment with its value
-        self.environment.define(stmt.name, value)
+        # define the variable in the environment, or in its slot of the current frame
+        if stmt.slot is None:
+            self.environment.define(stmt.name, value)
+        else:
+            self.environment.values[stmt.slot] = value
         return None
     
     
     def visit_while_stmt(self, stmt):
+        condition, body = stmt.condition, stmt.body
+        frame = self.loop_frame(body)
+        
+        while self.is_truthy(self.evaluate(condition)):
+            if frame is None:
+                completion = self.execute(body)
+            else:
+                completion = self.execute_block(body.statements, frame)
+            if completion is not None:
+                return completion
+            
+        return None
+    
+    
+    
+    def visit_for_stmt(self, stmt):
+        """
+        Runs a C-style `for` loop. The frame of the loop variables is set up
+        once and the condition and increment are evaluated in place, with no
+        block or environment per iteration.
+        """
+        previous = self.environment
+        if stmt.frame_size:
+            self.environment = Frame(stmt.frame_size, previous)
+        try:
+            if stmt.initializer is not None:
+                self.execute(stmt.initializer)
+                
+            condition, increment, body = stmt.condition, stmt.increment, stmt.body
+            frame = self.loop_frame(body)
+            while condition is None or self.is_truthy(self.evaluate(condition)):
+                if frame is None:
+                    completion = self.execute(body)
+                else:
+                    completion = self.execute_block(body.statements, frame)
+                if completion is not None:
+                    return completion
+                if increment is not None:
+                    self.evaluate(increment)
+        finally:
+            self.environment = previous
+            
+        return None
+    
+    
+    
+    def visit_for_range(self, stmt):
+        """
+        Runs `for (name in start..end)`, counting with a Python integer and
+        storing the matching number in the loop variable before each
+        iteration.
+        """
+        start = self.evaluate(stmt.start)
+        end = self.evaluate(stmt.end)
+        count = self.range_count(stmt.operator, start, end)
         
-        while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+        previous = self.environment
+        frame = self.environment = Frame(stmt.frame_size, previous)
+        values, slot, body = frame.values, stmt.slot, stmt.body
+        body_frame = self.loop_frame(body)
+        start = float(start)
+        try:
+            for counter in range(count):
+                values[slot] = start + counter
+                if body_frame is None:
+                    completion = self.execute(body)
+                else:
+                    completion = self.execute_block(body.statements, body_frame)
+                if completion is not None:
+                    return completion
+        finally:
+            self.environment = previous
             
         return None
     
@@ -252,7 +416,16 @@ class Interpreter():
             The evaluated value of the assignment expression.
         """
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        depth = expr.depth
+        if depth is None:
+            self.globals.assign(expr.name, value)
+            return value
+        
+        frame = self.environment
+        while depth:
+            frame = frame.enclosing
+            depth -= 1
+        frame.values[expr.slot] = value
         return value
         
         
@@ -265,7 +438,16 @@ class Interpreter():
         Args:
             expr (VariableExpr): The variable expression to evaluate.
         """
-        return self.environment.get(expr.name)
+        depth = expr.depth
+        if depth is None:
+            return self.globals.get(expr.name)
+        
+        # walk up the number of frames computed by the resolver
+        frame = self.environment
+        while depth:
+            frame = frame.enclosing
+            depth -= 1
+        return frame.values[expr.slot]
     
     
     
@@ -290,6 +472,12 @@ class Interpreter():
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
         
+        self.quicken(expr, binary_variant(expr.operator.type, left, right))
+        return self.binary_operation(expr, left, right)
+    
+    
+    def binary_operation(self, expr, left, right):
+        """Applies the operator of a binary expression to its evaluated operands"""
         
         # handling comparision operator
         if expr.operator.type == TokenType.GREATER_THAN:
@@ -368,17 +556,181 @@ class Interpreter():
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
             
+        if self.quicken(expr, call_variant(expr, callee, arguments)) is GlobalCall:
+            expr.cache = (self.globals.version, callee)
+        return self.call_function(expr, callee, arguments)
+    
+    
+    def memoize(self, declaration, function):
+        """Wraps a new function in a cache when it is pure and memoization is on."""
+        if self.memo_size is None or not declaration.pure:
+            return function
+        
+        memoized = MemoizedFunction(function, self, self.memo_size)
+        self.memoized.append(memoized)
+        return memoized
+    
+    
+    def parse_body(self, declaration):
+        """
+        Parses, optimizes and resolves the body of a function that was left
+        as a `LazyBody`, which its first call does.
+        
+        Raises:
+            CustomRunTimeError: If the body has syntax or static errors,
+                which are reported first.
+        """
+        # only the errors of this body count
+        had_error, raise_error.had_error = raise_error.had_error, False
+        try:
+            try:
+                body = declaration.body.parse()
+            except Parser.ParseError:
+                pass    # already reported, and had_error is set
+            if not raise_error.had_error:
+                if self.optimize_bodies:
+                    body = Optimizer(self).optimize(body)
+                declaration.body = body
+                Resolver().resolve_function(declaration)
+                
+            if raise_error.had_error:
+                raise CustomRunTimeError(declaration.name, f"Can't call '{declaration.name.lexeme}', its body has errors.")
+        finally:
+            raise_error.had_error = raise_error.had_error or had_error
+    
+    
+    def call_function(self, expr, callee, arguments):
+        """Checks and calls the evaluated callee of a call expression"""
         # check if the callee is a callable
         if not isinstance(callee, FlintCallable):
             raise CustomRunTimeError(expr.paren, "Can only call functions and classes.")
         
             
         # Check if the number of arguments is correct
-        if len(arguments) != callee.arity():
+        if not callee.accepts(len(arguments)):
             raise CustomRunTimeError(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+        
+        if type(callee) is NativeFunction:
+            try:
+                return callee.function(*arguments)
+            except CustomRunTimeError as error:
+                raise error.located(expr.paren)
+        return self.enter_call(expr, callee, arguments)
     
-        # Call the function
-        return callee.call(self, arguments)
+    
+    def enter_call(self, expr, callee, arguments):
+        """Calls a checked callee, reporting a stack overflow past `max_call_depth` calls"""
+        if self.call_depth == self.max_call_depth:
+            raise CustomRunTimeError(expr.paren, "Stack overflow.")
+        
+        self.call_depth += 1
+        try:
+            return callee.call(self, arguments)
+        except CustomRunTimeError as error:
+            raise error.located(expr.paren)
+        finally:
+            self.call_depth -= 1
+    
+    
+    
+    ###########################################
+    # Quickening
+    ###########################################
+    
+    def quicken(self, expr, variant):
+        """
+        Counts an evaluation of a plain node whose operands call for `variant`,
+        and swaps the node's class for the variant once it was seen
+        QUICKEN_THRESHOLD times in a row.
+        
+        Returns:
+            The variant the node was quickened to, or None.
+        """
+        # the node's (variant it could be quickened to, evaluations seen with it)
+        try:
+            seen, count = expr.hotness
+        except AttributeError:
+            seen, count = None, 0
+        if variant is not seen and count > 0:
+            count = 0   # the types changed, start over (a cooling down count stays)
+        count += 1
+        
+        if variant is not None and count >= QUICKEN_THRESHOLD:
+            del expr.hotness
+            expr.__class__ = variant
+            return variant
+        
+        expr.hotness = (variant, count)
+        return None
+            
+            
+    def deoptimize(self, expr, plain):
+        """Turns a quickened node whose guard failed back into a `plain` node."""
+        expr.__class__ = plain
+        expr.hotness = (None, -DEOPT_BACKOFF)
+        
+        
+    def visit_number_binary(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        
+        if type(left) is float and type(right) is float:
+            try:
+                return expr.operation(left, right)
+            except ZeroDivisionError:
+                pass    # reported by the plain node
+            
+        self.deoptimize(expr, Binary)
+        return self.binary_operation(expr, left, right)
+    
+    
+    def visit_string_concat(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        
+        if type(left) is str and type(right) is str:
+            return left + right
+        
+        self.deoptimize(expr, Binary)
+        return self.binary_operation(expr, left, right)
+    
+    
+    def visit_equality(self, expr):
+        return expr.operation(self.evaluate(expr.left), self.evaluate(expr.right))
+    
+    
+    def visit_known_call(self, expr):
+        callee = self.evaluate(expr.callee)
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        
+        if type(callee) is FlintFunction and len(arguments) == len(callee.declaration.params):
+            return self.enter_call(expr, callee, arguments)
+        
+        self.deoptimize(expr, Call)
+        return self.call_function(expr, callee, arguments)
+    
+    
+    def visit_global_call(self, expr):
+        version, callee = expr.cache
+        globals = self.globals
+        
+        if version != globals.version:
+            # the globals changed since the callee was cached, which only
+            # matters if the callee did too
+            current = globals.get(expr.callee.name)
+            if current is not callee:
+                arguments = [self.evaluate(argument) for argument in expr.arguments]
+                self.deoptimize(expr, Call)
+                return self.call_function(expr, current, arguments)
+            expr.cache = (globals.version, callee)
+        
+        if type(callee) is NativeFunction:
+            arguments = [self.evaluate(argument) for argument in expr.arguments]
+            try:
+                return callee.function(*arguments)
+            except CustomRunTimeError as error:
+                raise error.located(expr.paren)
+        return self.enter_call(expr, callee, [self.evaluate(argument) for argument in expr.arguments])
     
     
     
@@ -406,7 +758,7 @@ class Interpreter():
         if isinstance(operand, (int, float)):
             return
         # custom exception
-        raise CustomRunTimeError(f"Operand must be a number for operator '{operator.lexeme}'.")
+        raise CustomRunTimeError(operator, f"Operand must be a number for operator '{operator.lexeme}'.")
         
         
     def check_number_operands(self, operator, left, right):
@@ -417,19 +769,41 @@ class Interpreter():
         raise CustomRunTimeError(operator, "Operands must be numbers")
             
             
-    def stringify(self, obj):
+    def range_count(self, operator, start, end):
+        """
+        Returns how many times the range `start..end` loops: its variable
+        takes the values start, start + 1, ... for as long as they are below end.
+        """
+        if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+            raise CustomRunTimeError(operator, "Range bounds must be numbers.")
+        try:
+            return max(0, math.ceil(end - start))
+        except (OverflowError, ValueError):
+            raise CustomRunTimeError(operator, "Range bounds must be finite numbers.")
+            
+            
+    def stringify(self, obj, enclosing=()):
         """
         Converts the given object to its string representation.
         Args:
             obj: The object to be converted to a string. It can be of any type.
+            enclosing: The arrays being converted that `obj` is an element of,
+                so an array containing itself is shown as "[...]".
         Returns:
             str: The string representation of the object. If the object is None, 
                     it returns "nil". If the object is a float and ends with ".0", 
                     the ".0" part is removed from the string representation.
+                    An array shows its elements between brackets.
         """
         if obj is None:
             return "nil"
         
+        if type(obj) is list:
+            if any(obj is array for array in enclosing):
+                return "[...]"
+            enclosing += (obj,)
+            return f"[{', '.join(self.stringify(element, enclosing) for element in obj)}]"
+        
         if isinstance(obj, float):
             text = str(obj)
             if text.endswith(".0"):
@@ -0,0 +1,65 @@
+import re
+from array import array
+from bisect import bisect_left
+
+NEWLINE = re.compile("\n")
+
+
+class LineIndex:
+    """
+    Maps offsets into a source string to line and column numbers.
+
+    The offsets of the newlines are collected the first time a position is
+    looked up, after which every lookup is a binary search. Scanning never
+    has to count lines, and positions are only computed for the tokens
+    that end up in an error report.
+
+    Args:
+        source (str): The source text.
+        line (int): The line of the first character of `source`.
+        column (int): The column of the first character of `source`.
+    """
+
+    __slots__ = ("source", "line", "column", "_newlines")
+
+    def __init__(self, source, line=1, column=1):
+        self.source = source
+        self.line = line
+        self.column = column
+        self._newlines = None
+
+
+    @property
+    def newlines(self):
+        if self._newlines is None:
+            self._newlines = array("q", [m.start() for m in NEWLINE.finditer(self.source)])
+        return self._newlines
+
+
+    def __getstate__(self):
+        # pickled ASTs only need the newline offsets, not the source text
+        return (self.line, self.column, self.newlines)
+
+
+    def __setstate__(self, state):
+        self.line, self.column, self._newlines = state
+        self.source = None
+
+
+    def line_of(self, offset):
+        """Returns the line number of the character at `offset`."""
+        return self.line + bisect_left(self.newlines, offset)
+
+
+    def column_of(self, offset):
+        """Returns the column number of the character at `offset`."""
+        newlines = self.newlines
+        count = bisect_left(newlines, offset)
+        if count == 0:
+            return self.column + offset
+        return offset - newlines[count - 1]
+
+
+    def position(self, offset):
+        """Returns the (line, column) pair of the character at `offset`."""
+        return self.line_of(offset), self.column_of(offset)
@@ -0,0 +1,263 @@
+#################
+# Memoization of pure Flint functions
+#################
+from functools import lru_cache
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.flint_callable import FlintCallable
+
+MEMO_SIZE = 1024    # calls remembered per function by default, least recently used first out
+
+
+class PurityAnalyzer(ExprVisitor, StmtVisitor):
+    """
+    Static pass marking the `Function` declarations whose result only
+    depends on their arguments, which can then be memoized.
+
+    A function is `pure` when its body doesn't print, doesn't assign a
+    global, and only reads the globals naming functions, and when every call
+    it makes is to a pure global function. Declaring a function inside it
+    makes it impure too, since a cached result would return the same
+    function object every time.
+
+    Global functions are known by name, so a name declared more than once or
+    assigned anywhere in the program is never trusted, and the analysis
+    needs the whole program: it runs after the resolver, over all the
+    statements at once.
+
+    Natives like `clock` aren't declared in the program, so calling them
+    makes a function impure. So does building an array, which a cached
+    result would share between calls, and storing into one.
+    """
+
+    def __init__(self):
+        self.functions = {}     # name -> Function declaration of the global functions
+        self.definitions = {}   # name -> times a global is declared or assigned
+        self.declarations = []  # every Function declaration, nested ones too
+        self.calls = {}         # Function -> names of the global functions it calls
+        self.current = None     # Function whose body is being walked
+        self.impure = set()
+
+
+    def analyze(self, statements):
+        """Annotates every `Function` in `statements` with `pure`."""
+        self.walk(statements)
+
+        stable = {name for name, count in self.definitions.items() if count == 1 and name in self.functions}
+        for declaration in self.declarations:
+            if not self.calls[declaration] <= stable:
+                self.impure.add(declaration)
+
+        # a function calling an impure function is impure, up to a fixpoint
+        changed = True
+        while changed:
+            changed = False
+            for declaration in self.declarations:
+                if declaration not in self.impure and any(
+                        self.functions[name] in self.impure for name in self.calls[declaration]):
+                    self.impure.add(declaration)
+                    changed = True
+
+        for declaration in self.declarations:
+            declaration.pure = declaration not in self.impure
+
+
+    def walk(self, statements):
+        for statement in statements:
+            if statement is not None:
+                statement.accept(self)
+
+
+    def walk_expr(self, expr):
+        if expr is not None:
+            expr.accept(self)
+
+
+    def define(self, name):
+        self.definitions[name.lexeme] = self.definitions.get(name.lexeme, 0) + 1
+
+
+    def taint(self):
+        """Marks the function being walked, if any, impure."""
+        if self.current is not None:
+            self.impure.add(self.current)
+
+
+    ############################################
+    # Statements
+    ############################################
+
+    def visit_block(self, stmt):
+        self.walk(stmt.statements)
+
+
+    def visit_expression(self, stmt):
+        self.walk_expr(stmt.expression)
+
+
+    def visit_function(self, stmt):
+        # a new function object per call is observable, unlike a cached one
+        self.taint()
+        if stmt.slot is None:
+            self.define(stmt.name)
+            self.functions[stmt.name.lexeme] = stmt
+
+        self.declarations.append(stmt)
+        self.calls[stmt] = set()
+        enclosing, self.current = self.current, stmt
+        self.walk(stmt.body)
+        self.current = enclosing
+
+
+    def visit_for_stmt(self, stmt):
+        self.walk([stmt.initializer, stmt.body])
+        self.walk_expr(stmt.condition)
+        self.walk_expr(stmt.increment)
+
+
+    def visit_for_range(self, stmt):
+        self.walk_expr(stmt.start)
+        self.walk_expr(stmt.end)
+        self.walk([stmt.body])
+
+
+    def visit_if_stmt(self, stmt):
+        self.walk_expr(stmt.condition)
+        self.walk([stmt.then_branch, stmt.else_branch])
+
+
+    def visit_print(self, stmt):
+        self.taint()
+        self.walk_expr(stmt.expression)
+
+
+    def visit_return_stmt(self, stmt):
+        self.walk_expr(stmt.value)
+
+
+    def visit_var(self, stmt):
+        if stmt.slot is None:
+            self.define(stmt.name)
+        self.walk_expr(stmt.initializer)
+
+
+    def visit_while_stmt(self, stmt):
+        self.walk_expr(stmt.condition)
+        self.walk([stmt.body])
+
+
+    ############################################
+    # Expressions
+    ############################################
+
+    def visit_assign(self, expr):
+        if expr.depth is None:
+            self.define(expr.name)
+            self.taint()
+        self.walk_expr(expr.value)
+
+
+    def visit_binary(self, expr):
+        self.walk_expr(expr.left)
+        self.walk_expr(expr.right)
+
+
+    def visit_call(self, expr):
+        callee = expr.callee
+        if type(callee) is Variable and callee.depth is None:
+            # checked against the global functions once they are all known
+            if self.current is not None:
+                self.calls[self.current].add(callee.name.lexeme)
+        else:
+            self.taint()
+            self.walk_expr(callee)
+
+        for argument in expr.arguments:
+            self.walk_expr(argument)
+
+
+    def visit_grouping(self, expr):
+        self.walk_expr(expr.expression)
+
+
+    def visit_literal(self, expr):
+        pass
+
+
+    def visit_logical(self, expr):
+        self.walk_expr(expr.left)
+        self.walk_expr(expr.right)
+
+
+    def visit_unary(self, expr):
+        self.walk_expr(expr.right)
+
+
+    def visit_array(self, expr):
+        self.taint()
+        for element in expr.elements:
+            self.walk_expr(element)
+
+
+    def visit_index(self, expr):
+        self.walk_expr(expr.object)
+        self.walk_expr(expr.index)
+
+
+    def visit_set_index(self, expr):
+        self.taint()
+        self.walk_expr(expr.object)
+        self.walk_expr(expr.index)
+        self.walk_expr(expr.value)
+
+
+    def visit_slice(self, expr):
+        self.taint()
+        self.walk_expr(expr.object)
+        self.walk_expr(expr.start)
+        self.walk_expr(expr.end)
+
+
+    def visit_variable(self, expr):
+        if expr.depth is None and self.current is not None:
+            # only a global function is known not to change, and it is
+            # checked like a call
+            self.calls[self.current].add(expr.name.lexeme)
+
+
+
+class MemoizedFunction(FlintCallable):
+    """
+    A pure Flint function whose results are cached by argument values.
+
+    The cache is a bounded LRU, typed so that `true` and `1` are different
+    keys. Its hit and miss statistics are available from `stats`. Arrays
+    can change and aren't hashable, so a call with an array argument isn't
+    cached.
+    """
+
+    def __init__(self, function, interpreter, size):
+        self.function = function
+        self.cached = lru_cache(maxsize=size, typed=True)(
+            lambda *arguments: function.call(interpreter, list(arguments)))
+
+
+    def arity(self):
+        return self.function.arity()
+
+
+    def call(self, interpreter, arguments):
+        for argument in arguments:
+            if type(argument) is list:
+                return self.function.call(interpreter, arguments)
+        return self.cached(*arguments)
+
+
+    def to_string(self):
+        return self.function.to_string()
+
+
+    def stats(self):
+        """Returns a line describing how well the cache did."""
+        info = self.cached.cache_info()
+        return f"{self.to_string()}: {info.hits} hits, {info.misses} misses, {info.currsize} of {info.maxsize} entries"
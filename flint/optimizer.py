@@ -0,0 +1,249 @@
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.runtime_error import CustomRunTimeError
+from flint.parser import LazyBody
+from flint.token_types import TokenType
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    """
+    Constant folding pass run between the parser and the interpreter.
+
+    Binary, unary and logical expressions over literal operands are replaced
+    by the literal they evaluate to, groupings are stripped, and `if`, `while`
+    and `for` statements with a constant condition are pruned to the branch
+    that runs.
+
+    Folding evaluates the operators with the interpreter that later runs the
+    program, so the folded values are exactly the ones it would compute. An
+    expression whose evaluation fails (like a division by zero or adding a
+    number to a string) is left in place to raise its runtime error when,
+    and only if, it is reached.
+
+    Expression visitors return the replacement expression, statement
+    visitors return the replacement statement, or None to drop it.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        
+        
+    def optimize(self, statements):
+        """Returns the optimized list of statements."""
+        optimized = []
+        for statement in statements:
+            statement = self.optimize_stmt(statement)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+    
+    
+    def optimize_stmt(self, stmt):
+        return None if stmt is None else stmt.accept(self)
+    
+    
+    def optimize_expr(self, expr):
+        return expr.accept(self)
+    
+    
+    def optimize_branch(self, stmt):
+        """Optimizes a statement that can't be dropped, like a loop body."""
+        stmt = self.optimize_stmt(stmt)
+        return stmt if stmt is not None else Block([])
+    
+    
+    def fold(self, expr):
+        """Evaluates `expr`, whose operands are literals, into a literal."""
+        try:
+            return Literal(self.interpreter.evaluate(expr))
+        except CustomRunTimeError:
+            return expr     # keep the error for runtime
+        
+        
+    ############################################
+    # Expressions
+    ############################################
+    
+    def visit_assign(self, expr):
+        expr.value = self.optimize_expr(expr.value)
+        return expr
+    
+    
+    def visit_binary(self, expr):
+        expr.left = self.optimize_expr(expr.left)
+        expr.right = self.optimize_expr(expr.right)
+        
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self.fold(expr)
+        return expr
+    
+    
+    def visit_grouping(self, expr):
+        return self.optimize_expr(expr.expression)
+    
+    
+    def visit_call(self, expr):
+        expr.callee = self.optimize_expr(expr.callee)
+        expr.arguments = [self.optimize_expr(argument) for argument in expr.arguments]
+        return expr
+    
+    
+    def visit_literal(self, expr):
+        return expr
+    
+    
+    def visit_logical(self, expr):
+        expr.left = self.optimize_expr(expr.left)
+        expr.right = self.optimize_expr(expr.right)
+        
+        if not isinstance(expr.left, Literal):
+            return expr
+        
+        # a constant left operand decides whether the right one is evaluated
+        left_is_truthy = self.interpreter.is_truthy(expr.left.value)
+        if expr.operator.type == TokenType.KEYWORD_OR:
+            return expr.left if left_is_truthy else expr.right
+        return expr.right if left_is_truthy else expr.left
+    
+    
+    def visit_unary(self, expr):
+        expr.right = self.optimize_expr(expr.right)
+        
+        if isinstance(expr.right, Literal):
+            return self.fold(expr)
+        return expr
+    
+    
+    def visit_variable(self, expr):
+        return expr
+    
+    
+    def visit_array(self, expr):
+        # never folded, as every evaluation makes a new array
+        expr.elements = [self.optimize_expr(element) for element in expr.elements]
+        return expr
+    
+    
+    def visit_index(self, expr):
+        expr.object = self.optimize_expr(expr.object)
+        expr.index = self.optimize_expr(expr.index)
+        return expr
+    
+    
+    def visit_set_index(self, expr):
+        expr.object = self.optimize_expr(expr.object)
+        expr.index = self.optimize_expr(expr.index)
+        expr.value = self.optimize_expr(expr.value)
+        return expr
+    
+    
+    def visit_slice(self, expr):
+        expr.object = self.optimize_expr(expr.object)
+        if expr.start is not None:
+            expr.start = self.optimize_expr(expr.start)
+        if expr.end is not None:
+            expr.end = self.optimize_expr(expr.end)
+        return expr
+    
+    
+    ############################################
+    # Statements
+    ############################################
+    
+    def visit_block(self, stmt):
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt
+    
+    
+    def visit_expression(self, stmt):
+        stmt.expression = self.optimize_expr(stmt.expression)
+        
+        # a literal on its own has no effect
+        if isinstance(stmt.expression, Literal):
+            return None
+        return stmt
+    
+    
+    def visit_function(self, stmt):
+        # a body left unparsed is optimized once it is parsed
+        if type(stmt.body) is not LazyBody:
+            stmt.body = self.optimize(stmt.body)
+        return stmt
+    
+    
+    def visit_if_stmt(self, stmt):
+        stmt.condition = self.optimize_expr(stmt.condition)
+        
+        if isinstance(stmt.condition, Literal):
+            if self.interpreter.is_truthy(stmt.condition.value):
+                return self.optimize_stmt(stmt.then_branch)
+            return self.optimize_stmt(stmt.else_branch)
+        
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        stmt.else_branch = self.optimize_stmt(stmt.else_branch)
+        return stmt
+    
+    
+    def visit_print(self, stmt):
+        stmt.expression = self.optimize_expr(stmt.expression)
+        return stmt
+    
+    
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = self.optimize_expr(stmt.value)
+        return stmt
+    
+    
+    def visit_var(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = self.optimize_expr(stmt.initializer)
+        return stmt
+    
+    
+    def visit_while_stmt(self, stmt):
+        stmt.condition = self.optimize_expr(stmt.condition)
+        
+        # a loop that never runs
+        if isinstance(stmt.condition, Literal) and not self.interpreter.is_truthy(stmt.condition.value):
+            return None
+        
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    
+    
+    def visit_for_stmt(self, stmt):
+        stmt.initializer = self.optimize_stmt(stmt.initializer)
+        
+        if stmt.condition is not None:
+            stmt.condition = self.optimize_expr(stmt.condition)
+            if isinstance(stmt.condition, Literal):
+                if not self.interpreter.is_truthy(stmt.condition.value):
+                    # a loop that never runs, but its initializer does, in its own scope
+                    return None if stmt.initializer is None else Block([stmt.initializer])
+                stmt.condition = None
+                
+        if stmt.increment is not None:
+            stmt.increment = self.optimize_expr(stmt.increment)
+            if isinstance(stmt.increment, Literal):
+                stmt.increment = None
+                
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+    
+    
+    def visit_for_range(self, stmt):
+        stmt.start = self.optimize_expr(stmt.start)
+        stmt.end = self.optimize_expr(stmt.end)
+        
+        # a range that never loops
+        if isinstance(stmt.start, Literal) and isinstance(stmt.end, Literal):
+            try:
+                if self.interpreter.range_count(stmt.operator, stmt.start.value, stmt.end.value) == 0:
+                    return None
+            except CustomRunTimeError:
+                pass    # keep the error for runtime
+            
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
@@ -1,28 +1,99 @@
 from flint.token_types import TokenType
+from flint.token import Token
 from flint.ast.expr import *
 from flint.ast.stmt import *
+from flint.scanner import TokenStream
 from tools import raise_error
 
+EOF = TokenType.EOF
+
+# binding powers of the operators, higher binds tighter
+GROUP, CALL = -2, -1        # markers of an open grouping or call
+ARRAY, INDEX, SLICE = -5, -4, -3    # markers of an open array literal, index or slice
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY = range(1, 9)
+
+INFIX_BINDING_POWER = {
+    TokenType.EQUAL: ASSIGNMENT,
+    TokenType.KEYWORD_OR: OR,
+    TokenType.KEYWORD_AND: AND,
+    TokenType.EXCLAMATION_EQUAL: EQUALITY,
+    TokenType.EQUAL_EQUAL: EQUALITY,
+    TokenType.GREATER_THAN: COMPARISON,
+    TokenType.GREATER_THAN_EQUAL: COMPARISON,
+    TokenType.LESS_THAN: COMPARISON,
+    TokenType.LESS_THAN_EQUAL: COMPARISON,
+    TokenType.PLUS: TERM,
+    TokenType.MINUS: TERM,
+    TokenType.ASTERISK: FACTOR,
+    TokenType.FORWARD_SLASH: FACTOR,
+}
+
+# values of the keywords that are literals
+KEYWORD_LITERALS = {
+    TokenType.KEYWORD_FALSE: False,
+    TokenType.KEYWORD_TRUE: True,
+    TokenType.KEYWORD_NIL: None,
+}
+
+
+class LazyBody:
+    """
+    The body of a function whose parsing was put off: `start` is the
+    position of the token after its opening brace in the tokens of `parser`,
+    and `end` the position of its closing brace.
+    """
+    __slots__ = ("parser", "start", "end")
+    
+    def __init__(self, parser, start, end):
+        self.parser = parser
+        self.start = start
+        self.end = end
+        
+        
+    def parse(self):
+        """
+        Parses the body into its statements, reporting syntax errors like
+        the rest of the program.
+
+        Only the tokens of the body are parsed, so recovering from an error
+        never runs into the code that follows the function.
+
+        Raises:
+            Parser.ParseError: If an error leaves the block unclosed.
+        """
+        parser = self.parser
+        tokens = [parser.tokens[index] for index in range(self.start, self.end + 1)]
+        closing = tokens[-1]
+        tokens.append(Token(EOF, "", None, closing.line, closing.offset, closing.lines))
+        return Parser(tokens, parser.is_repl_mode, parser.lazy_bodies).block()
+
+
 class Parser:
     """
     Parser class for parsing a list of tokens into an Abstract Syntax Tree (AST).
     Attributes:
-        _tokens (list): A list of Token objects to be parsed.
+        _tokens (TokenBuffer): The tokens to be parsed.
+        kinds (Sequence[int]): The kinds of the tokens, compared as integers.
         current (int): Tracks the current position in the token list.
+        lazy_bodies (bool): Whether function bodies are only skipped over,
+            and left as a `LazyBody` to parse when the function is first called.
     Inner Classes:
         ParseError: Custom exception for parsing errors.
     """
     
-    def __init__(self, tokens, is_repl_mode) -> None:
+    def __init__(self, tokens, is_repl_mode, lazy_bodies=False) -> None:
         """
         Initialize the parser with a list of tokens.
 
         Args:
-            tokens (list): A list of Token objects to be parsed.
+            tokens (TokenBuffer): The tokens to be parsed. A `TokenStream` or
+                a plain list of Token objects is accepted as well.
         """
         self._tokens = tokens   
+        self.kinds = tokens.kinds if hasattr(tokens, "kinds") else [token.type for token in tokens]
         self.current = 0       # tracks the current pos in the token list
         self.is_repl_mode = is_repl_mode
+        self.lazy_bodies = lazy_bodies
         
         
     
@@ -42,8 +113,153 @@ class Parser:
     def expression(self):
         """
         Parses and returns an expression.
+
+        Expressions are parsed iteratively by precedence climbing: operands
+        and pending operators are kept on explicit stacks and operators are
+        reduced by the binding powers of `INFIX_BINDING_POWER`, so parsing
+        costs no Python frames per precedence level and the nesting depth of
+        an expression is not bounded by the recursion limit.
+        Open groupings, calls, array literals, indexes and slices are kept
+        on the operator stack as markers.
+
+        Returns:
+            Expr: The parsed expression.
+        """
+        kinds = self.kinds
+        operands = []
+        operators = []      # (binding power, operator token) pairs and markers
+        
+        while True:
+            # prefix position: unary operators and groupings before an operand
+            kind = kinds[self.current]
+            if kind == TokenType.EXCLAMATION or kind == TokenType.MINUS:
+                operators.append((UNARY, self.advance()))
+                continue
+            if kind == TokenType.LEFT_PAREN:
+                self.current += 1
+                operators.append((GROUP, None))
+                continue
+            if kind == TokenType.LEFT_BRACKET and kinds[self.current + 1] != TokenType.RIGHT_BRACKET:
+                # the bracket, followed by the elements parsed so far
+                operators.append((ARRAY, [self.advance()]))
+                continue
+            
+            operands.append(self.primary())
+            
+            # postfix and infix position, after an operand
+            while True:
+                kind = kinds[self.current]
+                
+                if kind == TokenType.LEFT_PAREN:
+                    self.current += 1
+                    if kinds[self.current] == TokenType.RIGHT_PAREN:
+                        operands.append(Call(operands.pop(), self.advance(), []))
+                        continue
+                    # the callee, followed by the arguments parsed so far
+                    operators.append((CALL, [operands.pop()]))
+                    break
+                
+                if kind == TokenType.LEFT_BRACKET:
+                    bracket = self.advance()
+                    if kinds[self.current] != TokenType.COLON:
+                        operators.append((INDEX, [operands.pop(), bracket]))
+                        break
+                    # a slice from the start
+                    self.current += 1
+                    if kinds[self.current] == TokenType.RIGHT_BRACKET:
+                        self.current += 1
+                        operands.append(Slice(operands.pop(), bracket, None, None))
+                        continue
+                    operators.append((SLICE, [operands.pop(), bracket, None]))
+                    break
+                
+                power = INFIX_BINDING_POWER.get(kind)
+                if power is not None:
+                    # assignment is right-associative, every other operator left-associative
+                    self.reduce(operands, operators, power + 1 if power == ASSIGNMENT else power)
+                    operators.append((power, self.advance()))
+                    break
+                
+                # the end of a grouping, a call argument or the whole expression
+                self.reduce(operands, operators, ASSIGNMENT)
+                if not operators:
+                    return operands.pop()
+                
+                marker, pending = operators[-1]
+                if marker == GROUP:
+                    self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                    operators.pop()
+                    continue
+                
+                if marker == ARRAY:
+                    pending.append(operands.pop())
+                    if self.match(TokenType.COMMA):
+                        break
+                    self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after array elements.")
+                    operators.pop()
+                    operands.append(Array(pending[0], pending[1:]))
+                    continue
+                
+                if marker == INDEX:
+                    operators.pop()
+                    object, bracket = pending
+                    index = operands.pop()
+                    if not self.match(TokenType.COLON):
+                        self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+                        operands.append(Index(object, bracket, index))
+                        continue
+                    # the index was the start of a slice
+                    if self.match(TokenType.RIGHT_BRACKET):
+                        operands.append(Slice(object, bracket, index, None))
+                        continue
+                    operators.append((SLICE, [object, bracket, index]))
+                    break
+                
+                if marker == SLICE:
+                    self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after slice.")
+                    operators.pop()
+                    object, bracket, start = pending
+                    operands.append(Slice(object, bracket, start, operands.pop()))
+                    continue
+                
+                pending.append(operands.pop())
+                if self.match(TokenType.COMMA):
+                    # If there are more than 255 arguments, raise an error
+                    if len(pending) > 255:
+                        self.error(self.peek(), "Cannot have more than 255 arguments.")
+                    break
+                
+                paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+                operators.pop()
+                operands.append(Call(pending[0], paren, pending[1:]))
+    
+    
+    def reduce(self, operands, operators, power):
+        """
+        Pops the pending operators binding at least as tightly as `power`,
+        replacing their operands with the nodes they build. Stops at the
+        marker of an open grouping or call.
         """
-        return self.assignment()
+        while operators and operators[-1][0] >= power:
+            operator_power, operator = operators.pop()
+            right = operands.pop()
+            
+            if operator_power == UNARY:
+                operands.append(Unary(operator, right))
+                continue
+            
+            left = operands.pop()
+            if operator_power == ASSIGNMENT:
+                if isinstance(left, Index):
+                    operands.append(Set_index(left.object, left.bracket, left.index, right))
+                    continue
+                if not isinstance(left, Variable):
+                    self.error(operator, "Invalid assignment target.")
+                operands.append(Assign(left.name, right))
+            elif operator_power == OR or operator_power == AND:
+                operands.append(Logical(left, operator, right))
+            else:
+                operands.append(Binary(left, operator, right))
     
     
     def declaration(self):
@@ -108,6 +324,10 @@ class Parser:
     def for_statement(self):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
         
+        # `for (name in start..end)` counts over a range
+        if self.check(TokenType.IDENTIFIER) and self.kinds[self.current + 1] == TokenType.KEYWORD_IN:
+            return self.for_range()
+        
         # parse the initializer
         if self.match(TokenType.SEMICOLON):
             initializer = None
@@ -116,7 +336,7 @@ class Parser:
         else:
             initializer = self.expression_statement()    
             
-        # parse the condition
+        # parse the condition, a missing one is always true
         condition = None
         if not self.check(TokenType.SEMICOLON):
             condition = self.expression()
@@ -132,21 +352,22 @@ class Parser:
         # parse the body (loop body)
         body = self.statement()
         
-        # Desugar into a while loop
-        # If there's an increment, append it to the body
-        if increment is not None:
-            body = Block([body, Expression(increment)])
-            
-        # if no condition is specified, use `True` as the default condition
-        if condition is None:
-            condition = Literal(True)
-        body = While_stmt(condition, body)
+        return For_stmt(initializer, condition, increment, body)
+    
+    
+    
+    def for_range(self):
+        name = self.advance()
+        self.advance()      # the 'in'
         
-        # if there's an initializer, execute it before the loop
-        if initializer is not None:
-            body = Block([initializer, body])
+        start = self.expression()
+        operator = self.consume(TokenType.DOT_DOT, "Expect '..' after range start.")
+        end = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after range.")
         
-        return body
+        body = self.statement()
+        
+        return For_range(name, start, operator, end, body)
         
     
     
@@ -289,11 +510,42 @@ class Parser:
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
         
         self.consume(TokenType.LEFT_BRACE, f"Expect '{{ ' before {kind} body.")
-        body = self.block()
+        start = self.current
+        if self.lazy_bodies and (end := self.skip_block()) is not None:
+            body = LazyBody(self, start, end)
+        else:
+            body = self.block()
         
         return Function(name, parameters, body)     # return a function statement
     
     
+    def skip_block(self):
+        """
+        Moves past the block whose opening brace was just consumed, only
+        matching braces and leaving its tokens unparsed.
+        
+        Returns:
+            int: The position of the closing brace, or None, without moving,
+                if the block is never closed.
+        """
+        kinds = self.kinds
+        left, right, end = TokenType.LEFT_BRACE.value, TokenType.RIGHT_BRACE.value, EOF.value
+        depth = 1
+        position = self.current
+        while True:
+            kind = kinds[position]
+            if kind == left:
+                depth += 1
+            elif kind == right:
+                depth -= 1
+                if depth == 0:
+                    self.current = position + 1
+                    return position
+            elif kind == end:
+                return None
+            position += 1
+    
+    
     
     def block(self):
         """
@@ -315,79 +567,6 @@ class Parser:
     
     
     
-    def assignment(self):
-        expr = self.or_logic()
-        
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()                            # store the = token
-            value = self.assignment()                           # recursively parse the right-hand side of assignment
-            
-            if isinstance(expr, Variable):  
-                name = expr.name
-                return Assign(name, value)                      # return an assign expression with a variable and a value
-            
-            self.error(equals, "Invalid assignment target.")    # throws an error if it's not a valid target
-            
-        return expr                                             # returns the original expression if there's no assignment
-            
-        
-    def or_logic(self):
-        expr = self.and_logic()
-        
-        while self.match(TokenType.KEYWORD_OR):
-            operator = self.previous()
-            right = self.and_logic()
-            expr = Logical(expr, operator, right)   # follows left-associative structure
-            
-        return expr
-        
-    
-    def and_logic(self):
-        expr = self.equality()
-        
-        while self.match(TokenType.KEYWORD_AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-            
-        return expr
-        
-    
-    
-    def equality(self):
-        """
-        Parses an equality expression, handling binary operations with '!=' and '=='.
-        """
-        
-        expr = self.comparision()
-        
-        while self.match(TokenType.EXCLAMATION_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparision()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    
-    def comparision(self):
-        """
-        Parses and returns a comparison expression.
-        This method handles comparison operators such as greater than, greater than or equal to,
-        less than, and less than or equal to. It maintains left associativity by constructing
-        a binary expression tree.
-        Returns:
-            expr: The parsed comparison expression.
-        """
-        expr = self.term()
-        
-        while self.match(TokenType.GREATER_THAN, TokenType.GREATER_THAN_EQUAL, TokenType.LESS_THAN, TokenType.LESS_THAN_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)    # for maintaining left associativity
-            
-        return expr
-            
-    
     ########################################
     # Methods
     ########################################
@@ -406,7 +585,7 @@ class Parser:
         """
         for token_type in types:
             if self.check(token_type):
-                self.advance()
+                self.current += 1   # like advance(), without materializing the token
                 return True
         return False
 
@@ -421,9 +600,8 @@ class Parser:
         Returns:
             bool: True if the current token matches the type, False otherwise.
         """
-        if self.is_at_end():
-            return False
-        return self.peek().type == type
+        kind = self.kinds[self.current]
+        return kind == type and kind != EOF
     
     
     def advance(self):
@@ -445,7 +623,7 @@ class Parser:
         Returns:
             bool: True if at the end of the token stream, False otherwise.
         """
-        return self.peek().type == TokenType.EOF
+        return self.kinds[self.current] == EOF
     
     
     def peek(self):
@@ -511,118 +689,35 @@ class Parser:
     # Imp. methods
     #########################################
     
-    def binary_expr(self, sub_expr_method, *operators):
-        """
-        Parse a binary expression.
-    
-        Args:
-            sub_expr_method (callable): The method to parse the sub-expressions (e.g., self.unary).
-            operators (TokenType): The binary operators to handle at this level.
-
-            Returns:
-            Expr: The parsed binary expression or a single sub-expression.
-        """
-        expr = sub_expr_method()
-
-        while self.match(*operators):
-            operator = self.previous()
-            right = sub_expr_method()
-            expr = Binary(expr, operator, right)
-
-        return expr
-    
-    
-    def term(self):
-        return self.binary_expr(self.factor, TokenType.PLUS, TokenType.MINUS)
-
-    
-    
-    def factor(self):
-        return self.binary_expr(self.unary, TokenType.ASTERISK, TokenType.FORWARD_SLASH)
-    
-    
-    def unary(self):
-        if self.match(TokenType.EXCLAMATION, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            expr = Unary(operator, right)    
-            return expr
-        
-        return self.call()
-    
-    
-    def call(self):
-        """
-        Parse a call expression.
-        """
-        expr = self.primary()
-        
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finish_call(expr)
-            else:
-                break
-        
-        return expr
-    
-    
-    def finish_call(self, callee):
-        """
-        Parse the arguments for a function call expression.
-        """
-        arguments = []
-
-        # If there's no closing parenthesis, continue parsing arguments.
-        if not self.check(TokenType.RIGHT_PAREN):
-            while True:
-                # Parse and append an argument
-                arguments.append(self.expression())
-                # Check for additional arguments
-                if not self.match(TokenType.COMMA):
-                    break
-
-                # If there are more than 255 arguments, raise an error
-                if len(arguments) >= 255:
-                    self.error(self.peek(), "Cannot have more than 255 arguments.")
-
-        # Ensure the closing parenthesis is consumed after parsing all arguments
-        paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
-        # Return the function call expression with the callee, closing parenthesis, and arguments
-        return Call(callee, paren, arguments)
-    
-    
-    
     def primary(self):
         """
         Parse a primary expression.
 
-        Handles literals, variables, and grouped expressions enclosed in parentheses.
+        Handles literals, variables and empty arrays, groupings and the
+        other array literals are handled by `expression`.
 
         Returns:
             Expr: The parsed primary expression.
         """
 
+        kind = self.kinds[self.current]
         
-        if self.match(TokenType.KEYWORD_FALSE):
-            return Literal(False)
-        if self.match(TokenType.KEYWORD_TRUE):
-            return Literal(True)
-        if self.match(TokenType.KEYWORD_NIL):
-            return Literal(None)
-        
+        # handle variable access by identifier
+        if kind == TokenType.IDENTIFIER:
+            return Variable(self.advance())
         
-        if self.match(TokenType.NUMBER_LITERAL, TokenType.STRING_LITERAL):
-            return Literal(self.previous().literal)
+        if kind == TokenType.NUMBER_LITERAL or kind == TokenType.STRING_LITERAL:
+            return Literal(self.advance().literal)
         
-        # handle variable access by identifier
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
+        if kind in KEYWORD_LITERALS:
+            self.current += 1
+            return Literal(KEYWORD_LITERALS[kind])
         
+        if kind == TokenType.LEFT_BRACKET:
+            bracket = self.advance()
+            self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after array elements.")
+            return Array(bracket, [])
         
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")  # Ensure closing parenthesisreturn expr
-            return expr
         
         # if none above matches, we've an error
         self.error(self.peek(), "Expect expression.")
@@ -649,10 +744,10 @@ class Parser:
         self.advance()
         
         while not self.is_at_end():
-            if self.previous().type == TokenType.SEMICOLON:
+            if self.kinds[self.current - 1] == TokenType.SEMICOLON:
                 return
             
-            if self.peek().type in {
+            if self.kinds[self.current] in {
                 TokenType.KEYWORD_CLASS,
                 TokenType.KEYWORD_FUNCTION,
                 TokenType.KEYWORD_VARIABLE, 
@@ -681,12 +776,21 @@ class Parser:
             list: A list of parsed statements.
         """
         
-        statements = []
-        while not self.is_at_end():
-            statements.append(self.declaration())
-        return statements
+        return list(self.declarations())
+    
+    
+    def declarations(self):
+        """
+        Yields the top-level declarations one at a time as they are parsed.
 
+        When parsing from a `TokenStream`, the tokens of every finished
+        declaration are discarded, so only the tokens of the declaration
+        being parsed are kept in memory.
+        """
+        streaming = isinstance(self._tokens, TokenStream)
         
-        
-        
-    
\ No newline at end of file
+        while not self.is_at_end():
+            statement = self.declaration()
+            if streaming:
+                self._tokens.discard(self.current - 1)     # keep previous() valid
+            yield statement
@@ -0,0 +1,163 @@
+#################
+# Specialized variants of hot nodes for the tree-walking interpreter
+#################
+from operator import add, sub, mul, truediv, gt, ge, lt, le, eq, ne
+from flint.ast.expr import Binary, Call, Variable, EXPR_VISITS
+from flint.token_types import TokenType
+from flint.flint_callable import FlintCallable
+from flint.flint_function import FlintFunction
+
+QUICKEN_THRESHOLD = 16  # evaluations with the same operand types before a node is specialized
+DEOPT_BACKOFF = 64      # evaluations a deoptimized node waits before it can be specialized again
+
+
+# Quickened nodes are plain nodes whose class the Interpreter swapped for a
+# variant once it found them hot. A variant dispatches to its own visit
+# method, which guards on the types it was specialized for and turns the
+# node back into a plain one when the guard fails. Variants only exist
+# while the Interpreter runs the program, after every other pass is done.
+# They add no slots, which would keep their class from being swapped in.
+
+# visit methods of the variants, whose kinds follow the kinds of the plain nodes
+VARIANT_VISITS = (
+    "visit_number_binary",
+    "visit_string_concat",
+    "visit_equality",
+    "visit_known_call",
+    "visit_global_call",
+)
+
+
+def variant_kind(visit):
+    """Returns the kind of the variants dispatching to `visit`."""
+    return len(EXPR_VISITS) + VARIANT_VISITS.index(visit)
+
+
+class NumberBinary(Binary):
+    """Arithmetic or comparison over two numbers, computed by `operation`."""
+    __slots__ = ()
+    kind = variant_kind("visit_number_binary")
+
+    def accept(self, visitor):
+        return visitor.visit_number_binary(self)
+
+
+# the operator functions are builtins, which don't bind to the instance
+class NumberAdd(NumberBinary):
+    __slots__ = ()
+    operation = add
+
+class NumberSubtract(NumberBinary):
+    __slots__ = ()
+    operation = sub
+
+class NumberMultiply(NumberBinary):
+    __slots__ = ()
+    operation = mul
+
+class NumberDivide(NumberBinary):
+    __slots__ = ()
+    operation = truediv
+
+class NumberGreater(NumberBinary):
+    __slots__ = ()
+    operation = gt
+
+class NumberGreaterEqual(NumberBinary):
+    __slots__ = ()
+    operation = ge
+
+class NumberLess(NumberBinary):
+    __slots__ = ()
+    operation = lt
+
+class NumberLessEqual(NumberBinary):
+    __slots__ = ()
+    operation = le
+
+
+class StringConcat(Binary):
+    """`+` over two strings."""
+    __slots__ = ()
+    kind = variant_kind("visit_string_concat")
+
+    def accept(self, visitor):
+        return visitor.visit_string_concat(self)
+
+
+class EqualityBinary(Binary):
+    """`==` or `!=`, which work on any types and never deoptimize."""
+    __slots__ = ()
+    kind = variant_kind("visit_equality")
+
+    def accept(self, visitor):
+        return visitor.visit_equality(self)
+
+# for the values of Flint, Python's equality matches Interpreter.is_equal
+class Equal(EqualityBinary):
+    __slots__ = ()
+    operation = eq
+
+class NotEqual(EqualityBinary):
+    __slots__ = ()
+    operation = ne
+
+
+class KnownCall(Call):
+    """Call of a Flint function with the right number of arguments."""
+    __slots__ = ()
+    kind = variant_kind("visit_known_call")
+
+    def accept(self, visitor):
+        return visitor.visit_known_call(self)
+
+
+class GlobalCall(Call):
+    """
+    Call of a global with the right number of arguments, whose `cache` is an
+    inline cache: the version of the globals the callee was read at, and
+    the callee. The callee is only read again once the globals changed.
+    """
+    __slots__ = ()
+    kind = variant_kind("visit_global_call")
+
+    def accept(self, visitor):
+        return visitor.visit_global_call(self)
+
+
+NUMBER_VARIANTS = {
+    TokenType.PLUS: NumberAdd,
+    TokenType.MINUS: NumberSubtract,
+    TokenType.ASTERISK: NumberMultiply,
+    TokenType.FORWARD_SLASH: NumberDivide,
+    TokenType.GREATER_THAN: NumberGreater,
+    TokenType.GREATER_THAN_EQUAL: NumberGreaterEqual,
+    TokenType.LESS_THAN: NumberLess,
+    TokenType.LESS_THAN_EQUAL: NumberLessEqual,
+}
+
+EQUALITY_VARIANTS = {
+    TokenType.EQUAL_EQUAL: Equal,
+    TokenType.EXCLAMATION_EQUAL: NotEqual,
+}
+
+
+def binary_variant(operator_type, left, right):
+    """Returns the variant of a binary node for these operands, or None."""
+    if operator_type in EQUALITY_VARIANTS:
+        return EQUALITY_VARIANTS[operator_type]
+    if type(left) is float and type(right) is float:
+        return NUMBER_VARIANTS[operator_type]
+    if operator_type == TokenType.PLUS and type(left) is str and type(right) is str:
+        return StringConcat
+    return None
+
+
+def call_variant(expr, callee, arguments):
+    """Returns the variant of a call node for this callee, or None."""
+    if (type(expr.callee) is Variable and expr.callee.depth is None
+            and isinstance(callee, FlintCallable) and callee.accepts(len(arguments))):
+        return GlobalCall
+    if type(callee) is FlintFunction and len(arguments) == len(callee.declaration.params):
+        return KnownCall
+    return None
@@ -0,0 +1,250 @@
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.parser import LazyBody
+from tools import raise_error
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    """
+    Static pass that gives every local variable a fixed address.
+
+    Each `Variable` and `Assign` expression is annotated with the `depth`
+    (how many frames up from the current one) and the `slot` (index in that
+    frame) of the variable it refers to, or with None for both when it is a
+    global. Declarations (`Var`, `Function`, `For_range`) get the `slot` they
+    define, and blocks, `for` loops and functions get the `frame_size` of the
+    frame they need.
+
+    A block or `for` loop that declares nothing gets no scope, and a
+    `frame_size` of 0 telling the engines to run it in the enclosing frame.
+
+    The interpreter can then read and write locals by index in fixed-size
+    `Frame`s instead of searching the enclosing `Environment` chain.
+
+    A Flint function only sees its own locals and the globals, so the
+    resolution of a function body starts from a fresh scope stack.
+    """
+
+    def __init__(self):
+        self.scopes = []    # local scopes, innermost last; each maps a name to its slot
+        self.in_function = False
+        
+        
+    def resolve(self, statements):
+        """Resolves a list of statements."""
+        for statement in statements:
+            self.resolve_stmt(statement)
+            
+            
+    def resolve_stmt(self, stmt):
+        if stmt is not None:
+            stmt.accept(self)
+            
+            
+    def resolve_expr(self, expr):
+        expr.accept(self)
+        
+        
+    ############################################
+    # Scopes
+    ############################################
+    
+    def begin_scope(self):
+        self.scopes.append({})
+        
+        
+    def end_scope(self):
+        """Closes the innermost scope, returning the number of slots it needs."""
+        return len(self.scopes.pop())
+    
+    
+    def declare(self, name):
+        """
+        Declares `name` in the innermost scope.
+
+        Returns:
+            int: The slot of the variable, or None for a global.
+        """
+        if not self.scopes:
+            return None
+        
+        scope = self.scopes[-1]
+        if name.lexeme in scope:
+            raise_error.error(name, f"Variable '{name.lexeme}' already defined in this scope.")
+            return scope[name.lexeme]
+        
+        slot = scope[name.lexeme] = len(scope)
+        return slot
+    
+    
+    def resolve_local(self, expr, name):
+        """Annotates `expr` with the depth and slot of the variable `name`."""
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot = scope.get(name.lexeme)
+            if slot is not None:
+                expr.depth = depth
+                expr.slot = slot
+                return
+            
+        # not found in any local scope, assume it is global
+        expr.depth = None
+        expr.slot = None
+        
+        
+    ############################################
+    # Statements
+    ############################################
+    
+    def visit_block(self, stmt):
+        if not any(isinstance(statement, (Var, Function)) for statement in stmt.statements):
+            self.resolve(stmt.statements)
+            stmt.frame_size = 0
+            return
+        
+        self.begin_scope()
+        self.resolve(stmt.statements)
+        stmt.frame_size = self.end_scope()
+        
+        
+    def visit_expression(self, stmt):
+        self.resolve_expr(stmt.expression)
+        
+        
+    def visit_for_stmt(self, stmt):
+        # a loop variable lives in a scope around the whole loop
+        scoped = isinstance(stmt.initializer, Var)
+        if scoped:
+            self.begin_scope()
+        self.resolve_stmt(stmt.initializer)
+        if stmt.condition is not None:
+            self.resolve_expr(stmt.condition)
+        if stmt.increment is not None:
+            self.resolve_expr(stmt.increment)
+        self.resolve_stmt(stmt.body)
+        stmt.frame_size = self.end_scope() if scoped else 0
+        
+        
+    def visit_for_range(self, stmt):
+        # the bounds can't see the loop variable
+        self.resolve_expr(stmt.start)
+        self.resolve_expr(stmt.end)
+        
+        self.begin_scope()
+        stmt.slot = self.declare(stmt.name)
+        self.resolve_stmt(stmt.body)
+        stmt.frame_size = self.end_scope()
+        
+        
+    def visit_function(self, stmt):
+        stmt.slot = self.declare(stmt.name)
+        
+        # a body left unparsed is resolved once it is parsed, by its first call
+        if type(stmt.body) is not LazyBody:
+            self.resolve_function(stmt)
+            
+            
+    def resolve_function(self, stmt):
+        """Resolves the parameters and the body of a function, giving it its frame_size."""
+        # the body only sees its parameters, its own locals and the globals
+        enclosing = self.scopes, self.in_function
+        self.scopes, self.in_function = [{}], True
+        for param in stmt.params:
+            self.declare(param)
+        self.resolve(stmt.body)
+        stmt.frame_size = self.end_scope()
+        self.scopes, self.in_function = enclosing
+        
+        
+    def visit_if_stmt(self, stmt):
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.then_branch)
+        self.resolve_stmt(stmt.else_branch)
+        
+        
+    def visit_print(self, stmt):
+        self.resolve_expr(stmt.expression)
+        
+        
+    def visit_return_stmt(self, stmt):
+        if not self.in_function:
+            raise_error.error(stmt.keyword, "Can't return from top-level code.")
+            
+        if stmt.value is not None:
+            self.resolve_expr(stmt.value)
+            
+            
+    def visit_var(self, stmt):
+        # the initializer can't see the variable it initializes
+        if stmt.initializer is not None:
+            self.resolve_expr(stmt.initializer)
+        stmt.slot = self.declare(stmt.name)
+        
+        
+    def visit_while_stmt(self, stmt):
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.body)
+        
+        
+    ############################################
+    # Expressions
+    ############################################
+    
+    def visit_assign(self, expr):
+        self.resolve_expr(expr.value)
+        self.resolve_local(expr, expr.name)
+        
+        
+    def visit_binary(self, expr):
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
+        
+        
+    def visit_grouping(self, expr):
+        self.resolve_expr(expr.expression)
+        
+        
+    def visit_call(self, expr):
+        self.resolve_expr(expr.callee)
+        for argument in expr.arguments:
+            self.resolve_expr(argument)
+            
+            
+    def visit_literal(self, expr):
+        pass
+    
+    
+    def visit_logical(self, expr):
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
+        
+        
+    def visit_unary(self, expr):
+        self.resolve_expr(expr.right)
+        
+        
+    def visit_variable(self, expr):
+        self.resolve_local(expr, expr.name)
+        
+        
+    def visit_array(self, expr):
+        for element in expr.elements:
+            self.resolve_expr(element)
+            
+            
+    def visit_index(self, expr):
+        self.resolve_expr(expr.object)
+        self.resolve_expr(expr.index)
+        
+        
+    def visit_set_index(self, expr):
+        self.resolve_expr(expr.object)
+        self.resolve_expr(expr.index)
+        self.resolve_expr(expr.value)
+        
+        
+    def visit_slice(self, expr):
+        self.resolve_expr(expr.object)
+        if expr.start is not None:
+            self.resolve_expr(expr.start)
+        if expr.end is not None:
+            self.resolve_expr(expr.end)
@@ -1,8 +1,32 @@
 # File for return statements
 
-class Return_stmts(Exception):
+class Return_stmts:
+    """
+    Completion of a statement that reached a `return`.
+
+    Executing a statement returns None when it completes normally, or this
+    object carrying the returned value, which every enclosing block, `if`
+    and `while` hands back up to the function call. Returning a value is
+    then much cheaper than raising and unwinding an exception.
+    """
+    __slots__ = ("value",)
+    
     def __init__(self, value):
-        super().__init__(None)
         self.value = value
 
-    
\ No newline at end of file
+
+
+class TailCall(Return_stmts):
+    """
+    Completion of a `return` whose value is a call, made before calling.
+
+    The callee and arguments are evaluated but the call is left to the
+    function call being returned from, which runs it in a loop instead of
+    nesting it (a trampoline), so tail recursion doesn't grow the stack.
+    """
+    __slots__ = ("expr", "callee", "arguments")
+
+    def __init__(self, expr, callee, arguments):
+        self.expr = expr
+        self.callee = callee
+        self.arguments = arguments
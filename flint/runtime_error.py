@@ -5,4 +5,10 @@ class CustomRunTimeError(Exception):
     def __init__(self, tokens, message):
         super().__init__(message)   # initialize the base class with the new message
         self.token = tokens        # store the tokens associated with the error
-        self.message = message
\ No newline at end of file
+        self.message = message
+        
+    def located(self, token):
+        """Places the error at `token` unless it already has one, as the call of a native does"""
+        if self.token is None:
+            self.token = token
+        return self
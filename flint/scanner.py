@@ -1,17 +1,31 @@
-from flint.token import Token
+import re
+from flint.token_buffer import TokenBuffer
+from flint.symbol_table import SymbolTable
 from flint.token_types import *
 from tools import raise_error
 
+# token kinds looked up in the hot loop of RegexScanner
+IDENTIFIER = TokenType.IDENTIFIER
+NUMBER_LITERAL = TokenType.NUMBER_LITERAL
+STRING_LITERAL = TokenType.STRING_LITERAL
+
 
 class Scanner:
-    def __init__(self, source):
+    def __init__(self, source, symbol_table=None):
         self.source = source
-        self.tokens = []    # list to store tokens
+        # identifiers are interned once per program
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+        self.tokens = TokenBuffer(source, symbol_table=self.symbol_table)   # compact storage for the tokens
 
         # tracing position
         self.start = 0
         self.current = 0
-        self.line = 1
+
+
+    @property
+    def line(self):
+        """The line of the current position, looked up on demand."""
+        return self.tokens.line_index.line_of(self.current)
 
 
     def is_at_end(self):
@@ -28,7 +42,7 @@ class Scanner:
             #   here we are not breaking the loop in case of error
             # I just want to consume the tokens until EOF and then report the errors all at a time
 
-        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        self.tokens.append(TokenType.EOF, self.current, self.current)
         
         return self.tokens
 
@@ -45,10 +59,14 @@ class Scanner:
             self.add_token(TokenType.LEFT_BRACE)
         elif char == '}':
             self.add_token(TokenType.RIGHT_BRACE)
+        elif char == '[':
+            self.add_token(TokenType.LEFT_BRACKET)
+        elif char == ']':
+            self.add_token(TokenType.RIGHT_BRACKET)
         elif char == ',':
             self.add_token(TokenType.COMMA)
         elif char == '.':
-            self.add_token(TokenType.DOT)
+            self.add_token(TokenType.DOT_DOT if self.match('.') else TokenType.DOT)
         elif char == '-':
             self.add_token(TokenType.MINUS)
         elif char == '+':
@@ -57,6 +75,8 @@ class Scanner:
             self.add_token(TokenType.SEMICOLON)
         elif char == '*':
             self.add_token(TokenType.ASTERISK)
+        elif char == ':':
+            self.add_token(TokenType.COLON)
 
         elif char == '/':
             if self.match('/'):
@@ -78,14 +98,10 @@ class Scanner:
                 
         
 
-        elif char in {' ', '\r', '\t'}:
-            # ignore white spaces
+        elif char in {' ', '\r', '\t', '\n'}:
+            # ignore white spaces, lines are derived from offsets when needed
             pass
 
-        elif char == '\n':
-            # increments the line number
-            self.line += 1
-
 
         # for comparision operators
         elif char == '!':
@@ -111,7 +127,7 @@ class Scanner:
             self.indentifier()
 
         else:
-            raise_error.error(self.line, f"Unexpected character: {char}")
+            self.error(self.start, f"Unexpected character: {char}")
 
 
 
@@ -120,9 +136,13 @@ class Scanner:
     ###################################################################
 
     def add_token(self, type_, literal=None):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(type_, text, literal, self.line))
-        # print(self.tokens[0])
+        self.tokens.append(type_, self.start, self.current, literal)
+
+
+    def error(self, offset, message):
+        """Reports a scanning error at the given source offset."""
+        line, column = self.tokens.line_index.position(offset)
+        raise_error.report(line, "", message, column)
 
 
 
@@ -152,12 +172,10 @@ class Scanner:
 
     def string(self):
         while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == '\n':
-                self.line += 1      # handles new line breaks in the string variable -> multi-line strings
-            self.advance()
+            self.advance()      # strings may span multiple lines
 
         if self.is_at_end():
-            raise_error.error(self.line, "Unterminated string.")
+            self.error(self.start, "Unterminated string.")
             return
 
         # the closing "
@@ -190,9 +208,9 @@ class Scanner:
                 self.advance()
 
         
-        # Ensure there's no second decimal point.
-        if has_decimal and not self.is_digit(self.peek()):
-            raise_error.error(self.line, "Invalid number format: trailing decimal point")
+        # Ensure there's no second decimal point, "1.5..3" being a range.
+        if has_decimal and self.peek() == '.' and self.peek_next() != '.':
+            self.error(self.start, "Invalid number format: trailing decimal point")
             return
 
 
@@ -203,7 +221,7 @@ class Scanner:
             # print(number_value)
             self.add_token(TokenType.NUMBER_LITERAL, number_value)
         except ValueError:
-            raise_error.error(self.line, f"Invalid number: {value}")
+            self.error(self.start, f"Invalid number: {value}")
 
 
     def peek_next(self):
@@ -220,11 +238,13 @@ class Scanner:
         # Extract the full identifier or keyword text
         text = self.source[self.start:self.current]
 
-        # Check if it's a reserved keyword; otherwise, treat as an identifier
-        token_type = self.KEYWORDS.get(text, TokenType.IDENTIFIER)
-
-        # Add the token for the keyword or identifier
-        self.add_token(token_type)
+        # Check if it's a reserved keyword; otherwise, intern it as an identifier
+        token_type = self.KEYWORDS.get(text)
+        if token_type is not None:
+            self.add_token(token_type)
+        else:
+            symbol = self.symbol_table.intern(text)
+            self.tokens.append(TokenType.IDENTIFIER, self.start, self.current, None, symbol)
 
 
 
@@ -247,6 +267,7 @@ class Scanner:
         "for": TokenType.KEYWORD_FOR,
         "fn": TokenType.KEYWORD_FUNCTION,
         "if": TokenType.KEYWORD_IF,
+        "in": TokenType.KEYWORD_IN,
         "nil": TokenType.KEYWORD_NIL,
         "or": TokenType.KEYWORD_OR,
         "print": TokenType.KEYWORD_PRINT,
@@ -267,7 +288,7 @@ class Scanner:
             
         while True:
             if self.is_at_end():  # If we reach the end of the input, the comment is unterminated.
-                raise_error.error(self.line, "Unterminated comment.")
+                self.error(self.start, "Unterminated comment.")
                 return
 
             # if self.peek() == '*' and self.peek_next() == '/':  # look ahead to check for */
@@ -279,10 +300,266 @@ class Scanner:
             # look ahead for '*/' to terminate the comment
             if self.match('*') and self.match('/'):
                 return      # end the comment
-            
-            
-
-            if self.peek() == '\n':
-                self.line += 1
                 
             self.advance()      # consume the character
+
+
+
+class RegexScanner(Scanner):
+    """
+    Alternative scanner engine that recognizes whole lexemes in one step.
+
+    Instead of walking the source one character at a time, a single compiled
+    master regex matches the next lexeme and `str.find` skips over string
+    bodies and block comments in bulk. The produced tokens and the reported
+    diagnostics are the same as the ones of `Scanner`.
+    """
+
+    TOKEN_PATTERN = re.compile(r"""
+          (?P<space>[ \t\r\n]+)
+        | (?P<identifier>[^\W\d]\w*)
+        | (?P<number>\d+(?:\.\d+)?)
+        | (?P<comment>//[^\n]*)
+        | (?P<block_comment>/\*)
+        | (?P<string>")
+        | (?P<operator>!=|==|<=|>=|\.\.|[(){}\[\],.\-+;:*/!=<>])
+        | (?P<unexpected>.)
+    """, re.VERBOSE | re.DOTALL)
+
+    OPERATORS = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        "[": TokenType.LEFT_BRACKET,
+        "]": TokenType.RIGHT_BRACKET,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "..": TokenType.DOT_DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.ASTERISK,
+        ":": TokenType.COLON,
+        "/": TokenType.FORWARD_SLASH,
+        "!": TokenType.EXCLAMATION,
+        "!=": TokenType.EXCLAMATION_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS_THAN,
+        "<=": TokenType.LESS_THAN_EQUAL,
+        ">": TokenType.GREATER_THAN,
+        ">=": TokenType.GREATER_THAN_EQUAL,
+    }
+
+
+    def scan_tokens(self):
+        end = self.scan_chunk(self.source, final=True)
+        self.tokens.append(TokenType.EOF, end, end)
+        return self.tokens
+
+
+    def scan_chunk(self, source, final):
+        """
+        Scans `source` and appends its tokens to `self.tokens`, a buffer
+        over the same `source`.
+
+        Unless `final` is set, scanning stops in front of a lexeme that may
+        continue past the end of `source` (an unterminated string or comment,
+        or any lexeme touching the end of the chunk).
+
+        Returns:
+            int: The offset of the first character that was not consumed.
+        """
+        length = len(source)
+        tokens = self.tokens
+        add_token = tokens.append
+        symbol_ids = self.symbol_table.ids
+        intern = self.symbol_table.intern
+        match = self.TOKEN_PATTERN.match
+        keywords = self.KEYWORDS
+        operators = self.OPERATORS
+        pos = 0
+
+        while pos < length:
+            m = match(source, pos)
+            kind = m.lastgroup
+            end = m.end()
+
+            if kind == "space":
+                pos = end
+                continue
+
+            if end == length and not final:
+                break   # the lexeme may continue in the next chunk
+
+            if kind == "identifier":
+                text = m.group()
+                kind = keywords.get(text)
+                if kind is not None:
+                    add_token(kind, pos, end)
+                else:
+                    symbol = symbol_ids.get(text)
+                    if symbol is None:
+                        symbol = intern(text)
+                    add_token(IDENTIFIER, pos, end, None, symbol)
+
+            elif kind == "operator":
+                text = m.group()
+                add_token(operators[text], pos, end)
+
+            elif kind == "number":
+                text = m.group()
+                if "." in text and source[end:end + 1] == "." and source[end + 1:end + 2] != ".":
+                    self.error(pos, "Invalid number format: trailing decimal point")
+                else:
+                    try:
+                        add_token(NUMBER_LITERAL, pos, end, float(text))
+                    except ValueError:
+                        self.error(pos, f"Invalid number: {text}")
+
+            elif kind == "string":
+                close = source.find('"', end)
+                if close == -1:
+                    if not final:
+                        break
+                    self.error(pos, "Unterminated string.")
+                    end = length
+                else:
+                    end = close + 1
+                    add_token(STRING_LITERAL, pos, end, source[pos + 1:close])
+
+            elif kind == "block_comment":
+                close = source.find("*/", end)
+                if close == -1:
+                    if not final:
+                        break
+                    self.error(pos, "Unterminated comment.")
+                    end = length
+                else:
+                    end = close + 2
+
+            elif kind == "unexpected":
+                self.error(pos, f"Unexpected character: {m.group()}")
+
+            # line comments are skipped without producing a token
+            pos = end
+
+        return pos
+
+
+
+class StreamScanner(RegexScanner):
+    """
+    Scanner that reads its source lazily from a file object.
+
+    Tokens are produced line by line as the input arrives, so only the
+    unconsumed tail of the input is kept in memory.
+    """
+
+    def __init__(self, file, symbol_table=None):
+        super().__init__("", symbol_table)
+        self.file = file
+
+
+    def scan_tokens(self):
+        """
+        Yields the tokens of the input as soon as they are scanned,
+        ending with the EOF token.
+
+        Every chunk of input is scanned into its own buffer, which knows the
+        line and column the chunk starts at, and its tokens are materialized
+        before the chunk is dropped. While a string or block comment is
+        open, the chunks are only searched for its end and scanned once it
+        arrives, so a construct spanning many lines is scanned once.
+        """
+        pending = ""
+        line, column = 1, 1     # position of the first pending character
+        closing = None          # end of the string or comment open at the start of `pending`
+        waiting = []            # chunks read while waiting for `closing`
+        for chunk in self.file:
+            if closing is not None:
+                # the end may be split between the previous chunk and this one
+                previous = waiting[-1] if waiting else pending
+                waiting.append(chunk)
+                if closing not in previous[-1:] + chunk:
+                    continue
+                pending += "".join(waiting)
+                waiting = []
+            else:
+                pending += chunk
+            self.tokens = TokenBuffer(pending, line, column, self.symbol_table)
+            consumed = self.scan_chunk(pending, final=False)
+            line, column = self.tokens.line_index.position(consumed)
+            pending = pending[consumed:]
+            closing = self.open_construct(pending)
+            yield from self.tokens
+
+        pending += "".join(waiting)
+        self.tokens = TokenBuffer(pending, line, column, self.symbol_table)
+        end = self.scan_chunk(pending, final=True)
+        self.tokens.append(TokenType.EOF, end, end)
+        yield from self.tokens
+
+
+    @staticmethod
+    def open_construct(pending):
+        """
+        Returns the end of the unterminated string or block comment
+        `pending` starts with, or None.
+        """
+        if pending.startswith('"') and pending.find('"', 1) == -1:
+            return '"'
+        if pending.startswith("/*") and pending.find("*/", 2) == -1:
+            return "*/"
+        return None
+
+
+
+class TokenStream:
+    """
+    List-like view over a lazily scanned sequence of tokens.
+
+    Tokens are pulled from the underlying iterator the first time they are
+    indexed, and tokens the parser no longer needs can be discarded, so the
+    parser can walk an unbounded input with a small window of tokens.
+    Like `TokenBuffer`, it exposes the token kinds through `kinds`.
+    """
+
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self.window = []    # buffered tokens, starting at `offset`
+        self.offset = 0     # absolute index of window[0]
+        self.kinds = self.Kinds(self)
+
+
+    class Kinds:
+        """Sequence of the kinds of the tokens of a `TokenStream`."""
+
+        def __init__(self, stream):
+            self.stream = stream
+
+        def __getitem__(self, index):
+            return self.stream[index].type
+
+
+    def __getitem__(self, index):
+        index -= self.offset
+        window = self.window
+        while index >= len(window):
+            window.append(next(self._tokens))
+        return window[index]
+
+
+    def discard(self, index):
+        """Forgets every token before the absolute `index`."""
+        del self.window[:index - self.offset]
+        self.offset = index
+
+
+
+# scanner engines selectable from the command line
+ENGINES = {
+    "classic": Scanner,
+    "regex": RegexScanner,
+}
@@ -0,0 +1,38 @@
+import sys
+
+
+class SymbolTable:
+    """
+    Interns the identifiers of a program and numbers them.
+
+    Every distinct identifier is stored once, as an interned string, and is
+    given a small integer id the first time the scanner sees it. Tokens,
+    AST nodes and `Environment` keys all share that single string object,
+    so variable lookups compare identical, pre-hashed keys.
+    """
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids = {}       # name -> symbol id
+        self.names = []     # symbol id -> name
+
+
+    def intern(self, name):
+        """Returns the symbol id of `name`, registering it if it is new."""
+        symbol = self.ids.get(name)
+        if symbol is None:
+            name = sys.intern(name)
+            symbol = len(self.names)
+            self.ids[name] = symbol
+            self.names.append(name)
+        return symbol
+
+
+    def name_of(self, symbol):
+        """Returns the interned name of the given symbol id."""
+        return self.names[symbol]
+
+
+    def __len__(self):
+        return len(self.names)
@@ -8,16 +8,39 @@ class Token:
         type_ (TokenType): The type of the token (e.g., identifier, keyword, operator).
         lexeme (str): The actual string representation of the token from the source code.
         literal (object): The literal value of the token, if applicable (e.g., number or string values).
-        line (int): The line number in the source code where the token appears.
+        line (int): The line number in the source code where the token appears, or None
+            to compute it from `offset` and `lines` when it is first needed.
+        offset (int): The offset of the token in the source code, if known.
+        lines (LineIndex): Maps `offset` to the line and column of the token.
+        symbol (int): The symbol id of an identifier, -1 for other tokens.
 
     Methods:
         __str__(): Returns a formatted string representation of the token for debugging and logging purposes.
     """
-    def __init__(self, type_: TokenType, lexeme: str, literal: object, line: int):
+    __slots__ = ("type", "lexeme", "literal", "offset", "lines", "symbol", "_line")
+
+    def __init__(self, type_: TokenType, lexeme: str, literal: object, line: int, offset: int = None, lines=None,
+                 symbol: int = -1):
         self.type = type_
         self.lexeme = lexeme
         self.literal = literal
-        self.line = line
+        self.offset = offset
+        self.lines = lines
+        self.symbol = symbol
+        self._line = line
+
+    @property
+    def line(self) -> int:
+        if self._line is None:
+            self._line = self.lines.line_of(self.offset)
+        return self._line
+
+    @property
+    def column(self):
+        """The column of the token, or None when its position is unknown."""
+        if self.lines is None:
+            return None
+        return self.lines.column_of(self.offset)
 
     def __str__(self) -> str:
-        return f"{self.type}({self.lexeme}, {self.literal})"
\ No newline at end of file
+        return f"{self.type}({self.lexeme}, {self.literal})"
@@ -0,0 +1,85 @@
+from array import array
+from flint.line_index import LineIndex
+from flint.symbol_table import SymbolTable
+from flint.token import Token
+from flint.token_types import TokenType
+
+# token types indexed by their integer kind
+TOKEN_TYPES = [None] + list(TokenType)
+
+
+class TokenBuffer:
+    """
+    Compact storage for the tokens of a source string.
+
+    Tokens are kept as parallel arrays of integer kinds and start/end
+    offsets into the source, so scanning a large file allocates a handful of
+    arrays instead of one object per token. Literal values are stored only
+    for the tokens that have one, and lines and columns are derived from the
+    offsets through `line_index` only when they are reported.
+
+    Identifiers are interned in `symbol_table` at scan time and only their
+    symbol id is kept per token.
+
+    Indexing the buffer materializes a `Token` on demand, slicing its
+    lexeme out of the source at that point (or, for identifiers, reusing
+    the interned name).
+
+    Args:
+        source (str): The scanned source.
+        line (int): The line of the first character of `source`.
+        column (int): The column of the first character of `source`.
+        symbol_table (SymbolTable): The table identifiers are interned in.
+    """
+
+    __slots__ = ("source", "kinds", "starts", "ends", "symbols", "literals", "line_index", "symbol_table")
+
+    def __init__(self, source, line=1, column=1, symbol_table=None):
+        self.source = source
+        self.kinds = array("B")     # TokenType values
+        self.starts = array("q")    # offset of the first character
+        self.ends = array("q")      # offset past the last character
+        self.symbols = array("l")   # symbol id of identifiers, -1 otherwise
+        self.literals = {}          # token index -> literal value
+        self.line_index = LineIndex(source, line, column)
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+
+
+    def append(self, kind, start, end, literal=None, symbol=-1):
+        """Appends a token given its kind, source span, literal and symbol id."""
+        if literal is not None:
+            self.literals[len(self.kinds)] = literal
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.symbols.append(symbol)
+
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+    def __getitem__(self, index):
+        """Materializes the token at `index`."""
+        if index < 0:
+            index += len(self.kinds)
+        start = self.starts[index]
+        symbol = self.symbols[index]
+        if symbol >= 0:
+            lexeme = self.symbol_table.names[symbol]
+        else:
+            lexeme = self.source[start:self.ends[index]]
+        return Token(
+            TOKEN_TYPES[self.kinds[index]],
+            lexeme,
+            self.literals.get(index),
+            None,
+            start,
+            self.line_index,
+            symbol,
+        )
+
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
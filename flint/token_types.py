@@ -1,6 +1,6 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     """
     This class categorizes tokens into:
     - Single-character tokens (e.g., parentheses, operators).
@@ -8,8 +8,13 @@ class TokenType(Enum):
     - Literals (e.g., identifiers, strings, numbers).
     - Keywords (reserved words in the language).
     - Special tokens (e.g., end-of-file).
+
+    Members are small integers so token kinds can be stored in compact
+    arrays and compared as plain ints.
     """
 
+    __str__ = Enum.__str__
+
     # Single-character tokens
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
@@ -22,6 +27,9 @@ class TokenType(Enum):
     SEMICOLON = auto()
     FORWARD_SLASH = auto()
     ASTERISK = auto()
+    LEFT_BRACKET = auto()
+    RIGHT_BRACKET = auto()
+    COLON = auto()
 
     # One or two character tokens
     EQUAL = auto()
@@ -33,6 +41,7 @@ class TokenType(Enum):
     GREATER_THAN_EQUAL = auto()
     LESS_THAN = auto()
     LESS_THAN_EQUAL = auto()
+    DOT_DOT = auto()
 
     # Literals
     IDENTIFIER = auto()
@@ -47,6 +56,7 @@ class TokenType(Enum):
     KEYWORD_FUNCTION = auto()
     KEYWORD_FOR = auto()
     KEYWORD_IF = auto()
+    KEYWORD_IN = auto()
     KEYWORD_NIL = auto()
     KEYWORD_OR = auto()
     KEYWORD_PRINT = auto()
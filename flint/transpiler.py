@@ -0,0 +1,608 @@
+import math
+from flint.ast.expr import *
+from flint.ast.stmt import *
+from flint.token_types import TokenType
+from flint.runtime_error import CustomRunTimeError
+from flint.flint_callable import FlintCallable, NativeFunction
+from flint.interpreter import Interpreter
+from flint.arrays import get_index, set_index, get_slice
+from tools.raise_error import runtime_error
+
+
+# operators whose operands must be numbers, with the Python operator they become
+NUMERIC_OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.ASTERISK: "*",
+    TokenType.GREATER_THAN: ">",
+    TokenType.GREATER_THAN_EQUAL: ">=",
+    TokenType.LESS_THAN: "<",
+    TokenType.LESS_THAN_EQUAL: "<=",
+}
+
+# slow paths of the numeric operators, once the operands were checked
+NUMERIC_FUNCTIONS = {
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+# operators that always produce a boolean
+BOOLEAN_OPERATORS = {
+    TokenType.EQUAL_EQUAL, TokenType.EXCLAMATION_EQUAL,
+    TokenType.GREATER_THAN, TokenType.GREATER_THAN_EQUAL,
+    TokenType.LESS_THAN, TokenType.LESS_THAN_EQUAL,
+}
+
+
+class Position:
+    """
+    Stands in for the token of a runtime error raised by transpiled code.
+
+    The generated code only embeds `(line, column, lexeme)` tuples, so its
+    code object can be marshaled, and builds a `Position` when it fails.
+    """
+    __slots__ = ("line", "column", "lexeme")
+
+    def __init__(self, line, column, lexeme):
+        self.line = line
+        self.column = column
+        self.lexeme = lexeme
+
+
+
+class PythonFunction(FlintCallable):
+    """A Flint function transpiled to a Python function."""
+    __slots__ = ("function", "name", "arity_count")
+
+    def __init__(self, function, name, arity_count):
+        self.function = function
+        self.name = name
+        self.arity_count = arity_count
+
+
+    def arity(self):
+        return self.arity_count
+
+
+    def call(self, interpreter, arguments):
+        return self.function(*arguments)
+
+
+    def python_function(self, interpreter):
+        return self.function
+
+
+    def to_string(self):
+        return f"<fn {self.name}>"
+
+
+
+class PythonInterpreter(Interpreter):
+    """
+    Execution engine that transpiles the program to Python source and lets
+    CPython compile and run it.
+
+    Flint locals become Python locals and Flint functions Python functions,
+    so the hot paths run as CPython bytecode. Operators test their operands
+    inline and only call a helper to convert or report a runtime error, so
+    Flint's float arithmetic, truthiness and error messages are kept.
+
+    Programs too deeply nested for CPython's compiler are run by the
+    inherited tree-walking methods instead.
+    """
+
+    FILENAME = "<flint>"
+
+    def interpret(self, statements):
+        """
+        Transpiles and runs the statements: all at once for a list, one at
+        a time for a stream.
+        """
+        if isinstance(statements, list):
+            self.run_statements(statements)
+            return
+
+        for statement in statements:
+            if statement is not None and not self.run_statements([statement]):
+                return
+
+
+    def run_statements(self, statements):
+        """
+        Runs the statements, reporting runtime errors.
+
+        Returns:
+            bool: False if the program stopped on a runtime error.
+        """
+        try:
+            code = self.compile(statements)
+        except (SyntaxError, RecursionError, MemoryError):
+            # nesting beyond what CPython's parser accepts, walk the tree instead
+            try:
+                for statement in statements:
+                    self.execute(statement)
+            except CustomRunTimeError as error:
+                runtime_error(error)
+                return False
+            return True
+        return self.run_code(code)
+
+
+    def compile(self, statements):
+        """Transpiles the statements into a Python code object."""
+        source = Transpiler().transpile(statements)
+        return compile(source, self.FILENAME, "exec")
+
+
+    def run_code(self, code):
+        """
+        Runs the code object of a transpiled program, reporting runtime errors.
+
+        Returns:
+            bool: False if the program stopped on a runtime error.
+        """
+        namespace = self.namespace()
+        try:
+            exec(code, namespace)
+            namespace["_main"]()
+        except CustomRunTimeError as error:
+            runtime_error(error)
+            return False
+        except RecursionError as error:
+            line = self.flint_line(error, namespace["_LINES"])
+            runtime_error(CustomRunTimeError(Position(line, None, ""), "Stack overflow."))
+            return False
+        return True
+
+
+    def flint_line(self, error, lines):
+        """
+        Maps the innermost line of transpiled code in the traceback of
+        `error` that was generated from a Flint line to that line.
+        """
+        line = 0
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == self.FILENAME and lines[traceback.tb_lineno]:
+                line = lines[traceback.tb_lineno]
+            traceback = traceback.tb_next
+        return line
+
+
+    def namespace(self):
+        """The globals of transpiled code: the helpers it calls."""
+        environment = self.globals
+        interpreter = self
+        stringify = self.stringify
+
+        def define(position, value):
+            environment.define(Position(*position), value)
+
+        def get(position):
+            return environment.get(Position(*position))
+
+        def assign(position, value):
+            environment.assign(Position(*position), value)
+            return value
+
+        def print_value(value):
+            print(stringify(value))
+
+        def numeric(operator, a, b, position):
+            self.check_number_operands(Position(*position), a, b)
+            return NUMERIC_FUNCTIONS[operator](float(a), float(b))
+
+        def add(a, b, position):
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                return float(a) + float(b)
+            if isinstance(a, str) and isinstance(b, str):
+                return a + b
+            raise CustomRunTimeError(Position(*position), "Operands must be two numbers or two strings.")
+
+        def divide(a, b, position):
+            self.check_number_operands(Position(*position), a, b)
+            try:
+                return float(a) / float(b)
+            except ZeroDivisionError:
+                raise CustomRunTimeError(Position(*position), "Division by zero is not allowed.")
+
+        def negate(value, position):
+            self.check_number_operand(Position(*position), value)
+            return -float(value)
+
+        def count_range(position, start, end):
+            # the values of the loop variable of `for (name in start..end)`
+            count = self.range_count(Position(*position), start, end)
+            return map(float(start).__add__, range(count))
+
+        def index_array(array, index, position):
+            return get_index(Position(*position), array, index)
+
+        def store_array(array, index, value, position):
+            return set_index(Position(*position), array, index, value)
+
+        def slice_array(array, start, end, position):
+            return get_slice(Position(*position), array, start, end)
+
+        def slow_call(callee, position):
+            # checks the callee once the arguments have been evaluated
+            def call(*arguments):
+                if not isinstance(callee, FlintCallable):
+                    raise CustomRunTimeError(Position(*position), "Can only call functions and classes.")
+                if not callee.accepts(len(arguments)):
+                    raise CustomRunTimeError(Position(*position), f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+                try:
+                    if type(callee) is NativeFunction:
+                        return callee.function(*arguments)
+                    return callee.call(interpreter, list(arguments))
+                except CustomRunTimeError as error:
+                    raise error.located(Position(*position))
+            return call
+
+        return {
+            "__builtins__": __builtins__,
+            "_depth": 0,
+            "_max_depth": self.max_call_depth,
+            "_g": environment.values,
+            "_Function": PythonFunction,
+            "_define": define,
+            "_get": get,
+            "_assign": assign,
+            "_print": print_value,
+            "_numeric": numeric,
+            "_add": add,
+            "_divide": divide,
+            "_negate": negate,
+            "_range": count_range,
+            "_index": index_array,
+            "_set_index": store_array,
+            "_slice": slice_array,
+            "_slow_call": slow_call,
+        }
+
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """
+    Translates resolved statements into the source of a Python module.
+
+    The module defines `_main()`, which runs the top-level statements, and
+    `_LINES`, which maps every line of the module to the Flint line it was
+    generated from. Statement visitors emit lines, expression visitors
+    return Python expressions.
+    """
+
+    def __init__(self):
+        self.lines = []         # lines of Python source
+        self.flint_lines = [0]  # Flint line of each Python line, which count from 1
+        self.indent = 0
+        self.line = 0           # line of the last token seen
+        self.scopes = []        # Python names of the slots of the open blocks
+        self.names = 0          # counter making Python names unique
+
+
+    def transpile(self, statements):
+        """Returns the Python source of the module running `statements`."""
+        self.emit("def _main():")
+        self.emit_body(statements)
+        self.emit(f"_LINES = {tuple(self.flint_lines + [self.line])!r}")
+        return "\n".join(self.lines) + "\n"
+
+
+    ############################################
+    # Emitting code
+    ############################################
+
+    def emit(self, line):
+        self.lines.append("    " * self.indent + line)
+        self.flint_lines.append(self.line)
+
+
+    def emit_body(self, statements):
+        """Emits an indented suite, which can't be empty in Python."""
+        self.indent += 1
+        emitted = len(self.lines)
+        for statement in statements:
+            self.emit_stmt(statement)
+        if len(self.lines) == emitted:
+            self.emit("pass")
+        self.indent -= 1
+
+
+    def emit_stmt(self, stmt):
+        if stmt is not None:
+            stmt.accept(self)
+
+
+    def expression(self, expr):
+        return expr.accept(self)
+
+
+    def fresh(self, name):
+        """Returns a new Python name, which can't clash with the helpers."""
+        self.names += 1
+        return f"{name}_{self.names}"
+
+
+    def position(self, token):
+        """Returns the `(line, column, lexeme)` literal locating `token`."""
+        self.line = token.line
+        return repr((token.line, token.column, token.lexeme))
+
+
+    def local_name(self, depth, slot):
+        return self.scopes[-1 - depth][slot]
+
+
+    def declare(self, slot, lexeme):
+        """Names the Python variable of a new local."""
+        name = self.fresh(lexeme)
+        self.scopes[-1][slot] = name
+        return name
+
+
+    def truthy(self, expr):
+        """Returns a Python condition testing `expr` with Flint's truthiness."""
+        code = self.expression(expr)
+        if self.is_boolean(expr):
+            return code
+        value = self.fresh("_t")
+        return f"(({value} := {code}) is not False and {value} is not None)"
+
+
+    def is_boolean(self, expr):
+        """True if `expr` always evaluates to a boolean."""
+        if isinstance(expr, Grouping):
+            return self.is_boolean(expr.expression)
+        if isinstance(expr, Literal):
+            return isinstance(expr.value, bool)
+        if isinstance(expr, Binary):
+            return expr.operator.type in BOOLEAN_OPERATORS
+        if isinstance(expr, Unary):
+            return expr.operator.type == TokenType.EXCLAMATION
+        if isinstance(expr, Logical):
+            return self.is_boolean(expr.left) and self.is_boolean(expr.right)
+        return False
+
+
+    ############################################
+    # Statements
+    ############################################
+
+    def visit_block(self, stmt):
+        # a block declaring nothing has no scope of its own
+        if stmt.frame_size:
+            self.scopes.append([None] * stmt.frame_size)
+        for statement in stmt.statements:
+            self.emit_stmt(statement)
+        if stmt.frame_size:
+            self.scopes.pop()
+
+
+    def visit_expression(self, stmt):
+        self.emit(self.expression(stmt.expression))
+
+
+    def visit_function(self, stmt):
+        name = self.fresh(stmt.name.lexeme)
+
+        enclosing = self.scopes
+        self.scopes = [[None] * stmt.frame_size]
+        params = [self.declare(slot, param.lexeme) for slot, param in enumerate(stmt.params)]
+        self.line = stmt.name.line
+        self.emit(f"def {name}({', '.join(params)}):")
+        # count the calls in progress, stopping at the interpreter's max_call_depth;
+        # these lines map to no Flint line, so the overflow is reported at the call
+        self.indent += 1
+        self.line = 0
+        self.emit("global _depth")
+        self.emit("if _depth == _max_depth:")
+        self.emit("    raise RecursionError     # reported like running out of Python stack")
+        self.emit("_depth += 1")
+        self.line = stmt.name.line
+        self.emit("try:")
+        self.emit_body(stmt.body)
+        self.line = 0
+        self.emit("finally:")
+        self.emit("    _depth -= 1")
+        self.indent -= 1
+        self.scopes = enclosing
+
+        function = f"_Function({name}, {stmt.name.lexeme!r}, {len(stmt.params)})"
+        if stmt.slot is None:
+            self.emit(f"_define({self.position(stmt.name)}, {function})")
+        else:
+            self.line = stmt.name.line
+            self.emit(f"{self.declare(stmt.slot, stmt.name.lexeme)} = {function}")
+
+
+    def visit_if_stmt(self, stmt):
+        self.emit(f"if {self.truthy(stmt.condition)}:")
+        self.emit_body([stmt.then_branch])
+        if stmt.else_branch is not None:
+            self.emit("else:")
+            self.emit_body([stmt.else_branch])
+
+
+    def visit_print(self, stmt):
+        self.emit(f"_print({self.expression(stmt.expression)})")
+
+
+    def visit_return_stmt(self, stmt):
+        value = "None" if stmt.value is None else self.expression(stmt.value)
+        self.emit(f"return {value}")
+
+
+    def visit_var(self, stmt):
+        value = "None" if stmt.initializer is None else self.expression(stmt.initializer)
+        if stmt.slot is None:
+            self.emit(f"_define({self.position(stmt.name)}, {value})")
+        else:
+            self.line = stmt.name.line
+            self.emit(f"{self.declare(stmt.slot, stmt.name.lexeme)} = {value}")
+
+
+    def visit_while_stmt(self, stmt):
+        self.emit(f"while {self.truthy(stmt.condition)}:")
+        self.emit_body([stmt.body])
+
+
+    def visit_for_stmt(self, stmt):
+        if stmt.frame_size:
+            self.scopes.append([None] * stmt.frame_size)
+        self.emit_stmt(stmt.initializer)
+
+        condition = "True" if stmt.condition is None else self.truthy(stmt.condition)
+        self.emit(f"while {condition}:")
+        body = [stmt.body]
+        if stmt.increment is not None:
+            body.append(Expression(stmt.increment))
+        self.emit_body(body)
+        if stmt.frame_size:
+            self.scopes.pop()
+
+
+    def visit_for_range(self, stmt):
+        start = self.expression(stmt.start)
+        end = self.expression(stmt.end)
+        position = self.position(stmt.operator)
+
+        self.scopes.append([None] * stmt.frame_size)
+        name = self.declare(stmt.slot, stmt.name.lexeme)
+        self.emit(f"for {name} in _range({position}, {start}, {end}):")
+        self.emit_body([stmt.body])
+        self.scopes.pop()
+
+
+    ############################################
+    # Expressions
+    ############################################
+
+    def visit_assign(self, expr):
+        value = self.expression(expr.value)
+        if expr.depth is None:
+            return f"_assign({self.position(expr.name)}, {value})"
+        self.line = expr.name.line
+        return f"({self.local_name(expr.depth, expr.slot)} := {value})"
+
+
+    def visit_binary(self, expr):
+        kind = expr.operator.type
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        position = self.position(expr.operator)
+
+        # Python's equality matches Interpreter.is_equal for Flint's values
+        if kind == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if kind == TokenType.EXCLAMATION_EQUAL:
+            return f"({left} != {right})"
+
+        a = self.fresh("_a")
+        b = self.fresh("_b")
+        # both operands are evaluated before they are tested
+        test = f"(type({a} := {left}) is float) & (type({b} := {right}) is float)"
+
+        if kind == TokenType.PLUS:
+            return f"({a} + {b} if {test} else _add({a}, {b}, {position}))"
+
+        if kind == TokenType.FORWARD_SLASH:
+            # a zero divisor takes the slow path to report the error
+            return f"({a} / {b} if {test} and {b} else _divide({a}, {b}, {position}))"
+
+        operator = NUMERIC_OPERATORS[kind]
+        if isinstance(expr.right, Literal) and type(expr.right.value) is float:
+            # a number literal doesn't need testing
+            return f"({a} {operator} {right} if type({a} := {left}) is float else _numeric({operator!r}, {a}, {right}, {position}))"
+        return f"({a} {operator} {b} if {test} else _numeric({operator!r}, {a}, {b}, {position}))"
+
+
+    def visit_call(self, expr):
+        callee = self.expression(expr.callee)
+        arguments = ", ".join(self.expression(argument) for argument in expr.arguments)
+        function = self.fresh("_f")
+        position = self.position(expr.paren)
+
+        # the callee is picked before the arguments are evaluated, and only
+        # checked after, so errors are raised in the same order as the interpreter
+        count = len(expr.arguments)
+        pick = f"({function}.function if type({function} := {callee}) is _Function and {function}.arity_count == {count} else _slow_call({function}, {position}))"
+        return f"{pick}({arguments})"
+
+
+    def visit_grouping(self, expr):
+        return self.expression(expr.expression)
+
+
+    def visit_array(self, expr):
+        return f"[{', '.join(self.expression(element) for element in expr.elements)}]"
+
+
+    def visit_index(self, expr):
+        array = self.expression(expr.object)
+        index = self.expression(expr.index)
+        return f"_index({array}, {index}, {self.position(expr.bracket)})"
+
+
+    def visit_set_index(self, expr):
+        array = self.expression(expr.object)
+        index = self.expression(expr.index)
+        value = self.expression(expr.value)
+        return f"_set_index({array}, {index}, {value}, {self.position(expr.bracket)})"
+
+
+    def visit_slice(self, expr):
+        array = self.expression(expr.object)
+        start = "None" if expr.start is None else self.expression(expr.start)
+        end = "None" if expr.end is None else self.expression(expr.end)
+        return f"_slice({array}, {start}, {end}, {self.position(expr.bracket)})"
+
+
+    def visit_literal(self, expr):
+        value = expr.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"float({str(value)!r})"
+        return repr(value)
+
+
+    def visit_logical(self, expr):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+
+        # Python's `or`/`and` return the deciding operand just like Flint's,
+        # but only agree with Flint's truthiness on booleans
+        if self.is_boolean(expr.left):
+            python_operator = "or" if expr.operator.type == TokenType.KEYWORD_OR else "and"
+            return f"({left} {python_operator} {right})"
+
+        value = self.fresh("_t")
+        truthy = f"(({value} := {left}) is not False and {value} is not None)"
+        if expr.operator.type == TokenType.KEYWORD_OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+
+    def visit_unary(self, expr):
+        right = self.expression(expr.right)
+        position = self.position(expr.operator)
+
+        if expr.operator.type == TokenType.EXCLAMATION:
+            if self.is_boolean(expr.right):
+                return f"(not {right})"
+            value = self.fresh("_t")
+            return f"(({value} := {right}) is False or {value} is None)"
+
+        value = self.fresh("_a")
+        return f"(-{value} if type({value} := {right}) is float else _negate({value}, {position}))"
+
+
+    def visit_variable(self, expr):
+        if expr.depth is not None:
+            self.line = expr.name.line
+            return self.local_name(expr.depth, expr.slot)
+
+        lexeme = expr.name.lexeme
+        return f"(_g[{lexeme!r}] if {lexeme!r} in _g else _get({self.position(expr.name)}))"
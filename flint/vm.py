@@ -0,0 +1,293 @@
+from flint.compiler import *
+from flint.runtime_error import CustomRunTimeError
+from flint.flint_callable import FlintCallable, NativeFunction
+from flint.interpreter import Interpreter
+from flint.arrays import get_index, set_index, get_slice
+from tools.raise_error import runtime_error
+
+
+class VM(Interpreter):
+    """
+    Stack-based virtual machine running the bytecode of `Compiler`.
+
+    Operands and intermediate values live on a single value stack, each call
+    gets a flat list of local slots, and Flint calls push a frame on the
+    VM's own frame stack instead of recursing in Python.
+
+    The tree-walking methods are inherited, so the optimizer can still
+    evaluate expressions with `evaluate`.
+    """
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.compiler = Compiler()
+
+
+    def interpret(self, statements):
+        """
+        Compiles and runs the statements one at a time, reporting runtime
+        errors.
+        """
+        try:
+            for statement in statements:
+                if statement is not None:
+                    self.run(self.compiler.compile([statement]), [])
+        except CustomRunTimeError as error:
+            runtime_error(error)
+
+
+    def run(self, function, arguments):
+        """Runs `function` with the given arguments and returns its result."""
+        code = function.code
+        constants = function.constants
+        slots = list(arguments)
+        slots.extend([None] * (function.frame_size - len(slots)))
+        ip = 0
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = []     # (function, return address, slots) of the callers
+        max_frames = self.max_call_depth
+        global_values = self.globals.values
+
+        while True:
+            op = code[ip]
+
+            if op == GET_LOCAL:
+                push(slots[code[ip + 1]])
+                ip += 2
+
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+
+            elif op == GET_GLOBAL:
+                name = constants[code[ip + 1]]
+                try:
+                    push(global_values[name.lexeme])
+                except KeyError:
+                    push(self.globals.get(name))    # reports the undefined variable
+                ip += 2
+
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is False or value is None:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+
+            elif op == CALL or op == TAIL_CALL:
+                argument_count = code[ip + 1]
+                callee = stack[-1 - argument_count]
+
+                if type(callee) is BytecodeFunction and callee.arity_count == argument_count:
+                    # in tail position, the callee takes over the frame of the
+                    # returning function
+                    if op == CALL:
+                        if len(frames) == max_frames:
+                            raise CustomRunTimeError(constants[code[ip + 2]], "Stack overflow.")
+                        frames.append((function, ip + 3, slots))
+
+                    # the arguments become the first local slots of the callee
+                    slots = stack[len(stack) - argument_count:]
+                    del stack[len(stack) - argument_count - 1:]
+                    slots.extend([None] * (callee.frame_size - argument_count))
+
+                    function = callee
+                    code = function.code
+                    constants = function.constants
+                    ip = 0
+                    continue
+
+                arguments = stack[len(stack) - argument_count:]
+                del stack[len(stack) - argument_count - 1:]
+                paren = constants[code[ip + 2]]
+
+                if type(callee) is NativeFunction and callee.accepts(argument_count):
+                    try:
+                        push(callee.function(*arguments))
+                    except CustomRunTimeError as error:
+                        raise error.located(paren)
+                    ip += 3
+                    continue
+
+                if not isinstance(callee, FlintCallable):
+                    raise CustomRunTimeError(paren, "Can only call functions and classes.")
+
+                if not callee.accepts(argument_count):
+                    raise CustomRunTimeError(paren, f"Expected {callee.arity()} arguments but got {argument_count}.")
+
+                try:
+                    push(callee.call(self, arguments))
+                except CustomRunTimeError as error:
+                    raise error.located(paren)
+                ip += 3
+
+            elif op == FOR_ITER:
+                hidden = code[ip + 1]
+                value = slots[hidden]
+                if value < slots[hidden + 1]:
+                    slots[code[ip + 2]] = value
+                    slots[hidden] = value + 1.0
+                    ip += 4
+                else:
+                    ip = code[ip + 3]
+
+            elif op == RANGE:
+                end = pop()
+                start = pop()
+                count = self.range_count(constants[code[ip + 2]], start, end)
+                hidden = code[ip + 1]
+                slots[hidden] = float(start)
+                slots[hidden + 1] = float(start) + count
+                ip += 3
+
+            elif op == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+
+                function, ip, slots = frames.pop()
+                code = function.code
+                constants = function.constants
+                push(value)
+
+            elif op == LESS or op == LESS_EQUAL or op == GREATER or op == GREATER_EQUAL \
+                    or op == SUBTRACT or op == MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    self.check_number_operands(constants[code[ip + 1]], a, b)
+                    a, b = float(a), float(b)
+
+                if op == LESS:
+                    stack[-1] = a < b
+                elif op == SUBTRACT:
+                    stack[-1] = a - b
+                elif op == LESS_EQUAL:
+                    stack[-1] = a <= b
+                elif op == GREATER:
+                    stack[-1] = a > b
+                elif op == GREATER_EQUAL:
+                    stack[-1] = a >= b
+                else:
+                    stack[-1] = a * b
+                ip += 2
+
+            elif op == ADD:
+                b = pop()
+                a = stack[-1]
+                if type(a) is float and type(b) is float:
+                    stack[-1] = a + b
+                elif isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                    stack[-1] = float(a) + float(b)
+                elif isinstance(a, str) and isinstance(b, str):
+                    stack[-1] = a + b
+                else:
+                    raise CustomRunTimeError(constants[code[ip + 1]], "Operands must be two numbers or two strings.")
+                ip += 2
+
+            elif op == SET_LOCAL:
+                slots[code[ip + 1]] = stack[-1]
+                ip += 2
+
+            elif op == DEFINE_LOCAL:
+                slots[code[ip + 1]] = pop()
+                ip += 2
+
+            elif op == POP:
+                pop()
+                ip += 1
+
+            elif op == JUMP:
+                ip = code[ip + 1]
+
+            elif op == DIVIDE:
+                b = pop()
+                a = stack[-1]
+                operator = constants[code[ip + 1]]
+                self.check_number_operands(operator, a, b)
+                try:
+                    stack[-1] = float(a) / float(b)
+                except ZeroDivisionError:
+                    raise CustomRunTimeError(operator, "Division by zero is not allowed.")
+                ip += 2
+
+            elif op == EQUAL:
+                b = pop()
+                stack[-1] = self.is_equal(stack[-1], b)
+                ip += 1
+
+            elif op == NOT_EQUAL:
+                b = pop()
+                stack[-1] = not self.is_equal(stack[-1], b)
+                ip += 1
+
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is False or value is None
+                ip += 1
+
+            elif op == NEGATE:
+                self.check_number_operand(constants[code[ip + 1]], stack[-1])
+                stack[-1] = -float(stack[-1])
+                ip += 2
+
+            elif op == JUMP_IF_FALSE_OR_POP:
+                value = stack[-1]
+                if value is False or value is None:
+                    ip = code[ip + 1]
+                else:
+                    pop()
+                    ip += 2
+
+            elif op == JUMP_IF_TRUE_OR_POP:
+                value = stack[-1]
+                if value is not False and value is not None:
+                    ip = code[ip + 1]
+                else:
+                    pop()
+                    ip += 2
+
+            elif op == SET_GLOBAL:
+                self.globals.assign(constants[code[ip + 1]], stack[-1])
+                ip += 2
+
+            elif op == DEFINE_GLOBAL:
+                self.globals.define(constants[code[ip + 1]], pop())
+                ip += 2
+
+            elif op == PRINT:
+                print(self.stringify(pop()))
+                ip += 1
+
+            elif op == ARRAY:
+                count = code[ip + 1]
+                if count:
+                    array = stack[-count:]
+                    del stack[-count:]
+                    push(array)
+                else:
+                    push([])
+                ip += 2
+
+            elif op == GET_INDEX:
+                index = pop()
+                stack[-1] = get_index(constants[code[ip + 1]], stack[-1], index)
+                ip += 2
+
+            elif op == SET_INDEX:
+                value = pop()
+                index = pop()
+                stack[-1] = set_index(constants[code[ip + 1]], stack[-1], index, value)
+                ip += 2
+
+            elif op == SLICE:
+                end = pop()
+                start = pop()
+                stack[-1] = get_slice(constants[code[ip + 1]], stack[-1], start, end)
+                ip += 2
+
+            else:
+                raise ValueError(f"Unknown opcode {op} at offset {ip} of {function.to_string()}.")
@@ -0,0 +1,45 @@
+import pytest
+from flint.scanner import RegexScanner
+from flint.parser import Parser
+from flint.environment import Environment
+from flint.resolver import Resolver
+
+
+def parse_script(source, lazy_bodies=False):
+    return Parser(RegexScanner(source).scan_tokens(), is_repl_mode=False, lazy_bodies=lazy_bodies).parse()
+
+
+def resolve_script(source):
+    statements = parse_script(source)
+    Resolver().resolve(statements)
+    return statements
+
+
+@pytest.fixture
+def parse():
+    """Parses the source of a whole script, as read from a file."""
+    return parse_script
+
+
+@pytest.fixture
+def resolve():
+    """Parses the source of a whole script and resolves its variables."""
+    return resolve_script
+
+
+@pytest.fixture
+def run(capsys):
+    """
+    Runs a script and returns what it printed, as captured by `capsys`.
+
+    `engine` is an interpreter class, or an interpreter to run the script
+    with, and `source` either the source of the script or its statements,
+    already resolved. Keyword arguments set attributes of the interpreter.
+    """
+    def run(engine, source, **attributes):
+        interpreter = engine(Environment()) if isinstance(engine, type) else engine
+        for name, value in attributes.items():
+            setattr(interpreter, name, value)
+        interpreter.interpret(resolve_script(source) if isinstance(source, str) else source)
+        return capsys.readouterr()
+    return run
@@ -0,0 +1,76 @@
+import pytest
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.vm import VM
+from flint.transpiler import PythonInterpreter
+from flint.ast.expr import Array, Index, Set_index, Slice
+from tools import raise_error
+
+
+ENGINES = [Interpreter, ClosureInterpreter, VM, PythonInterpreter]
+
+
+def test_parses_arrays_indexes_and_slices(parse):
+    literal, store, slice = (statement.expression for statement in parse("[1, [2], []]; a[0] = b[1]; a[1:][:2];"))
+
+    assert type(literal) is Array and len(literal.elements) == 3
+    assert literal.elements[1].elements[0].value == 2 and literal.elements[2].elements == []
+    assert type(store) is Set_index and type(store.value) is Index
+    assert type(slice) is Slice and slice.start is None and type(slice.object) is Slice and slice.object.end is None
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_arrays_are_indexed_and_grown(engine, run):
+    source = """
+    var a = [3, 1, 2];
+    a[0] = a[-1] * 10;
+    push(a, "x");
+    print a; print len(a); print a[1:3]; print a[:1]; print a[2:];
+    print pop(a); print a; print [a, []];
+    var b = [1]; push(b, b); print b;
+    """
+    output = run(engine, source)
+
+    assert output.out.splitlines() == [
+        "[20, 1, 2, x]", "4", "[1, 2]", "[20]", "[2, x]", "x", "[20, 1, 2]", "[[20, 1, 2], []]", "[1, [...]]"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bulk_natives(engine, run):
+    source = """
+    fn square(x) { return x * x; }
+    fn big(x) { return x > 2; }
+    fn add(total, x) { return total + x; }
+    var a = [4, 1, 3, 2];
+    print sum(a); print min(a); print max(a); print sort(a); print a;
+    print map(a, square); print filter(a, big); print reduce(a, add, 10);
+    print sort(["b", "a"]); print map([[1], [], [2, 3]], len);
+    """
+    output = run(engine, source)
+
+    assert output.out.splitlines() == [
+        "10", "1", "4", "[1, 2, 3, 4]", "[4, 1, 3, 2]", "[16, 1, 9, 4]", "[4, 3]", "20", "[a, b]", "[1, 0, 2]"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("source, error", [
+    ("var a = [1]; print a[1];", "[line 1, column 21] Array index out of range."),
+    ("print 1[0];", "[line 1, column 8] Only arrays can be indexed."),
+    ("print [1][0.5];", "[line 1, column 10] Array index must be a whole number."),
+    ("print sum([1, true]);", "[line 1, column 20] Elements of 'sum' must be numbers."),
+    ("print map([1], 2);", "[line 1, column 17] 'map' expects a function taking 1 arguments."),
+    # natives report their errors at their call, the innermost one
+    ("fn f(x) { return pop([]); }\nprint map([1], f);", "[line 1, column 24] Can't pop from an empty array."),
+])
+def test_runtime_errors(engine, source, error, run):
+    output = run(engine, source)
+    raise_error.had_error = False
+
+    assert output.err.splitlines()[0] == error
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_natives_can_be_redefined(engine, run):
+    output = run(engine, "fn sum(a, b) { return a + b; } var max = 3; print sum(1, max);")
+
+    assert output.out.split() == ["4"]
@@ -0,0 +1,75 @@
+import os
+from flint import cache
+
+
+SOURCE = 'var greeting = "hi";\n\nprint greeting + 1;\n'
+
+
+def test_round_trip_keeps_positions(tmp_path, parse):
+    script = tmp_path / "main.flint"
+    assert cache.load(str(script), SOURCE) is None
+    assert cache.store(str(script), SOURCE, parse(SOURCE))
+
+    statements = cache.load(str(script), SOURCE)
+    operator = statements[1].expression.operator
+    assert statements[0].name.lexeme == "greeting"
+    assert (operator.lexeme, operator.line, operator.column) == ("+", 3, 16)
+    assert os.listdir(tmp_path / cache.CACHE_DIR_NAME) == [os.path.basename(cache.cache_file(str(script), SOURCE))]
+
+
+def test_changed_source_replaces_entry(tmp_path, parse):
+    script = str(tmp_path / "main.flint")
+    cache.store(script, SOURCE, parse(SOURCE), cache_dir=str(tmp_path / "cache"))
+    changed = SOURCE + "print 2;\n"
+    cache.store(script, changed, parse(changed), cache_dir=str(tmp_path / "cache"))
+
+    assert cache.load(script, SOURCE, cache_dir=str(tmp_path / "cache")) is None
+    assert len(cache.load(script, changed, cache_dir=str(tmp_path / "cache"))) == 3
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+
+
+def test_scripts_of_the_same_name_keep_their_entries(tmp_path, parse):
+    first, second = str(tmp_path / "a" / "main.flint"), str(tmp_path / "b" / "main.flint")
+    other = SOURCE + "print 2;\n"
+    cache.store(first, SOURCE, parse(SOURCE), cache_dir=str(tmp_path / "cache"))
+    cache.store(second, other, parse(other), cache_dir=str(tmp_path / "cache"))
+
+    assert len(cache.load(first, SOURCE, cache_dir=str(tmp_path / "cache"))) == 2
+    assert len(cache.load(second, other, cache_dir=str(tmp_path / "cache"))) == 3
+
+
+def test_cache_directory_is_private_whatever_the_umask(tmp_path, parse):
+    script = str(tmp_path / "main.flint")
+    umask = os.umask(0o002)
+    try:
+        assert cache.store(script, SOURCE, parse(SOURCE))
+    finally:
+        os.umask(umask)
+
+    assert os.stat(tmp_path / cache.CACHE_DIR_NAME).st_mode & 0o777 == 0o700
+    assert cache.load(script, SOURCE) is not None
+
+def test_corrupt_entry_is_a_miss(tmp_path, parse):
+    script = str(tmp_path / "main.flint")
+    cache.store(script, SOURCE, parse(SOURCE))
+    path = cache.cache_file(script, SOURCE)
+    with open(path, "r+b") as file:
+        file.truncate(10)
+    assert cache.load(script, SOURCE) is None
+
+
+def test_entries_others_can_write_are_ignored(tmp_path, parse):
+    script = str(tmp_path / "main.flint")
+    cache.store(script, SOURCE, parse(SOURCE))
+    path = cache.cache_file(script, SOURCE)
+    directory = os.path.dirname(path)
+
+    os.chmod(path, 0o664)
+    assert cache.load(script, SOURCE) is None
+    os.chmod(path, 0o644)
+    assert cache.load(script, SOURCE) is not None
+
+    os.chmod(directory, 0o777)
+    assert cache.load(script, SOURCE) is None
+    assert not cache.store(script, SOURCE, parse(SOURCE))
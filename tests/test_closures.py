@@ -0,0 +1,29 @@
+import pytest
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+
+
+PROGRAM = """
+var a = "g";
+{ var a = a + "1"; { var b = a; a = b + "2"; print a; } print a; }
+fn fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+print fib(15);
+fn classify(n) { while (true) { if (n > 10) { return "big"; } else { return; } } }
+print classify(11); print classify(1);
+for (var i = 0; i < 3; i = i + 1) { print i * 2 - 1 / 4; }
+print !nil and 1 or 2; print 1 == 1.0; print "a" != nil; print -(3) <= -3;
+print 1 + nil;
+"""
+
+
+def test_closure_engine_matches_tree_interpreter(run):
+    expected = run(Interpreter, PROGRAM)
+    compiled = run(ClosureInterpreter, PROGRAM)
+
+    assert compiled == expected
+    assert "610" in expected.out and "Operands must be two numbers or two strings." in expected.err
+
+
+@pytest.mark.parametrize("source", ['print -"a";', "print 1 < nil;", "print 1 / 0;", "nil();", "fn f(a) {} f();", "print x;"])
+def test_closure_engine_reports_the_same_runtime_errors(source, run):
+    assert run(ClosureInterpreter, source) == run(Interpreter, source)
@@ -0,0 +1,66 @@
+import pytest
+from flint.interpreter import Interpreter
+from flint.resolver import Resolver
+from flint.flat_ast import FlatAst
+from flint.quickening import NumberAdd
+
+
+SOURCE = """
+var greeting = "hi";
+fn fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+for (var i = 0; i < 3; i = i + 1) { print -i; }
+for (j in 0..2) { while (false or j > 5) { j = nil; } }
+{ var a = 1; var b = 2; var c = 3; var d = 4; var e = 5; var f = 6; print f; }
+var xs = [1, [2], []]; xs[1][0] = fib(5); print xs[:2];
+print greeting + " " + fib(10) + !true;
+"""
+
+
+def test_round_trip_through_a_file(tmp_path, parse, run):
+    statements = parse(SOURCE)
+    Resolver().resolve(statements)
+    expected = run(Interpreter, statements)
+
+    path = tmp_path / "main.flat"
+    with open(path, "wb") as file:
+        FlatAst.from_statements(parse(SOURCE)).dump(file)
+    flat = FlatAst.load(str(path))
+    statements = flat.to_statements()
+
+    assert isinstance(flat.kinds, memoryview)
+    Resolver().resolve(statements)
+    assert run(Interpreter, statements) == expected
+
+    operator = statements[-1].expression.operator
+    assert (operator.lexeme, operator.line, operator.column) == ("+", 8, 32)
+
+
+def test_keeps_the_resolver_annotations(parse):
+    statements = parse(SOURCE)
+    Resolver().resolve(statements)
+
+    copy = FlatAst.from_buffer(FlatAst.from_statements(statements).to_bytes()).to_statements()
+
+    declarations = copy[4].statements
+    assert [var.slot for var in declarations[:-1]] == [0, 1, 2, 3, 4, 5]
+    assert copy[4].frame_size == 6
+    assert declarations[-1].expression.depth == 0
+    assert copy[1].slot is None and copy[1].body[1].value.left.callee.depth is None
+
+
+def test_nesting_is_not_bounded_by_recursion_limit(parse, run):
+    source = "print " + "(" * 5000 + "1" + ")" * 5000 + ";"
+    statements = FlatAst.from_statements(parse(source)).to_statements()
+
+    Resolver().resolve(statements)
+    assert run(Interpreter, statements).out == "1\n"
+
+
+def test_rejects_other_data_and_run_programs(parse):
+    with pytest.raises(ValueError):
+        FlatAst.from_buffer(b"FLINTAST" + bytes(8))
+
+    statements = parse("print 1 + 2;")
+    statements[0].expression.__class__ = NumberAdd
+    with pytest.raises(ValueError):
+        FlatAst.from_statements(statements)
@@ -0,0 +1,93 @@
+import pytest
+from flint.parser import LazyBody
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.optimizer import Optimizer
+from flint.resolver import Resolver
+from tools import raise_error
+
+
+PROGRAM = """
+fn fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+fn never() { { { print "never"; } } }
+fn outer(x) {
+    fn inner(y) { return x + y; }
+    return inner(2 * 1);
+}
+var x = 40;
+print fib(10); print outer(0); print fib(11);
+"""
+
+
+@pytest.fixture
+def run_lazily(parse, run):
+    """Runs a script as --lazy does, returning its statements and output."""
+    def run_lazily(engine, source):
+        interpreter = engine(Environment())
+        statements = Optimizer(interpreter).optimize(parse(source, lazy_bodies=True))
+        Resolver().resolve(statements)
+        return statements, run(interpreter, statements)
+    return run_lazily
+
+
+def test_bodies_are_only_brace_matched(parse):
+    statements = parse(PROGRAM, lazy_bodies=True)
+
+    assert [type(statement.body) for statement in statements[:3]] == [LazyBody] * 3
+    assert type(statements[3].initializer.value) is float
+    never = statements[1].body.parse()
+    assert never[0].statements[0].statements[0].expression.value == "never"
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_bodies_are_parsed_by_the_first_call(engine, run_lazily):
+    statements, output = run_lazily(engine, PROGRAM)
+
+    assert output.out.split() == ["55", "42", "89"]
+    assert type(statements[0].body) is list and statements[0].frame_size == 1
+    assert type(statements[1].body) is LazyBody
+    # globals, as x in inner, stay globals once resolved
+    assert statements[2].body[1].value.callee.depth == 0
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_errors_in_a_body_are_reported_by_its_first_call(engine, run_lazily):
+    source = "fn broken() { print 1 +; }\nfn fine() { return 1; }\nprint fine();\nbroken();\nprint 2;"
+    try:
+        _, output = run_lazily(engine, source)
+    finally:
+        assert raise_error.had_error
+        raise_error.had_error = False
+
+    assert output.out.split() == ["1"]
+    assert "[line 1, column 24] Error at ';': Expect expression." in output.err
+    assert "Can't call 'broken', its body has errors." in output.err
+
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+@pytest.mark.parametrize("body, error", [
+    ("var x = 1", "[line 1, column 20] Error at '}': Expect ';' after variable declaration."),
+    ("print (1", "[line 1, column 19] Error at '}': Expect ')' after expression."),
+])
+def test_errors_that_leave_a_body_unclosed_stay_in_the_body(engine, body, error, run_lazily):
+    source = f"fn f() {{ {body} }}\nprint 1;\nf();\nprint 2;"
+    try:
+        _, output = run_lazily(engine, source)
+    finally:
+        assert raise_error.had_error
+        raise_error.had_error = False
+
+    # the code after the body isn't parsed again as part of it
+    assert output.out.split() == ["1"]
+    assert output.err.startswith(error + "\n")
+    assert "line 2" not in output.err and "line 3" not in output.err
+    assert "[line 1, column 4] Can't call 'f', its body has errors." in output.err
+
+def test_unclosed_bodies_are_parsed_to_report_the_error(parse):
+    try:
+        parse("fn f() { print 1;", lazy_bodies=True)
+        assert raise_error.had_error
+    finally:
+        raise_error.had_error = False
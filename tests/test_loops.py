@@ -0,0 +1,46 @@
+import pytest
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.vm import VM
+from flint.transpiler import PythonInterpreter
+
+
+LOOPS = """
+for (var i = 0; i < 3; i = i + 1) { var square = i * i; print square; }
+for (i in 0..3) print i * 10;
+for (i in 1.5..3) print i;
+for (i in 3..1) print i;
+for (i in 0..2) { i = i + 5; print i; }
+var n = 0;
+for (; n < 2;) n = n + 1;
+print n;
+fn find(limit) { for (i in 0..limit) { if (i * i > 20) { return i; } } return -1; }
+print find(100); print find(3);
+for (i in 0..2) { for (j in i..2) { print i + j * 10; } }
+for (i in nil..2) print i;
+"""
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter, VM, PythonInterpreter])
+def test_for_loops_in_every_engine(engine, run):
+    output = run(engine, LOOPS)
+
+    assert output.out.split() == "0 1 4 0 10 20 1.5 2.5 5 6 2 5 -1 0 10 11".split()
+    assert output.err.strip() == "[line 13, column 14] Range bounds must be numbers."
+
+
+def test_for_loop_variables_are_scoped_to_the_loop(run):
+    source = "var i = 9; for (var i = 0; i < 1; i = i + 1) {} for (i in 0..1) {} print i;"
+
+    assert run(Interpreter, source).out == "9\n"
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter, VM, PythonInterpreter])
+def test_loop_bodies_redeclare_their_variables(engine, run):
+    source = """
+    var i = 0;
+    while (i < 2) { var x; print x; x = i; { var y = x + 1; print y; } i = i + 1; }
+    for (k in 0..2) { var x; print x; x = k; }
+    """
+
+    assert run(engine, source).out.split() == "nil 1 nil 2 nil nil".split()
@@ -0,0 +1,70 @@
+import pytest
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.memoization import PurityAnalyzer
+
+
+FUNCTIONS = """
+fn fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+fn even(n) { if (n == 0) { return true; } return odd(n - 1); }
+fn odd(n) { if (n == 0) { return false; } return even(n - 1); }
+fn noisy(n) { print n; return n; }
+fn calls_noisy(n) { return noisy(n); }
+fn uses_clock() { return clock(); }
+var g = 1;
+fn reads_global() { return g; }
+fn writes_global() { g = 2; }
+fn makes_function() { fn inner() {} return inner; }
+fn calls_argument(f) { return f(); }
+"""
+
+
+@pytest.fixture
+def analyze(resolve):
+    def analyze(source):
+        statements = resolve(source)
+        PurityAnalyzer().analyze(statements)
+        return statements
+    return analyze
+
+
+def test_marks_pure_functions(analyze):
+    redefinitions = "fn twice() { return 1; } var twice = 2; fn calls_twice() { return twice(); }"
+    statements = analyze(FUNCTIONS + redefinitions)
+    functions = [s for s in statements if hasattr(s, "pure")]
+
+    assert [f.name.lexeme for f in functions if f.pure] == ["fib", "even", "odd", "twice"]
+    assert statements[9].body[0].pure
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_caches_pure_functions(engine, analyze, run):
+    interpreter = engine(Environment())
+    output = run(interpreter, analyze(FUNCTIONS + "print fib(40); print noisy(1); print noisy(1);"), memo_size=64).out.split()
+
+    assert output == ["102334155", "1", "1", "1", "1"]
+    assert [f.stats() for f in interpreter.memoized] == [
+        "<fn fib>: 38 hits, 41 misses, 41 of 64 entries",
+        "<fn even>: 0 hits, 0 misses, 0 of 64 entries",
+        "<fn odd>: 0 hits, 0 misses, 0 of 64 entries",
+    ]
+
+
+def test_arguments_of_different_types_are_different_keys(analyze, run):
+    source = "fn same(x) { return x; } print same(1); print same(true); print same(1 == 1);"
+    output = run(Interpreter, analyze(source), memo_size=64).out.split()
+
+    assert output == ["1", "True", "True"]
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_arrays_are_never_cached(engine, analyze, run):
+    source = ("fn first(xs) { return xs[0]; } fn pair(n) { return [n, n]; } var xs = [1]; "
+              "print first(xs); xs[0] = 2; print first(xs); print pair(1) == pair(1);")
+    interpreter = engine(Environment())
+    output = run(interpreter, analyze(source), memo_size=64).out.split()
+
+    # an array argument skips the cache, a function building one isn't pure
+    assert output == ["1", "2", "True"]
+    assert [f.stats() for f in interpreter.memoized] == ["<fn first>: 0 hits, 0 misses, 0 of 64 entries"]
@@ -0,0 +1,44 @@
+import pytest
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.vm import VM
+from flint.transpiler import PythonInterpreter
+from flint import flint_callable, interpreter
+from flint.flint_callable import NativeFunction, native
+
+
+ENGINES = [Interpreter, ClosureInterpreter, VM, PythonInterpreter]
+
+
+@pytest.fixture
+def natives(monkeypatch):
+    # a registry of the test's own, seen by the interpreters
+    registry = dict(flint_callable.NATIVES)
+    monkeypatch.setattr(flint_callable, "NATIVES", registry)
+    monkeypatch.setattr(interpreter, "NATIVES", registry)
+
+    @native("hypot")
+    def hypot(x, y):
+        return (x * x + y * y) ** 0.5
+
+    @native("total")
+    def total(*numbers):
+        return float(sum(numbers))
+
+    return registry
+
+
+def test_native_decorator_reads_the_arity(natives):
+    assert natives["hypot"].arity() == 2
+    assert natives["total"].arity() is None
+    assert natives["clock"].arity() == 0
+    assert type(natives["clock"]) is NativeFunction
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_natives_are_called_directly(engine, natives, run):
+    source = "print hypot(3, 4); print total(); print total(1, 2, 3); for (i in 0..20) { hypot(i, i); } print clock() > 0; hypot(1);"
+    output = run(engine, source)
+
+    assert output.out.split() == ["5", "0", "6", "True"]
+    assert "Expected 2 arguments but got 1." in output.err
@@ -0,0 +1,46 @@
+import pytest
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.optimizer import Optimizer
+from flint.ast.expr import Binary, Variable
+from flint.ast.stmt import Block, For_stmt, Print, While_stmt
+
+
+@pytest.fixture
+def optimize(parse):
+    def optimize(source):
+        return Optimizer(Interpreter(Environment())).optimize(parse(source))
+    return optimize
+
+
+def test_folds_literal_operands(optimize):
+    statements = optimize('print 60 * 60 * 24; print -(1); print "a" + "b"; print nil or x; print x + 2 * 3;')
+
+    assert [s.expression.value for s in statements[:3]] == [86400.0, -1.0, "ab"]
+    assert isinstance(statements[3].expression, Variable)
+    assert isinstance(statements[4].expression, Binary)
+    assert statements[4].expression.right.value == 6.0
+
+
+def test_keeps_expressions_that_fail_at_runtime(optimize):
+    statements = optimize('print 1 / (2 - 2); print "a" + 1;')
+
+    assert isinstance(statements[0].expression, Binary)
+    assert statements[0].expression.right.value == 0.0
+    assert isinstance(statements[1].expression, Binary)
+
+
+def test_prunes_constant_branches(optimize):
+    statements = optimize('if (1 < 2) print "yes"; else print "no"; while (false) print 1; while (true) {} 42;')
+
+    assert len(statements) == 2
+    assert isinstance(statements[0], Print) and statements[0].expression.value == "yes"
+    assert isinstance(statements[1], While_stmt) and isinstance(statements[1].body, Block)
+
+
+def test_prunes_constant_for_clauses(optimize):
+    statements = optimize('for (var i = 0; false; i = i + 1) print i; for (;true; 1) print 1; for (i in 3..1) print i; for (i in 0.."a") print i;')
+
+    assert [type(s) for s in statements] == [Block, For_stmt, type(statements[2])]
+    assert statements[1].condition is None and statements[1].increment is None
+    assert statements[2].end.value == "a"
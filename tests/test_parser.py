@@ -0,0 +1,57 @@
+from flint.scanner import RegexScanner
+from flint.parser import Parser
+from flint.ast.expr import Assign, Binary, Call, Logical, Unary, Variable
+from flint.ast.stmt import For_range, For_stmt, Var
+from tools.ast_printer import AstPrinter
+
+
+def parse_expression(source):
+    statements = Parser(RegexScanner(f"{source};").scan_tokens(), is_repl_mode=False).parse()
+    return statements[0].expression
+
+
+def test_precedence_and_associativity():
+    printer = AstPrinter()
+
+    assert printer.print_ast(parse_expression("1 + 2 * 3 - 4")) == "(- (+ 1.0 (* 2.0 3.0)) 4.0)"
+    assert printer.print_ast(parse_expression("-(1 + 2) * 3")) == "(* (- (+ 1.0 2.0)) 3.0)"
+    assert printer.print_ast(parse_expression("1 < 2 == 3 >= 4")) == "(== (< 1.0 2.0) (>= 3.0 4.0))"
+
+
+def test_assignment_logical_and_calls():
+    expr = parse_expression("a = b = x or y and !f(1)(2, 3)")
+
+    assert isinstance(expr, Assign) and expr.name.lexeme == "a"
+    assert isinstance(expr.value, Assign) and expr.value.name.lexeme == "b"
+    assert isinstance(expr.value.value, Logical) and expr.value.value.operator.lexeme == "or"
+
+    negated = expr.value.value.right.right
+    assert isinstance(negated, Unary)
+    assert isinstance(negated.right, Call) and len(negated.right.arguments) == 2
+    assert isinstance(negated.right.callee, Call)
+    assert isinstance(negated.right.callee.callee, Variable)
+
+
+def test_nesting_is_not_bounded_by_recursion_limit():
+    depth = 20000
+    expr = parse_expression("(" * depth + "1" + ")" * depth + " + -" + "-" * depth + "x")
+
+    assert isinstance(expr, Binary)
+    assert isinstance(expr.right, Unary)
+
+
+def test_for_loops():
+    loop, counted = Parser(RegexScanner("for (var i = 0;; i = i + 1) {} for (i in 0..n + 1) print i;").scan_tokens(), is_repl_mode=False).parse()
+
+    assert isinstance(loop, For_stmt) and isinstance(loop.initializer, Var)
+    assert loop.condition is None and isinstance(loop.increment, Assign)
+    assert isinstance(counted, For_range) and counted.name.lexeme == "i"
+    assert counted.start.value == 0.0 and isinstance(counted.end, Binary)
+
+
+def test_nodes_have_slots_and_no_dict():
+    expr = parse_expression("a = f(b + 1)")
+
+    for node in [expr, expr.value, expr.value.callee, expr.value.arguments[0]]:
+        assert not hasattr(node, "__dict__")
+    assert "depth" in Assign.__slots__ and "cache" in Call.__slots__
@@ -0,0 +1,122 @@
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.ast.expr import Binary
+from flint.quickening import NumberAdd, NumberLess, StringConcat, KnownCall, GlobalCall, QUICKEN_THRESHOLD
+from flint.ast import expr, stmt
+
+
+def test_hot_nodes_are_specialized_in_place(resolve, run):
+    statements = resolve("fn inc(x) { return x + 1; } var i = 0; while (i < 100) { i = inc(i); } print i;")
+    output = run(Interpreter, statements)
+    loop = statements[2]
+
+    assert output.out == "100\n"
+    assert type(loop.condition) is NumberLess
+    assert type(loop.body.statements[0].expression.value) is GlobalCall
+    assert type(statements[0].body[0].value) is NumberAdd
+
+
+def test_changing_types_deoptimize(resolve, run):
+    source = f"""
+    fn add(a, b) {{ return a + b; }}
+    for (var i = 0; i < {QUICKEN_THRESHOLD + 1}; i = i + 1) {{ add(i, i); }}
+    print add("a", "b");
+    print add(1, 2);
+    print add(1, "b");
+    """
+    statements = resolve(source)
+    output = run(Interpreter, statements)
+
+    assert output.out.split() == ["ab", "3"]
+    assert "Operands must be two numbers or two strings." in output.err
+    assert type(statements[0].body[0].value) is Binary
+
+
+def test_quickened_nodes_report_runtime_errors(resolve, run):
+    source = f"fn f(a, b) {{ return a / b; }} for (var i = 1; i < {QUICKEN_THRESHOLD * 2}; i = i + 1) {{ f(i, i); }} f(1, 0);"
+    statements = resolve(source)
+    output = run(Interpreter, statements)
+
+    assert output.err.startswith("[line 1, column 23] Division by zero is not allowed.")
+
+
+def test_strings_and_calls(resolve, run):
+    statements = resolve('var s = ""; for (var i = 0; i < 20; i = i + 1) { s = s + "x"; } print s;')
+    output = run(Interpreter, statements)
+    body = statements[1].body
+
+    assert output.out == "x" * 20 + "\n"
+    assert type(body.statements[0].expression.value) is StringConcat
+
+
+def test_calls_of_locals_are_specialized(resolve, run):
+    source = "fn apply(f, x) { var y = f(x); return y; } fn inc(x) { return x + 1; } var i = 0; while (i < 20) { i = apply(inc, i); } print i;"
+    statements = resolve(source)
+    output = run(Interpreter, statements)
+
+    assert output.out == "20\n"
+    assert type(statements[0].body[0].initializer) is KnownCall
+
+
+def test_global_calls_see_reassigned_globals(resolve, run):
+    source = f"""
+    fn one() {{ return 1; }}
+    fn two() {{ return 2; }}
+    var f = one;
+    var total = 0;
+    for (var i = 0; i < {QUICKEN_THRESHOLD * 2}; i = i + 1) {{
+        total = total + f();
+        if (i == {QUICKEN_THRESHOLD}) {{ f = two; }}
+    }}
+    print total;
+    f = 3;
+    f();
+    """
+    statements = resolve(source)
+    output = run(Interpreter, statements)
+
+    assert output.out == f"{QUICKEN_THRESHOLD + 1 + (QUICKEN_THRESHOLD - 1) * 2}\n"
+    assert "Can only call functions and classes." in output.err
+
+
+def test_counts_live_on_the_nodes(resolve, run):
+    statements = resolve(f"fn f(a) {{ return a + 1; }} f(1); f(2); for (i in 0..{QUICKEN_THRESHOLD * 2}) f(i); f(\"a\");")
+    output = run(Interpreter, statements)
+    addition = statements[0].body[0].value
+
+    # deoptimized by the string, then cooling down
+    assert type(addition) is Binary
+    assert addition.hotness[1] < 0
+
+
+def test_dropped_statements_leave_nothing_behind(resolve):
+    interpreter = Interpreter(Environment())
+    interpreter.interpret(resolve("var a = 1; fn f() { return a; }"))
+
+    def retained():
+        # the entries of the interpreter's containers, which outlive the statements
+        return sum(len(value) for value in vars(interpreter).values() if isinstance(value, (dict, list, set)))
+
+    before = retained()
+    statements = [resolve(f"a + {i}; f(); a + f() + {i};") for i in range(1000)]
+    for statement in statements:
+        interpreter.interpret(statement)
+    del statements
+
+    assert retained() == before
+
+
+class VisitNames:
+    """Visitor whose visit methods return their own name."""
+    def __getattr__(self, name):
+        return lambda node: name
+
+
+def test_kinds_dispatch_like_accept():
+    variants = [NumberAdd, StringConcat, KnownCall, GlobalCall]
+    interpreter = Interpreter(Environment())
+
+    for node in expr.Expr.__subclasses__() + variants:
+        assert interpreter.expr_visits[node.kind].__name__ == node.accept(None, VisitNames())
+    for node in stmt.Stmt.__subclasses__():
+        assert interpreter.stmt_visits[node.kind].__name__ == node.accept(None, VisitNames())
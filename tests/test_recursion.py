@@ -0,0 +1,72 @@
+import pytest
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.closures import ClosureInterpreter
+from flint.vm import VM
+from flint.transpiler import PythonInterpreter
+from flint.compiler import Compiler, TAIL_CALL
+from flint.flint import Flint
+
+
+ENGINES = [Interpreter, ClosureInterpreter, VM, PythonInterpreter]
+
+TAIL_CALLS = """
+fn count(n, acc) { if (n == 0) { return acc; } return count(n - 1, acc + 1); }
+fn even(n) { if (n == 0) { return true; } return odd(n - 1); }
+fn odd(n) { if (n == 0) { return false; } return even(n - 1); }
+fn first(n) { return clock() > n; }
+print count(100000, 0); print even(100001); print first(0);
+"""
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter, VM])
+def test_tail_calls_dont_grow_the_stack(engine, run):
+    assert run(engine, TAIL_CALLS).out.split() == ["100000", "False", "True"]
+
+
+def test_tail_calls_are_compiled_for_the_vm(resolve):
+    function = Compiler().compile(resolve("fn f(n) { return f(n); }")).constants[0]
+
+    assert TAIL_CALL in function.code
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_deep_recursion_with_a_deep_stack(engine, run):
+    source = "fn down(n) { if (n == 0) { return 0; } return down(n - 1) + 1; } print down(5000);"
+
+    assert Flint.with_deep_stack(run, engine, source).out.split() == ["5000"]
+
+
+@pytest.mark.parametrize("engine, error", [
+    (Interpreter, "[line 1, column 57] Stack overflow."),
+    (ClosureInterpreter, "[line 1, column 57] Stack overflow."),
+    (VM, "[line 1, column 57] Stack overflow."),
+    # transpiled code only maps its errors back to lines
+    (PythonInterpreter, "[line 1] Stack overflow."),
+])
+def test_reports_stack_overflow_past_the_maximum_depth(engine, error, run):
+    source = "fn down(n) { if (n == 0) { return 0; } return down(n - 1) + 1; }\nprint down(10);\nprint down(20);\nprint down(30);"
+
+    output = run(engine, source, max_call_depth=21)
+
+    assert output.out.split() == ["10", "20"]
+    assert output.err.strip() == error
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_reports_runaway_recursion_as_stack_overflow(engine, run, monkeypatch):
+    monkeypatch.setattr(Flint, "max_depth", 1000)
+    output = Flint.with_deep_stack(lambda: run(engine, "fn f(n) { return 1 + f(n); } f(0);", max_call_depth=1000))
+
+    assert "Stack overflow." in output.err
+
+
+def test_max_depth_option():
+    try:
+        assert Flint.parse_options(["--max-depth=20000", "script.flint"]) == ["script.flint"]
+        assert Flint.max_depth == 20000
+    finally:
+        Flint.max_depth = Interpreter(Environment()).max_call_depth
+
+    with pytest.raises(SystemExit):
+        Flint.parse_options(["--max-depth=0"])
@@ -0,0 +1,62 @@
+from flint.interpreter import Interpreter
+from tools import raise_error
+
+
+def test_annotates_depth_and_slot(resolve):
+    statements = resolve("var g = 1; { var a = 1; var b = 2; { var c = b + a; g = c; } }")
+    outer = statements[1]
+    inner = outer.statements[2]
+    c_init = inner.statements[0].initializer
+
+    assert statements[0].slot is None
+    assert (outer.frame_size, inner.frame_size) == (2, 1)
+    assert [d.slot for d in outer.statements[:2]] == [0, 1]
+    assert (c_init.left.depth, c_init.left.slot) == (1, 1)
+    assert (c_init.right.depth, c_init.right.slot) == (1, 0)
+    assert inner.statements[1].expression.depth is None
+
+
+def test_function_bodies_only_see_their_own_locals(resolve):
+    statements = resolve("{ var a = 1; fn f(x, y) { var z = x; return a; } }")
+    function = statements[0].statements[1]
+
+    assert function.slot == 1
+    assert function.frame_size == 3
+    assert (function.body[0].initializer.depth, function.body[0].initializer.slot) == (0, 0)
+    assert function.body[1].value.depth is None
+
+
+def test_blocks_declaring_nothing_get_no_scope(resolve):
+    statements = resolve("{ var a = 1; { { a = 2; } } for (; a < 3; a = a + 1) {} for (var i = 0;;) {} }")
+    outer = statements[0]
+    empty = outer.statements[1]
+
+    assert (empty.frame_size, empty.statements[0].frame_size) == (0, 0)
+    assert (empty.statements[0].statements[0].expression.depth, empty.statements[0].statements[0].expression.slot) == (0, 0)
+    assert [loop.frame_size for loop in outer.statements[2:]] == [0, 1]
+
+
+def test_runs_with_slot_addressed_frames(run):
+    output = run(
+        Interpreter,
+        'var a = "g"; { var a = a + "1"; { var b = a; a = b + "2"; print a; } print a; } print a;'
+        "fn f(x, y) { var z = x + y; { z = z * 2; } return z; } print f(1, 2);",
+    )
+
+    assert output.out.split() == ["g12", "g12", "g", "6"]
+
+
+def test_reports_redeclared_locals(capsys, resolve):
+    resolve("{ var a = 1; var a = 2; } fn f(x, x) {}")
+
+    assert raise_error.had_error
+    raise_error.had_error = False
+    assert capsys.readouterr().err.count("already defined in this scope") == 2
+
+
+def test_reports_top_level_return(capsys, resolve):
+    resolve("fn f() { while (true) { return 1; } } return;")
+
+    assert raise_error.had_error
+    raise_error.had_error = False
+    assert capsys.readouterr().err.count("Can't return from top-level code.") == 1
@@ -0,0 +1,72 @@
+import glob
+import pytest
+from flint.scanner import Scanner, RegexScanner
+from flint.token_types import TokenType
+from flint.symbol_table import SymbolTable
+from tools import raise_error
+
+
+def token_tuples(tokens):
+    return [(t.type, t.lexeme, t.literal, t.line, t.column) for t in tokens]
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("impl/*.flint")))
+def test_regex_engine_matches_classic_scanner(path):
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+
+    classic = Scanner(source).scan_tokens()
+    fast = RegexScanner(source).scan_tokens()
+    assert token_tuples(fast) == token_tuples(classic)
+
+
+def test_regex_engine_lexemes():
+    source = 'var x = 1.5; /* multi\nline */ print "a\nb" >= x; // done\n'
+    tokens = RegexScanner(source).scan_tokens()
+
+    assert token_tuples(tokens) == token_tuples(Scanner(source).scan_tokens())
+    assert tokens[3].literal == 1.5
+    assert tokens[6].type == TokenType.STRING_LITERAL
+    assert tokens[6].literal == "a\nb"
+    assert (tokens[6].line, tokens[6].column) == (2, 15)
+    assert tokens[-1].type == TokenType.EOF
+    assert (tokens[-1].line, tokens[-1].column) == (4, 1)
+
+
+def test_regex_engine_reports_errors(capsys):
+    RegexScanner('print @;\n"open').scan_tokens()
+    raise_error.had_error = False
+
+    err = capsys.readouterr().err
+    assert "[line 1, column 7] Error: Unexpected character: @" in err
+    assert "[line 2, column 1] Error: Unterminated string." in err
+
+
+def test_tokens_are_stored_compactly():
+    tokens = RegexScanner("print x + 12;").scan_tokens()
+
+    assert list(tokens.kinds) == [TokenType.KEYWORD_PRINT, TokenType.IDENTIFIER, TokenType.PLUS,
+                                  TokenType.NUMBER_LITERAL, TokenType.SEMICOLON, TokenType.EOF]
+    assert list(tokens.starts) == [0, 6, 8, 10, 12, 13]
+    assert tokens.literals == {3: 12.0}
+    assert tokens[1].lexeme == "x"
+
+
+@pytest.mark.parametrize("engine", [Scanner, RegexScanner])
+def test_identifiers_are_interned(engine):
+    table = SymbolTable()
+    tokens = engine("var count = count + other; print count;", table).scan_tokens()
+
+    names = [token for token in tokens if token.type == TokenType.IDENTIFIER]
+    assert [token.symbol for token in names] == [0, 0, 1, 0]
+    assert names[0].lexeme is names[1].lexeme is names[3].lexeme
+    assert table.names == ["count", "other"]
+
+
+def test_ranges_are_not_decimal_points():
+    source = "for (i in 0..n) 1.5..2;"
+    tokens = RegexScanner(source).scan_tokens()
+
+    assert token_tuples(tokens) == token_tuples(Scanner(source).scan_tokens())
+    assert [tokens[i].type for i in range(3, 7)] == [TokenType.KEYWORD_IN, TokenType.NUMBER_LITERAL, TokenType.DOT_DOT, TokenType.IDENTIFIER]
+    assert (tokens[8].literal, tokens[10].literal) == (1.5, 2.0)
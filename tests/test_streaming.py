@@ -0,0 +1,62 @@
+import io
+import pytest
+from flint.scanner import RegexScanner, StreamScanner, TokenStream
+from flint.parser import Parser
+from flint.ast.stmt import Print, Var
+from flint.environment import Environment
+from flint.flint import Flint
+
+
+SOURCE = 'var a = "multi\nline";\n/* a\ncomment */ print a;\nprint 1 >= 2;\n'
+
+
+def test_stream_scanner_matches_regex_scanner():
+    streamed = list(StreamScanner(io.StringIO(SOURCE)).scan_tokens())
+    batch = RegexScanner(SOURCE).scan_tokens()
+
+    assert [(t.type, t.lexeme, t.literal, t.line, t.column) for t in streamed] == \
+           [(t.type, t.lexeme, t.literal, t.line, t.column) for t in batch]
+
+
+def test_parser_yields_declarations_lazily():
+    tokens = TokenStream(StreamScanner(io.StringIO(SOURCE * 100)).scan_tokens())
+    declarations = Parser(tokens, is_repl_mode=False).declarations()
+
+    assert isinstance(next(declarations), Var)
+    assert isinstance(next(declarations), Print)
+    # only the tokens of the pending declaration are buffered
+    assert len(tokens.window) < 10
+    assert len(list(declarations)) == 298
+
+
+def test_long_strings_and_comments_are_scanned_once(monkeypatch):
+    source = 'print "' + "line\n" * 5000 + '";\n/' + "*\n" * 5000 + '*/ print 1;\n'
+    scanned = []
+    scan_chunk = StreamScanner.scan_chunk
+    monkeypatch.setattr(StreamScanner, "scan_chunk",
+                        lambda self, chunk, final: scanned.append(len(chunk)) or scan_chunk(self, chunk, final))
+
+    streamed = list(StreamScanner(io.StringIO(source)).scan_tokens())
+    batch = RegexScanner(source).scan_tokens()
+
+    assert [(t.type, t.lexeme, t.line, t.column) for t in streamed] == \
+           [(t.type, t.lexeme, t.line, t.column) for t in batch]
+    # each line is scanned a bounded number of times, not once per later line
+    assert sum(scanned) < 3 * len(source)
+
+
+def test_comment_end_split_between_chunks():
+    chunks = ["/* a *", "/ print 1;", "/*/ still a comment */ print 2;"]
+    streamed = list(StreamScanner(iter(chunks)).scan_tokens())
+
+    assert [t.lexeme for t in streamed if t.lexeme] == ["print", "1", ";", "print", "2", ";"]
+
+
+def test_streaming_rejects_the_classic_scanner(monkeypatch, capsys):
+    monkeypatch.setattr(Flint, "scanner_engine", "classic")
+
+    with pytest.raises(SystemExit) as exit:
+        Flint.run_stream(io.StringIO("print 1;"), Environment())
+
+    assert exit.value.code == 64
+    assert "--scanner=classic" in capsys.readouterr().err
@@ -0,0 +1,39 @@
+import pytest
+from flint import cache
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.transpiler import PythonInterpreter
+from tests.test_closures import PROGRAM
+
+
+def test_python_engine_matches_tree_interpreter(run):
+    assert run(PythonInterpreter, PROGRAM) == run(Interpreter, PROGRAM)
+
+
+@pytest.mark.parametrize("source", [
+    'print -"a";', "print 1 < nil;", "print 1 / 0;", "print true * 2 - true;", 'print "a" * 2;',
+    "nil();", "fn f(a) {} f();", "print x;", "x = 1;", "var a; var a;", "print 0 and 1 or 2;",
+])
+def test_python_engine_reports_the_same_runtime_errors(source, run):
+    assert run(PythonInterpreter, source) == run(Interpreter, source)
+
+
+@pytest.mark.parametrize("max_call_depth", [50, 10 ** 6])
+def test_stack_overflow_is_mapped_to_the_flint_line(max_call_depth, run):
+    # past max_call_depth or out of Python stack, it's the line of the call
+    output = run(PythonInterpreter, "fn f(n) {\n  return f(n + 1);\n}\nf(0);", max_call_depth=max_call_depth)
+    assert output.err.strip() == "[line 2] Stack overflow."
+
+
+def test_cached_code_runs_without_the_ast(tmp_path, capsys, resolve):
+    source = "fn square(x) { return x * x; } print square(12);"
+    script = str(tmp_path / "main.flint")
+    assert cache.store_code(script, source, PythonInterpreter(Environment()).compile(resolve(source)))
+
+    PythonInterpreter(Environment()).run_code(cache.load_code(script, source))
+    assert capsys.readouterr().out == "144\n"
+    assert sorted(p.suffix for p in (tmp_path / cache.CACHE_DIR_NAME).iterdir()) == [".code"]
+
+
+def test_deeply_nested_programs_fall_back_to_the_tree(run):
+    assert run(PythonInterpreter, f"print {'(' * 500}1{')' * 500};").out == "1\n"
@@ -0,0 +1,48 @@
+import pytest
+from flint.environment import Environment
+from flint.interpreter import Interpreter
+from flint.optimizer import Optimizer
+from flint.resolver import Resolver
+from flint.compiler import Compiler
+from flint.vm import VM
+from tools.disassembler import disassemble
+from tests.test_closures import PROGRAM
+
+
+def test_vm_matches_tree_interpreter(run):
+    assert run(VM, PROGRAM) == run(Interpreter, PROGRAM)
+
+
+@pytest.mark.parametrize("source", ['print -"a";', "print 1 < nil;", "print 1 / 0;", "nil();", "fn f(a) {} f();", "print x;", "x = 1;"])
+def test_vm_reports_the_same_runtime_errors(source, run):
+    assert run(VM, source) == run(Interpreter, source)
+
+
+def test_calls_dont_recurse_in_python(run):
+    source = "fn down(n) { if (n == 0) { return 0; } return down(n - 1) + 1; } print down(5000); print clock() > 0;"
+
+    assert run(VM, source).out.split() == ["5000", "True"]
+    assert "Stack overflow." in run(VM, "fn f() { f(); } f();").err
+
+
+
+def test_negative_zero_keeps_its_own_constant(parse, run):
+    # folded by the optimizer, -0 is a constant next to 0
+    vm = VM(Environment())
+    statements = Optimizer(vm).optimize(parse("fn f() { print 0; print -0; } f(); print [0, -0];"))
+    Resolver().resolve(statements)
+
+    assert run(vm, statements).out.split() == ["0", "-0", "[0,", "-0]"]
+
+def test_blocks_share_the_function_slots(resolve):
+    function = Compiler().compile(resolve("fn f(a) { var b; { var c; } { var d; var e = d; } }")).constants[0]
+
+    assert function.frame_size == 4
+
+
+def test_disassembler_lists_nested_functions(resolve):
+    listing = disassemble(Compiler().compile(resolve("fn add(a, b) { return a + b; }\nprint add(1, 2);")))
+
+    assert listing.splitlines()[:2] == ["== script ==", "0000    1 CONSTANT                0 <fn add>"]
+    assert "== add ==" in listing
+    assert "0004    | ADD                     0 '+'" in listing
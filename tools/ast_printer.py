@@ -4,13 +4,17 @@ from flint.token_types import TokenType
 
 class AstPrinter(ExprVisitor):
     
+    def __init__(self):
+        # visit method of each kind of expression
+        self.visits = [getattr(self, visit) for visit in EXPR_VISITS]
+    
     def print_ast(self, expr):
         # print(expr)
         # Start visitor process
         if expr is None:
             return ValueError
         
-        return expr.accept(self)
+        return self.visits[expr.kind](expr)
     
     def visit_binary(self, binary):
         # Format a binary expression
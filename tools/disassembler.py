@@ -0,0 +1,66 @@
+from flint.compiler import *
+
+
+# opcodes whose operand is an index in the constant pool
+CONSTANT_OPERANDS = {
+    CONSTANT, GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL,
+    ADD, SUBTRACT, MULTIPLY, DIVIDE, GREATER, GREATER_EQUAL, LESS, LESS_EQUAL, NEGATE,
+    GET_INDEX, SET_INDEX, SLICE,
+}
+
+
+def disassemble(function):
+    """
+    Returns a readable listing of the bytecode of `function` followed by the
+    listings of the functions in its constant pool.
+
+    Every instruction is shown with its offset, its source line (or "|" when
+    it is the same as the previous instruction's), its opcode and operands.
+    """
+    listing = [f"== {function.name} =="]
+    code = function.code
+    offset = 0
+    while offset < len(code):
+        listing.append(disassemble_instruction(function, offset))
+        offset += 1 + OPERAND_COUNTS[code[offset]]
+
+    for constant in function.constants:
+        if isinstance(constant, BytecodeFunction):
+            listing.append("")
+            listing.append(disassemble(constant))
+    return "\n".join(listing)
+
+
+def disassemble_instruction(function, offset):
+    code = function.code
+    opcode = code[offset]
+    operands = code[offset + 1:offset + 1 + OPERAND_COUNTS[opcode]]
+
+    if offset > 0 and function.lines[offset] == function.lines[offset - 1]:
+        line = "   |"
+    else:
+        line = f"{function.lines[offset]:4}"
+    text = f"{offset:04} {line} {OPCODE_NAMES[opcode]:<20}"
+
+    if opcode in CONSTANT_OPERANDS:
+        text += f" {operands[0]:4} {describe(function.constants[operands[0]])}"
+    elif opcode == CALL or opcode == TAIL_CALL:
+        text += f" {operands[0]:4} arguments"
+    elif opcode == RANGE:
+        text += f" {operands[0]:4} {describe(function.constants[operands[1]])}"
+    elif opcode == FOR_ITER:
+        text += f" {operands[0]:4} {operands[1]:4} {operands[2]:4}"
+    elif operands:
+        text += f" {operands[0]:4}"
+    return text.rstrip()
+
+
+def describe(constant):
+    """Formats a constant of the pool."""
+    if isinstance(constant, BytecodeFunction):
+        return constant.to_string()
+    if hasattr(constant, "lexeme"):
+        return f"'{constant.lexeme}'"
+    if constant is None:
+        return "nil"
+    return repr(constant)
@@ -16,6 +16,7 @@ class GenerateAst:
                 
                 file.write(f"class {base_name}:\n")
                 # Base class
+                file.write("    __slots__ = ()\n\n")
                 file.write("    def accept(self, visitor):\n")
                 file.write("        raise NotImplementedError()\n\n")
                 
@@ -25,6 +26,7 @@ class GenerateAst:
                 
                 
                 # Generate AST classes
+                visits = []
                 for type_definition in types:
                     # Skip empty lines
                     if not type_definition.strip():
@@ -37,7 +39,15 @@ class GenerateAst:
                         continue
                     
                     class_name, fields = map(str.strip, type_definition.split(":"))
-                    GenerateAst.define_type(file, base_name, class_name, fields)
+                    GenerateAst.define_type(file, base_name, class_name, fields, len(visits))
+                    visits.append(f"visit_{class_name.lower()}")
+                    
+                # the kind of a node is its index in this table
+                file.write(f"# visit method of each kind of {base_name.lower()}, indexed by the kind of its class\n")
+                file.write(f"{base_name.upper()}_VISITS = (\n")
+                for visit in visits:
+                    file.write(f"    \"{visit}\",\n")
+                file.write(")\n")
                 print(f"AST classes generated in {path}")
                 
         except Exception as e:
@@ -58,11 +68,26 @@ class GenerateAst:
     
     
     @staticmethod
-    def define_type(file, base_name, class_name, field_list):
-        """Generate code for a specific type of AST node"""
+    def define_type(file, base_name, class_name, field_list, kind):
+        """
+        Generate code for a specific type of AST node.
+        
+        The fields after a "|" are annotations set by the passes that run
+        after the parser, like the resolver, which only get a slot. `kind`
+        is a small integer telling the node's class apart from the other
+        classes of `base_name`, for visitors dispatching through a table.
+        """
         file.write(f"class {class_name}({base_name}):\n")
+        field_list, _, annotation_list = field_list.partition("|")
         fields = [f.strip() for f in field_list.split(",")]
+        annotations = [a.strip() for a in annotation_list.split(",") if a.strip()]
         # print(fields)
+        # nodes are small and many, so they have no __dict__
+        field_names = [field.split()[1] for field in fields]
+        file.write(f"    __slots__ = {GenerateAst.names_tuple(field_names + annotations)}\n")
+        # the fields the constructor takes, in order
+        file.write(f"    __match_args__ = {GenerateAst.names_tuple(field_names)}\n")
+        file.write(f"    kind = {kind}\n\n")
         # Constructor
         file.write(f"    def __init__(self, {', '.join([field.split()[1] for field in fields])}):\n")
         for field in fields:
@@ -76,6 +101,12 @@ class GenerateAst:
         file.write(f"        return visitor.visit_{class_name.lower()}(self)\n\n")
 
 
+    @staticmethod
+    def names_tuple(names):
+        """Returns the source of a tuple of the strings `names`."""
+        return f"({', '.join(repr(name) for name in names)}{',' if len(names) == 1 else ''})"
+
+
     @staticmethod
     def main(args):
         if len(args) != 1:
@@ -86,26 +117,32 @@ class GenerateAst:
         
         # define expressions
         GenerateAst.define_ast(output_dir, "Expr", [
-            "Assign   : Token name, Expr value",  # for variable assignment
-            "Binary   : Expr left, Token operator, Expr right",
+            "Assign   : Token name, Expr value | depth, slot",  # for variable assignment
+            "Binary   : Expr left, Token operator, Expr right | hotness",
             "Grouping : Expr expression",
-            "Call     : Expr callee, Token paren, List[Expr] arguments",
+            "Call     : Expr callee, Token paren, List[Expr] arguments | cache, hotness",
             "Literal  : Object value",
             "Logical  : Expr left, Token operator, Expr right",
             "Unary    : Token operator, Expr right",
-            "Variable : Token name"     # for variabel usage
+            "Variable : Token name | depth, slot",    # for variabel usage
+            "Array    : Token bracket, List[Expr] elements",
+            "Index    : Expr object, Token bracket, Expr index",
+            "Set_index : Expr object, Token bracket, Expr index, Expr value",   # for element assignment
+            "Slice    : Expr object, Token bracket, Expr start, Expr end"
         ])
 
         # define statements
         GenerateAst.define_ast(output_dir, "Stmt", [
-            "Block       : List[Stmt] statements", 
+            "Block       : List[Stmt] statements | frame_size", 
             "Expression  : Expr expression",
-            "Function    : Token name, List[Token] params, List[Stmt] body",
+            "For_stmt    : Stmt initializer, Expr condition, Expr increment, Stmt body | frame_size",
+            "For_range   : Token name, Expr start, Token operator, Expr end, Stmt body | slot, frame_size",
+            "Function    : Token name, List[Token] params, List[Stmt] body | slot, frame_size, pure",
             "If_stmt     : Expr condition, Stmt then_branch,"+
                          " Stmt else_branch",
             "Print       : Expr expression",
             "Return_stmt     : Token keyword, Expr value",
-            "Var         : Token name, Expr initializer ",   # for variable declaration
+            "Var         : Token name, Expr initializer | slot",   # for variable declaration
             "While_stmt       : Expr condition, Stmt body"
         ])
 
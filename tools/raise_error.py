@@ -11,24 +11,38 @@ had_error = False   # to track if an error occured
 def error(token: Token, message: str) -> None:
     """Reports an error at a specific token."""
     if token.type == TokenType.EOF:
-        report(token.line, " at end", message)
+        report(token.line, " at end", message, token.column)
     else:
-        report(token.line, f" at '{token.lexeme}'", message)
+        report(token.line, f" at '{token.lexeme}'", message, token.column)
     
 
 
-def report(line: int, pos_where: str, message: str):
+def report(line: int, pos_where: str, message: str, column: int = None):
     """Formats and reports an error message."""
     
     global had_error 
-    print(f"[line {line}] Error{pos_where}: {message}", file=sys.stderr)
+    print(f"[{location(line, column)}] Error{pos_where}: {message}", file=sys.stderr)
     had_error = True
+
+
+def location(line: int, column: int = None) -> str:
+    """Formats a source position, leaving out the column when it's unknown."""
+    if column is None:
+        return f"line {line}"
+    return f"line {line}, column {column}"
     
     
 def runtime_error(error: CustomRunTimeError) -> None:
-    """Handles runtime errors by printing the error message."""
+    """
+    Handles runtime errors by printing the error message, without a
+    location when the error has no token.
+    """
     global had_error
-    print(f"[line {error.token.line}] {error.message}\n", file=sys.stderr)
+    token = error.token
+    if token is None:
+        print(f"{error.message}\n", file=sys.stderr)
+    else:
+        print(f"[{location(token.line, token.column)}] {error.message}\n", file=sys.stderr)
     had_error = True
     
 